@@ -0,0 +1,44 @@
+"""
+Micro benchmark of the edxapp wrapper backend resolution.
+
+Compares resolving the backend with `import_module` on each call, like the wrappers used to do,
+with the backend registry that resolves it once.
+
+Run it from the repository root with:
+    PYTHONPATH=. DJANGO_SETTINGS_MODULE=nau_openedx_extensions.settings.test \
+        python benchmarks/edxapp_wrapper_registry.py
+"""
+import timeit
+from importlib import import_module
+
+from django.conf import settings
+
+from nau_openedx_extensions.edxapp_wrapper.cohort import get_cohort
+
+CALLS = 200000
+
+
+def get_cohort_with_import_module(*args, **kwargs):
+    """
+    The previous implementation of the `get_cohort` wrapper.
+    """
+    backend_module = settings.NAU_COHORT_MODULE
+    backend = import_module(backend_module)
+
+    return backend.get_cohort(*args, **kwargs)
+
+
+def main():
+    """
+    Print the time per call of both implementations.
+    """
+    for name, function in (
+        ("import_module per call", get_cohort_with_import_module),
+        ("backend registry", get_cohort),
+    ):
+        seconds = min(timeit.repeat(lambda f=function: f("username", None), number=CALLS, repeat=5))
+        print(f"{name}: {seconds / CALLS * 1e9:.0f} ns per call")
+
+
+if __name__ == "__main__":
+    main()
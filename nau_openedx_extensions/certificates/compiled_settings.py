@@ -0,0 +1,252 @@
+"""
+Compiled version of the `nau_certs_settings` of the course certificates.
+
+The `nau_certs_settings` of the course `cert_html_view_overrides` only change when the course is
+published, so they are parsed once per course version and certificate language and kept on
+an in process cache.
+"""
+from __future__ import absolute_import, unicode_literals
+
+import bisect
+import logging
+
+import six
+from django.conf import settings
+
+from nau_openedx_extensions.utils.lru_cache import LRUCache
+
+log = logging.getLogger(__name__)
+
+_compiled_settings_cache = LRUCache(
+    getattr(settings, "NAU_CERTIFICATES_SETTINGS_CACHE_SIZE", 512)
+)
+
+
+def get_interpolated_strings(nau_cert_settings, certificate_language):
+    """
+    Returns a dict with custom interpolated strings available for a certificate language.
+    Returns an empty dict if it cant find a string for the given language.
+    """
+    lang_interpolated_strings = {}
+    multilang_interpolated_strings = nau_cert_settings.get("interpolated_strings")
+    if multilang_interpolated_strings:
+        for key, value in six.iteritems(multilang_interpolated_strings):
+            try:
+                for lang, string in six.iteritems(value):
+                    if lang in certificate_language:
+                        lang_interpolated_strings[key] = string
+                        break
+            except AttributeError:
+                log.error(
+                    "Failed to read (%s) as formatted string in the certificate context",
+                    key,
+                )
+                continue
+
+    return lang_interpolated_strings
+
+
+def normalize_grade_round_format(grade_round_format):
+    """
+    Wrap the grade round format with `{` and `}` if it doesn't already have them,
+    e.g. `course_percent_grade:.0%` to `{course_percent_grade:.0%}`.
+    """
+    if not grade_round_format:
+        return None
+
+    # prefix with `{` if not already has that character
+    if grade_round_format[0] != "{":
+        grade_round_format = "{" + grade_round_format
+
+    # suffix with `}` if not already has that character
+    if grade_round_format[len(grade_round_format) - 1] != "}":
+        grade_round_format += "}"
+
+    return grade_round_format
+
+
+def get_qualitative_grade_text(grade_text, certificate_language):
+    """
+    Returns the text of a qualitative grade range on the certificate language.
+    """
+    if isinstance(grade_text, dict):
+        # use certificate language to use correct grade text translation,
+        # or use the default platform language
+        return grade_text.get(certificate_language.lower()) or grade_text.get(settings.LANGUAGE_CODE)
+    # if not a dict, probably it's already a string
+    return str(grade_text)
+
+
+class QualitativeGradeRangesError(ValueError):
+    """
+    The qualitative grade ranges of a course overlap or have gaps between them.
+    """
+
+
+class QualitativeGradeRanges:
+    """
+    The qualitative grade ranges of a course sorted by their `min_included`, so a grade is found
+    with a binary search on the range boundaries.
+
+    When two ranges overlap the one that starts first wins, and the part of the other range that
+    overlaps it is ignored. The overlaps and the gaps between the ranges are kept on `errors`.
+    """
+
+    def __init__(self, ranges):
+        """
+        The `ranges` are `(min_included, max_excluded, grade_text)` tuples.
+        """
+        self.errors = []
+        self.boundaries = []
+        self.max_excluded = []
+        self.grade_texts = []
+        for min_included, max_excluded, grade_text in sorted(ranges, key=lambda r: (r[0], r[1])):
+            if max_excluded <= min_included:
+                self.errors.append(
+                    f"The qualitative grade range [{min_included}, {max_excluded}) is empty"
+                )
+                continue
+            if self.max_excluded:
+                previous_max_excluded = self.max_excluded[-1]
+                if min_included < previous_max_excluded:
+                    self.errors.append(
+                        f"The qualitative grade range [{min_included}, {max_excluded}) overlaps "
+                        f"the range [{self.boundaries[-1]}, {previous_max_excluded})"
+                    )
+                    if max_excluded <= previous_max_excluded:
+                        continue
+                    min_included = previous_max_excluded
+                elif min_included > previous_max_excluded:
+                    self.errors.append(
+                        f"There is a gap between the qualitative grade ranges, "
+                        f"from {previous_max_excluded} to {min_included}"
+                    )
+            self.boundaries.append(min_included)
+            self.max_excluded.append(max_excluded)
+            self.grade_texts.append(grade_text)
+
+    def validate(self):
+        """
+        Raise a `QualitativeGradeRangesError` if the ranges overlap or have gaps between them.
+        """
+        if self.errors:
+            raise QualitativeGradeRangesError("; ".join(self.errors))
+
+    def get(self, grade):
+        """
+        Returns the text of the range that includes the grade, or None if there isn't any.
+        """
+        index = bisect.bisect_right(self.boundaries, grade) - 1
+        if index >= 0 and grade < self.max_excluded[index]:
+            return self.grade_texts[index]
+        return None
+
+
+def compile_qualitative_ranges(course_qualitative_ranges_settings, certificate_language):
+    """
+    Returns the `QualitativeGradeRanges` of the qualitative ranges settings, with the grade text
+    already on the certificate language.
+
+    The ranges that can't be parsed are ignored, as are the ranges without a grade text for the
+    language, so they don't hide the other ranges that include the same grades.
+    """
+    qualitative_ranges = []
+    for qualitative_range in course_qualitative_ranges_settings:
+        try:
+            min_included = float(qualitative_range.get("min_included", -1.0))
+            max_excluded = float(qualitative_range.get("max_excluded", -1.0))
+            grade_text = get_qualitative_grade_text(
+                qualitative_range.get("grade_text", {}), certificate_language
+            )
+        except (AttributeError, TypeError, ValueError):
+            log.error("Could not read the qualitative grade range %s", qualitative_range)
+            continue
+        if not grade_text:
+            log.warning(
+                "The qualitative grade range %s doesn't have a grade text for the language %s",
+                qualitative_range,
+                certificate_language,
+            )
+            continue
+        qualitative_ranges.append((min_included, max_excluded, grade_text))
+    return QualitativeGradeRanges(qualitative_ranges)
+
+
+class CompiledCertificateSettings:
+    """
+    The `nau_certs_settings` of a course already parsed for a certificate language.
+    """
+
+    def __init__(self, nau_cert_settings, certificate_language):
+        self.certificate_language = certificate_language
+        self.calculate_grades_context = nau_cert_settings.get("calculate_grades_context", False)
+        self.interpolated_strings = get_interpolated_strings(nau_cert_settings, certificate_language)
+
+        course_qualitative_grade_config = nau_cert_settings.get("course_qualitative_grade") or {}
+        self.has_qualitative_grade = bool(course_qualitative_grade_config)
+        self.grade_round_format = normalize_grade_round_format(
+            course_qualitative_grade_config.get("grade_round_format")
+        )
+        self.qualitative_ranges = compile_qualitative_ranges(
+            course_qualitative_grade_config.get("ranges", []), certificate_language
+        )
+        try:
+            self.qualitative_ranges.validate()
+        except QualitativeGradeRangesError as error:
+            # compiled once per course version, so it's only logged once
+            log.error("Invalid course qualitative grade ranges: %s", error)
+
+    def round_grade(self, context):
+        """
+        Returns the grade rounded with the `grade_round_format` without the `%` character.
+        """
+        if not self.grade_round_format:
+            raise ValueError("The course qualitative grade doesn't have a grade_round_format")
+        return self.grade_round_format.format(**context).replace("%", "")
+
+    def get_qualitative_grade(self, grade_rounded):
+        """
+        Returns the text of the qualitative range that includes the rounded grade,
+        or None if there isn't any.
+        """
+        return self.qualitative_ranges.get(float(grade_rounded))
+
+    def get_qualitative_grades(self, grades_rounded):
+        """
+        Returns the texts of the qualitative ranges that include each of the rounded grades,
+        with None for the grades without a range or that aren't a number.
+        """
+        qualitative_grades = []
+        for grade_rounded in grades_rounded:
+            try:
+                grade_rounded_f = float(grade_rounded)
+            except (TypeError, ValueError):
+                qualitative_grades.append(None)
+            else:
+                qualitative_grades.append(self.qualitative_ranges.get(grade_rounded_f))
+        return qualitative_grades
+
+
+def get_course_version(course):
+    """
+    Returns the published version of the course, that changes each time the course is published.
+    """
+    return getattr(course, "course_version", None) or getattr(course, "subtree_edited_on", None)
+
+
+def get_compiled_certificate_settings(course, nau_cert_settings, certificate_language):
+    """
+    Returns the compiled `nau_certs_settings` of the course for the certificate language,
+    cached per course version.
+    """
+    course_version = get_course_version(course)
+    if course_version is None:
+        # without a version we can't know when the settings change
+        return CompiledCertificateSettings(nau_cert_settings, certificate_language)
+
+    key = (str(course.id), str(course_version), certificate_language)
+    compiled_settings = _compiled_settings_cache.get(key)
+    if compiled_settings is None:
+        compiled_settings = CompiledCertificateSettings(nau_cert_settings, certificate_language)
+        _compiled_settings_cache.set(key, compiled_settings)
+    return compiled_settings
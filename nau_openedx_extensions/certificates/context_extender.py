@@ -6,12 +6,15 @@ from __future__ import absolute_import, unicode_literals
 import logging
 
 import six
-from django.conf import settings
-from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.utils.translation import gettext as _
 
-from nau_openedx_extensions.edxapp_wrapper.grades import get_course_grades
+from nau_openedx_extensions.certificates.compiled_settings import (
+    CompiledCertificateSettings,
+    get_compiled_certificate_settings,
+    get_interpolated_strings,
+)
+from nau_openedx_extensions.edxapp_wrapper.grades import get_course_grade_summary
 
 log = logging.getLogger(__name__)
 
@@ -30,48 +33,44 @@ def update_cert_context(context, user, course, **kwargs):
 
     update_context_with_custom_form(user, NauUserExtendedModel, context)
     if nau_cert_settings:
+        compiled_settings = get_compiled_certificate_settings(
+            course, nau_cert_settings, kwargs["certificate_language"]
+        )
         update_context_with_grades(
             user,
             course,
             context,
-            nau_cert_settings,
+            compiled_settings,
             kwargs["user_certificate"],
-            kwargs["certificate_language"],
-        )
-        update_context_with_interpolated_strings(
-            context, nau_cert_settings, kwargs["certificate_language"]
         )
+        apply_interpolated_strings(context, compiled_settings.interpolated_strings)
 
 
 def update_context_with_custom_form(user, custom_model, context):
     """
     Updates the context in-place with extra user information
     """
-    custom_model_instance = None
-    try:
-        custom_model_instance = custom_model.objects.get(user=user)
-    except ObjectDoesNotExist:
-        # If a custom model does not exist for the user, create an empty one
-        custom_model_instance = custom_model()
-    finally:
-        for (
-            field
-        ) in custom_model_instance._meta.fields:
-
-            if isinstance(
-                field, (models.BooleanField, models.CharField, models.TextField)
-            ):
-                context_element = {
-                    field.name: getattr(custom_model_instance, field.name, "")
-                }
-                context.update(context_element)
+    # If a custom model does not exist for the user, create an empty one
+    custom_model_instance = custom_model.get_for_user(user) or custom_model()
+    for (
+        field
+    ) in custom_model_instance._meta.fields:
+
+        if isinstance(
+            field, (models.BooleanField, models.CharField, models.TextField)
+        ):
+            context_element = {
+                field.name: getattr(custom_model_instance, field.name, "")
+            }
+            context.update(context_element)
 
 
 def update_context_with_grades(
-    user, course, context, nau_certs_settings, user_certificate, certificate_language
+    user, course, context, compiled_settings, user_certificate
 ):
     """
-    Updates certifcates context with grades data for the user
+    Updates certifcates context with grades data for the user, given the compiled
+    `nau_certs_settings` of the course.
     """
     # always add `user certificate` grade context
     context.update(
@@ -80,9 +79,9 @@ def update_context_with_grades(
         }
     )
 
-    if nau_certs_settings.get("calculate_grades_context", False):
+    if compiled_settings.calculate_grades_context:
         try:
-            grades = get_course_grades(user, course)
+            grades = get_course_grade_summary(user, course)
             # The `grades.percent` is a number from 0 to 1.
             grade_percent = grades.percent
             # grade_percent = 0.641
@@ -102,21 +101,17 @@ def update_context_with_grades(
         else:
             context.update(context_element)
 
-        course_qualitative_grade_config = nau_certs_settings.get(
-            "course_qualitative_grade"
-        )
-        if course_qualitative_grade_config:
+        if compiled_settings.has_qualitative_grade:
             course_qualitative_grade(
                 user,
                 course,
                 context,
-                course_qualitative_grade_config,
-                certificate_language,
+                compiled_settings,
             )
 
 
 def course_qualitative_grade(
-    user, course, context, course_qualitative_grade_config, certificate_language
+    user, course, context, compiled_settings
 ):
     """
     Custom per course qualitative grade generator.
@@ -176,21 +171,10 @@ on scale from 0 to 10 and a qualitative grade of {course_grade_qualitative}."
     },
 
     """
+    certificate_language = compiled_settings.certificate_language
     grade_rounded = None
     try:
-        grade_round_format = course_qualitative_grade_config.get("grade_round_format")
-
-        # prefix with `{` if not already has that character
-        if grade_round_format[0] != "{":
-            grade_round_format = "{" + grade_round_format
-
-        # suffix with `}` if not already has that character
-        if grade_round_format[len(grade_round_format) - 1] != "}":
-            grade_round_format += "}"
-
-        grade_rounded = grade_round_format.format(**context)
-        # clear `%` caracter
-        grade_rounded = grade_rounded.replace("%", "")
+        grade_rounded = compiled_settings.round_grade(context)
     except Exception:  # pylint: disable=broad-except
         log.error(
             "Could not round the course grade for qualitative grade scale for "
@@ -208,11 +192,10 @@ on scale from 0 to 10 and a qualitative grade of {course_grade_qualitative}."
         {"course_grade_rounded": format_grade(grade_rounded, certificate_language)}
     )
 
-    qualitative_grade = get_qualitative_grade(
+    qualitative_grade = lookup_qualitative_grade(
         user,
         course,
-        certificate_language,
-        course_qualitative_grade_config.get("ranges", []),
+        compiled_settings,
         grade_rounded,
     )
     if qualitative_grade:
@@ -239,24 +222,39 @@ def get_qualitative_grade(
     """
     Returns a qualitative grade for the rounded grade given the course qualitative ranges settings.
     """
+    compiled_settings = CompiledCertificateSettings(
+        {"course_qualitative_grade": {"ranges": course_qualitative_ranges_settings}},
+        certificate_language,
+    )
+    return lookup_qualitative_grade(user, course, compiled_settings, grade_rounded)
+
+
+def get_qualitative_grades(
+    certificate_language,
+    course_qualitative_ranges_settings,
+    grades_rounded,
+):
+    """
+    Returns the qualitative grades of a list of rounded grades given the course qualitative
+    ranges settings, with None for the grades without a qualitative grade.
+
+    Useful to regenerate or report the certificates of a whole course.
+    """
+    compiled_settings = CompiledCertificateSettings(
+        {"course_qualitative_grade": {"ranges": course_qualitative_ranges_settings}},
+        certificate_language,
+    )
+    return compiled_settings.get_qualitative_grades(grades_rounded)
+
+
+def lookup_qualitative_grade(user, course, compiled_settings, grade_rounded):
+    """
+    Returns a qualitative grade for the rounded grade given the compiled settings of the course.
+    """
     try:
-        grade_rounded_f = float(grade_rounded)
-        for qualitative_range in course_qualitative_ranges_settings:
-            min_included = float(qualitative_range.get("min_included", -1.0))
-            max_excluded = float(qualitative_range.get("max_excluded", -1.0))
-            if min_included <= grade_rounded_f < max_excluded:
-                grade_text = qualitative_range.get("grade_text", {})
-                if isinstance(grade_text, dict):
-                    # use certificate language to use correct grade text translation
-                    grade_text = grade_text.get(certificate_language.lower())
-                    if not grade_text:
-                        # or use the default platform language
-                        grade_text = grade_text.get(settings.LANGUAGE_CODE)
-                else:
-                    # if not a dict, probably it's already a string
-                    grade_text = str(grade_text)
-                if grade_text:
-                    return grade_text
+        qualitative_grade = compiled_settings.get_qualitative_grade(grade_rounded)
+        if qualitative_grade:
+            return qualitative_grade
         log.warning(
             "Could not find any qualitative grade for user %s in course %s",
             user.username,
@@ -279,10 +277,15 @@ def update_context_with_interpolated_strings(
     Updates certificate context using custom interpolated strings.
     Applies the corresponding translation before updating the context.
     """
-    interpolated_strings = get_interpolated_strings(
-        nau_cert_settings, certificate_language
+    apply_interpolated_strings(
+        context, get_interpolated_strings(nau_cert_settings, certificate_language)
     )
 
+
+def apply_interpolated_strings(context, interpolated_strings):
+    """
+    Updates certificate context with the interpolated strings already on the certificate language.
+    """
     if interpolated_strings:
         for key, value in six.iteritems(interpolated_strings):
             try:
@@ -298,27 +301,3 @@ def update_context_with_interpolated_strings(
                 continue
             else:
                 context.update({key: formatted_string})
-
-
-def get_interpolated_strings(nau_cert_settings, certificate_language):
-    """
-    Returns a dict with custom interpolated strings available for a certificate language.
-    Returns an empty dict if it cant find a string for the given language.
-    """
-    lang_interpolated_strings = {}
-    multilang_interpolated_strings = nau_cert_settings.get("interpolated_strings")
-    if multilang_interpolated_strings:
-        for key, value in six.iteritems(multilang_interpolated_strings):
-            try:
-                for lang, string in six.iteritems(value):
-                    if lang in certificate_language:
-                        lang_interpolated_strings[key] = string
-                        break
-            except AttributeError:
-                log.error(
-                    "Failed to read (%s) as formatted string in the certificate context",
-                    key,
-                )
-                continue
-
-    return lang_interpolated_strings
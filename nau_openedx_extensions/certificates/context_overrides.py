@@ -2,20 +2,151 @@
 This file defines overrides of the context render of course certificates using an Open edX Filters pipeline step.
 """
 
+import copy
+import hashlib
+import json
 import logging
+from types import MappingProxyType
 
+from django.conf import settings
 from openedx_filters import PipelineStep
 
-from nau_openedx_extensions.edxapp_wrapper.cohort import get_cohort
+from nau_openedx_extensions.edxapp_wrapper.cohort import get_cohort, get_cohort_name
+from nau_openedx_extensions.utils.lru_cache import LRUCache
 
 log = logging.getLogger(__name__)
 
+_compiled_cohort_overrides_cache = LRUCache(
+    getattr(settings, "NAU_CERTIFICATES_SETTINGS_CACHE_SIZE", 512)
+)
+
+
+def deep_merge(base, overrides):
+    """
+    Returns a new dict with the `overrides` merged on the `base`, merging the nested dicts.
+    """
+    merged = dict(base) if isinstance(base, dict) else {}
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def freeze(value):
+    """
+    Returns a read only version of the value, so a compiled override can't be changed by a render.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """
+    Returns a plain copy of a frozen value, with dicts and lists that the templates can serialize
+    and change.
+    """
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def apply_layer(context, layer):
+    """
+    Apply the read only override layer of a cohort on the context. The nested dicts of the layer are
+    deep merged with the values of the context, so a cohort can override only some of their keys.
+    """
+    for key, value in layer.items():
+        value = thaw(value)
+        if isinstance(value, dict) and isinstance(context.get(key), dict):
+            value = deep_merge(context[key], value)
+        context[key] = value
+
+
+class CompiledCohortOverrides:
+    """
+    The `cohort_overrides` of a course compiled into a read only override layer per cohort.
+
+    The layers don't depend on the context of a render, they are merged with it by `apply_layer`.
+    """
+
+    def __init__(self, cohort_overrides):
+        self.errors = []
+        self.layers = {
+            cohort_name: freeze(overrides)
+            for cohort_name, overrides in cohort_overrides.items()
+            if self._is_valid(cohort_name, overrides)
+        }
+        if self.errors:
+            # compiled once per version of the cohort overrides, so it's only logged once
+            log.error("Invalid certificates context cohort_overrides: %s", "; ".join(self.errors))
+
+    def _is_valid(self, cohort_name, overrides):
+        """
+        If the overrides of the cohort can be applied, recording the error when they can't.
+        """
+        if not isinstance(overrides, dict):
+            self.errors.append(
+                "The cohort_overrides of the cohort '{}' aren't a dict".format(cohort_name)
+            )
+            return False
+        return True
+
+    def get_layer(self, cohort_name):
+        """
+        The read only override layer of the cohort, or None if the cohort doesn't have overrides.
+        """
+        return self.layers.get(cohort_name)
+
+
+def get_cohort_overrides_hash(cohort_overrides):
+    """
+    Returns a hash of the `cohort_overrides`, that changes when the course publishes new ones.
+    """
+    serialized = json.dumps(cohort_overrides, sort_keys=True, default=str)
+    return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
+
+
+def get_compiled_cohort_overrides(context):
+    """
+    Returns the compiled `cohort_overrides` of the course of the certificate context, cached by
+    the hash of the cohort overrides.
+    """
+    cohort_overrides = context["cohort_overrides"]
+    key = (str(context["course_id"]), get_cohort_overrides_hash(cohort_overrides))
+    compiled_overrides = _compiled_cohort_overrides_cache.get(key)
+    if compiled_overrides is None:
+        compiled_overrides = CompiledCohortOverrides(cohort_overrides)
+        _compiled_cohort_overrides_cache.set(key, compiled_overrides)
+    return compiled_overrides
+
+
+def get_user_cohort_name(context):
+    """
+    The cohort name of the certificate user, read by the user id of the context when it has one,
+    so the user doesn't need to be read again.
+    """
+    user_id = context.get("accomplishment_user_id")
+    if user_id is not None:
+        return get_cohort_name(user_id, context["course_id"])
+    cohort = get_cohort(context["username"], context["course_id"])
+    return cohort.name if cohort else None
+
 
 class CertificatesContextCohortOverride(PipelineStep):
     """
     Override the certificates render template context with information from the student cohort.
     If user has a cohort and that cohort has custom certificate overrides, then override the root context variables
-    with the cohorted ones.
+    with the cohorted ones. The nested dicts are merged, so a cohort can override only some of their keys.
+
+    The overrides of all the cohorts of a course are compiled once for each version of the cohort overrides, so
+    each render only copies the overrides of the user cohort to the context.
 
     Example usage:
     Add the following configurations to your configuration file:
@@ -45,19 +176,20 @@ class CertificatesContextCohortOverride(PipelineStep):
         """
         username = context["username"]
         course_key = context["course_id"]
-        if "cohort_overrides" in context:
-            cohort = get_cohort(username, course_key)
-            if cohort:
-                if cohort.name in context["cohort_overrides"]:
-                    cohort_override_dict = context["cohort_overrides"][cohort.name]
-                    context.update(cohort_override_dict)
+        if context.get("cohort_overrides"):
+            cohort_name = get_user_cohort_name(context)
+            if cohort_name:
+                cohort_override_layer = get_compiled_cohort_overrides(context).get_layer(cohort_name)
+                if cohort_override_layer is not None:
+                    # a plain copy, so the next pipeline steps and the template can't change the layer
+                    apply_layer(context, cohort_override_layer)
                 else:
                     log.info(
                         "The user '%s' enrollment on course '%s' doesn't have a cohort "
                         "certificate context overrides configured for the cohort '%s'.",
                         username,
                         course_key,
-                        cohort.name,
+                        cohort_name,
                     )
             else:
                 log.info(
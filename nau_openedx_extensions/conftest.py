@@ -0,0 +1,11 @@
+"""
+Pytest configuration of the nau_openedx_extensions tests.
+"""
+import django
+
+
+def pytest_configure():
+    """
+    Load the Django apps, so the tests can import the models.
+    """
+    django.setup()
@@ -6,7 +6,6 @@ from __future__ import absolute_import, unicode_literals
 import logging
 
 from django.conf import settings
-from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.utils.translation import gettext as _
 
@@ -36,22 +35,17 @@ def update_account_view(context, user, **kwargs):
     Updates the context from the student account view
     """
     extended_profile_fields = []
-    custom_model_instance = None
-    try:
-        custom_model_instance = NauUserExtendedModel.objects.get(user=user)
-    except ObjectDoesNotExist:
-        # If a NauUserExtendedModel does not exist for the user, create an empty one
-        custom_model_instance = NauUserExtendedModel()
-    finally:
-        for field in get_fields(custom_model_instance):
-            extended_profile_fields.append(
-                {
-                    "field_name": _(field.name),  # pylint: disable=translation-of-non-string
-                    "field_label": _(field.verbose_name),  # pylint: disable=translation-of-non-string
-                    "field_type": "TextField" if not field.choices else "ListField",
-                    "field_options": [] if not field.choices else field.choices,
-                }
-            )
+    # If a NauUserExtendedModel does not exist for the user, create an empty one
+    custom_model_instance = NauUserExtendedModel.get_for_user(user) or NauUserExtendedModel()
+    for field in get_fields(custom_model_instance):
+        extended_profile_fields.append(
+            {
+                "field_name": _(field.name),  # pylint: disable=translation-of-non-string
+                "field_label": _(field.verbose_name),  # pylint: disable=translation-of-non-string
+                "field_type": "TextField" if not field.choices else "ListField",
+                "field_options": [] if not field.choices else field.choices,
+            }
+        )
 
     context["extended_profile_fields"].extend(extended_profile_fields)
 
@@ -60,26 +54,21 @@ def update_account_serializer(data, user, **kwargs):
     """
     Updates the data from the student account serializer
     """
-    custom_model_instance = None
-    try:
-        custom_model_instance = NauUserExtendedModel.objects.get(user=user)
-    except ObjectDoesNotExist:
-        # If a NauUserExtendedModel does not exist for the user, create an empty one
-        custom_model_instance = NauUserExtendedModel()
-    finally:
-        extended_profile = data.get("extended_profile", {})
+    # If a NauUserExtendedModel does not exist for the user, create an empty one
+    custom_model_instance = NauUserExtendedModel.get_for_user(user) or NauUserExtendedModel()
+    extended_profile = data.get("extended_profile", {})
 
-        custom_profile = []
-        for field in get_fields(custom_model_instance):
-            custom_profile.append(
-                {
-                    "field_name": field.name,
-                    "field_value": getattr(custom_model_instance, field.name, ""),
-                }
-            )
-        extended_profile.extend(custom_profile)
+    custom_profile = []
+    for field in get_fields(custom_model_instance):
+        custom_profile.append(
+            {
+                "field_name": field.name,
+                "field_value": getattr(custom_model_instance, field.name, ""),
+            }
+        )
+    extended_profile.extend(custom_profile)
 
-        data["extended_profile"] = extended_profile
+    data["extended_profile"] = extended_profile
 
 
 def partial_update(update, user, **kwargs):
@@ -87,18 +76,14 @@ def partial_update(update, user, **kwargs):
     Saves the data from the student account when something changes
     """
     if "extended_profile" in update:
-        custom_model_instance = None
-        try:
-            custom_model_instance = NauUserExtendedModel.objects.get(user=user)
-        except ObjectDoesNotExist:
-            # If a NauUserExtendedModel does not exist for the user, create an empty one
-            custom_model_instance = NauUserExtendedModel(user=user)
-        finally:
-            new_extended_profile = update["extended_profile"]
-
-            for field in new_extended_profile:
-                field_name = field["field_name"]
-                new_value = field["field_value"]
-                setattr(custom_model_instance, field_name, new_value)
-
-            custom_model_instance.save()
+        # If a NauUserExtendedModel does not exist for the user, create an empty one
+        custom_model_instance = NauUserExtendedModel.get_for_user(user) or NauUserExtendedModel(user=user)
+        new_extended_profile = update["extended_profile"]
+
+        for field in new_extended_profile:
+            field_name = field["field_name"]
+            new_value = field["field_value"]
+            setattr(custom_model_instance, field_name, new_value)
+
+        # saving also updates the request cache
+        custom_model_instance.save()
@@ -8,6 +8,7 @@ from django.conf import settings
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from edx_django_utils.cache import RequestCache
 
 # Backwards compatible settings.AUTH_USER_MODEL
 USER_MODEL = getattr(settings, "AUTH_USER_MODEL", "auth.User")  # lint-amnesty, pylint: disable=hard-coded-auth-user
@@ -80,12 +81,54 @@ class NauUserExtendedModel(models.Model):
         verbose_name=_("Allow newsletter"), default=False
     )
 
+    REQUEST_CACHE_NAMESPACE = "nau_openedx_extensions.nau_user_extended_model"
+
     def __str__(self):
         return "<Nau extended data for {}>".format(self.user.username)
 
     def date_joined(self):
         return self.user.date_joined
 
+    @classmethod
+    def get_for_user(cls, user):
+        """
+        Get the NAU extended data of the user, or None if the user doesn't have it.
+        The result is cached during the request, so the context extenders share a single query.
+        """
+        if not user.id:
+            return None
+        request_cache = RequestCache(cls.REQUEST_CACHE_NAMESPACE)
+        cached_response = request_cache.get_cached_response(user.id)
+        if cached_response.is_found:
+            return cached_response.value
+        nau_user_extended_model = cls.objects.filter(user=user).first()
+        request_cache.set(user.id, nau_user_extended_model)
+        return nau_user_extended_model
+
+    def save(self, *args, **kwargs):
+        """
+        Save and update the request cache with the saved instance.
+        """
+        request_cache = RequestCache(self.REQUEST_CACHE_NAMESPACE)
+        try:
+            super().save(*args, **kwargs)
+        except Exception:
+            # the cached instance may have been changed before the failed save, read it again
+            if self.user_id:
+                request_cache.delete(self.user_id)
+            raise
+        if self.user_id:
+            request_cache.set(self.user_id, self)
+
+    def delete(self, *args, **kwargs):
+        """
+        Delete and remove the instance from the request cache.
+        """
+        result = super().delete(*args, **kwargs)
+        if self.user_id:
+            RequestCache(self.REQUEST_CACHE_NAMESPACE).delete(self.user_id)
+        return result
+
 # Add more fields to the student profile download csv file.
 #
 # This feature requires that additional properties be configured on `STUDENT_FEATURES` list on file
@@ -6,25 +6,53 @@ import traceback
 
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
 from django.db.models import Q
+from opaque_keys.edx.keys import CourseKey
 from openedx.core.djangoapps.course_groups.cohorts import \
     get_cohort as edxapp_get_cohort  # pylint: disable=import-error
+from openedx.core.djangoapps.course_groups.cohorts import is_course_cohorted  # pylint: disable=import-error
+from openedx.core.djangoapps.course_groups.models import CohortMembership  # pylint: disable=import-error
 
 log = logging.getLogger(__name__)
 
 
-def get_cohort(username, course_key):
+def get_cohort(user, course_key):
     """
-    Get the Course Cohort for the User that belongs the username if available other case return None.
+    Get the Course Cohort for the User, or the User that belongs the username, if available other case return None.
     """
-    user = None
+    if isinstance(user, str):
+        username = user
+        user = None
+        # pylint: disable=broad-except
+        try:
+            user = User.objects.get(Q(username=username))
+        except Exception as e:
+            log.error(
+                "On get_cohort method error getting user %s, error: %s, stacktrace: %s",
+                username, str(e), traceback.format_exc(),
+            )
     # pylint: disable=broad-except
     try:
-        user = User.objects.get(Q(username=username))
+        return edxapp_get_cohort(user, course_key, assign=False, use_cached=False)
     except Exception as e:
-        log.error("On get_cohort method error getting user %s, error: %s, stacktrace: %s", username, str(e), traceback.format_exc())
+        log.error("On get_cohort method error getting cohort course_key: %s, error: %s, stacktrace: %s", course_key, str(e), traceback.format_exc())
+        return None
+
+
+def get_cohort_name(user_id, course_key):
+    """
+    Get the name of the Course Cohort of the user with the id if available other case return None.
+
+    Reads the cohort membership by the user id, so the user doesn't need to be read.
+    """
     # pylint: disable=broad-except
     try:
-        return edxapp_get_cohort(user, course_key, assign=False, use_cached=False)
+        if isinstance(course_key, str):
+            course_key = CourseKey.from_string(course_key)
+        if not is_course_cohorted(course_key):
+            return None
+        return CohortMembership.objects.filter(
+            course_id=course_key, user_id=user_id
+        ).values_list("course_user_group__name", flat=True).first()
     except Exception as e:
-        log.error("On get_cohort method error getting cohort course_key: %s, error: %s, stacktrace: %s", course_key, str(e), traceback.format_exc())
+        log.error("On get_cohort_name method error getting cohort course_key: %s, error: %s, stacktrace: %s", course_key, str(e), traceback.format_exc())
         return None
@@ -3,7 +3,14 @@ Cohort abstraction backend
 """
 
 
-def get_cohort(username, course_key):  # pylint: disable=unused-argument
+def get_cohort(user, course_key):  # pylint: disable=unused-argument
+    """
+    For tests.
+    """
+    return None
+
+
+def get_cohort_name(user_id, course_key):  # pylint: disable=unused-argument
     """
     For tests.
     """
@@ -3,7 +3,7 @@
 import logging
 
 from cms.djangoapps.models.settings.course_metadata import CourseMetadata  # pylint: disable=import-error
-from common.lib.xmodule.xmodule.modulestore.django import modulestore  # pylint: disable=import-error
+from common.lib.xmodule.xmodule.modulestore.django import SignalHandler, modulestore  # pylint: disable=import-error
 
 log = logging.getLogger(__name__)
 
@@ -26,3 +26,8 @@ def get_course_name(course_id):
     except Exception as e:  # pylint: disable=broad-except
         log.error(f'Error fetching course {course_id} for {e}')
         return ""
+
+
+def get_course_published_signal():
+    """Get the signal sent when a course is published."""
+    return SignalHandler.course_published
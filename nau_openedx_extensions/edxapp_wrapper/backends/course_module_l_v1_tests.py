@@ -1,8 +1,15 @@
 """ Course block backend abstraction for tests"""
 
-from unittest.mock import Mock
+from django.dispatch import Signal
+
+COURSE_PUBLISHED = Signal()
 
 
 def get_other_course_settings(course_id):   # pylint: disable=unused-argument
-    """Get Other Course Settings Mock."""
-    return Mock()
+    """Get Other Course Settings Mock, with an enrollment domain filter."""
+    return {"value": {"filter_enrollment_by_domain_list": ["test.com"]}}
+
+
+def get_course_published_signal():
+    """Get the course published signal for tests."""
+    return COURSE_PUBLISHED
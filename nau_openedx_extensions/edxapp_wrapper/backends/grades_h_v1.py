@@ -2,6 +2,7 @@
 from __future__ import absolute_import, unicode_literals
 
 from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory  # pylint: disable=import-error
+from openedx.core.djangoapps.signals.signals import COURSE_GRADE_CHANGED  # pylint: disable=import-error
 
 
 def get_course_grades(user, course):
@@ -11,3 +12,10 @@ def get_course_grades(user, course):
     grades = CourseGradeFactory().read(user, course)
 
     return grades
+
+
+def get_course_grade_changed_signal():
+    """
+    Gets the signal sent when the course grade of a student changes
+    """
+    return COURSE_GRADE_CHANGED
@@ -0,0 +1,20 @@
+""" Grades backend abstraction for tests """
+from __future__ import absolute_import, unicode_literals
+
+from django.dispatch import Signal
+
+COURSE_GRADE_CHANGED = Signal()
+
+
+def get_course_grades(user, course):  # pylint: disable=unused-argument
+    """
+    For tests.
+    """
+    return None
+
+
+def get_course_grade_changed_signal():
+    """
+    For tests.
+    """
+    return COURSE_GRADE_CHANGED
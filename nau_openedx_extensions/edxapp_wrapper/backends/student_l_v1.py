@@ -2,17 +2,24 @@
 Real implementation on getting a student course enrollment allowed.
 """
 from common.djangoapps.student.models import CourseEnrollmentAllowed  # pylint: disable=import-error
+from django.db.models import Q
 
 
-def get_student_course_enrollment_allowed(user, course_id, *args, **kwargs):
+def get_course_enrollments_allowed(emails, user_ids, course_id, *args, **kwargs):
     """
-    Return configuration value for the key specified as name argument.
+    Return the course enrollments allowed on the course of the emails, or linked to the user
+    accounts like `CourseEnrollmentAllowed.for_user`, with a single query.
 
     Args:
-        val_name (str): Name of the key for which to return configuration value.
-        default: default value tp return if key is not found in the configuration
+        emails (list): The emails to check.
+        user_ids (list): The ids of the users to check.
+        course_id: The course key.
 
     Returns:
-        Configuration value for the given key.
+        A list with the `(email, user_id)` of the course enrollments allowed.
     """
-    return CourseEnrollmentAllowed.for_user(user).filter(course_id=course_id).first()
+    return list(
+        CourseEnrollmentAllowed.objects.filter(
+            Q(email__in=emails) | Q(user_id__in=user_ids), course_id=course_id
+        ).values_list("email", "user_id")
+    )
@@ -3,15 +3,11 @@ Mock implementation on getting a student course enrollment allowed.
 """
 
 
-def get_student_course_enrollment_allowed(user, course_id, *args, **kwargs):  # pylint: disable=unused-argument
+def get_course_enrollments_allowed(emails, user_ids, course_id, *args, **kwargs):  # pylint: disable=unused-argument
     """
-    Return configuration value for the key specified as name argument.
-
-    Args:
-        val_name (str): Name of the key for which to return configuration value.
-        default: default value tp return if key is not found in the configuration
+    Return the course enrollments allowed on the course of the emails or of the users.
 
     Returns:
-        Configuration value for the given key.
+        A list with the `(email, user_id)` of the course enrollments allowed.
     """
-    return None
+    return []
@@ -1,8 +1,14 @@
 """
 Real implementation of user id verifications service.
 """
+from datetime import datetime, timedelta
+
+from common.djangoapps.student.models import CourseEnrollment  # pylint: disable=import-error
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef, Q
 from lms.djangoapps.verify_student.models import ManualVerification  # pylint: disable=import-error
+from pytz import UTC
 
 
 def get_user_id_verifications(user_id, *args, **kwargs):
@@ -19,15 +25,107 @@ def get_user_id_verifications(user_id, *args, **kwargs):
     return ManualVerification.objects.filter(user=user).order_by('-created_at')
 
 
+def has_active_user_id_verification(user_id, now=None):
+    """
+    Check if the user has a `ManualVerification` active at the datetime on the edx-platform.
+
+    The same as the `active_at_datetime` of the verifications, but on a single query by the
+    indexed user id.
+
+    Args:
+        user_id: The user id to check the Id Verifications.
+        now: The datetime that the verification should be active, defaults to now.
+
+    Returns:
+        If the user has an active Id Verification
+    """
+    return get_active_verifications(now or datetime.now(UTC)).filter(user_id=user_id).exists()
+
+
+def get_active_verifications(now):
+    """
+    The `ManualVerification` active at the datetime.
+    """
+    default_expiration_created_after = now - timedelta(days=settings.VERIFY_STUDENT["DAYS_GOOD_FOR"])
+    return ManualVerification.objects.filter(
+        Q(expiration_date__gt=now)
+        | Q(expiration_date__isnull=True, created_at__gt=default_expiration_created_after),
+        created_at__lte=now,
+    )
+
+
 def create_user_id_verification(user_id, *args, **kwargs):
     """
     Create a new `ManualVerification` on the edx-platform.
 
     Args:
         user: The user id that this Id verification should be created.
+        name: The user full name, when it's already known the user isn't read.
 
     Returns:
         The object created
     """
-    user = get_user_model().objects.get(id=user_id)
-    ManualVerification(user=user, name=user.profile.name, *args, **kwargs).save()
+    name = kwargs.pop("name", None)
+    if name is None:
+        name = get_user_model().objects.select_related("profile").get(id=user_id).profile.name
+    verification = ManualVerification(user_id=user_id, name=name, *args, **kwargs)
+    verification.save()
+    return verification
+
+
+def create_user_id_verifications(users, *args, **kwargs):
+    """
+    Create the `ManualVerification` of the users that don't have an active one on the edx-platform.
+
+    Args:
+        users: The `(user_id, name)` of the users, when the name is None it's read from the user profile.
+
+    Returns:
+        The number of objects created
+    """
+    names = dict(users)
+    verified_user_ids = set(
+        get_active_verifications(datetime.now(UTC)).filter(
+            user_id__in=list(names)
+        ).values_list("user_id", flat=True)
+    )
+    user_ids_without_name = [
+        user_id for user_id, name in names.items() if name is None and user_id not in verified_user_ids
+    ]
+    if user_ids_without_name:
+        names.update(
+            get_user_model().objects.filter(id__in=user_ids_without_name).values_list("id", "profile__name")
+        )
+    verifications = [
+        ManualVerification(user_id=user_id, name=name, *args, **kwargs)
+        for user_id, name in names.items()
+        # the users that don't exist anymore don't have a name
+        if user_id not in verified_user_ids and name is not None
+    ]
+    ManualVerification.objects.bulk_create(verifications)
+    return len(verifications)
+
+
+def get_users_without_active_id_verification(enrollment_modes, now=None):
+    """
+    Read the users with an active enrollment on the enrollment modes and without an active
+    `ManualVerification` on the edx-platform.
+
+    Both conditions are `EXISTS` subqueries, so the database computes the users.
+
+    Args:
+        enrollment_modes: The enrollment modes.
+        now: The datetime that the verification should be active, defaults to now.
+
+    Returns:
+        A queryset of the users
+    """
+    now = now or datetime.now(UTC)
+    return get_user_model().objects.annotate(
+        has_enrollment=Exists(
+            CourseEnrollment.objects.filter(user_id=OuterRef("pk"), is_active=True, mode__in=enrollment_modes)
+        ),
+        has_active_verification=Exists(
+            get_active_verifications(now).filter(user_id=OuterRef("pk"))
+        ),
+    ).filter(has_enrollment=True, has_active_verification=False)
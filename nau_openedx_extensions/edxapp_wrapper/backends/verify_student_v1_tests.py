@@ -1,6 +1,7 @@
 """
 Real implementation of user id verifications service.
 """
+from django.contrib.auth import get_user_model
 
 
 def get_user_id_verifications(user_id, *args, **kwargs):  # pylint: disable=unused-argument
@@ -15,6 +16,20 @@ def get_user_id_verifications(user_id, *args, **kwargs):  # pylint: disable=unus
     """
     return []
 
+
+def has_active_user_id_verification(user_id, *args, **kwargs):  # pylint: disable=unused-argument
+    """
+    Check if the user has an active `ManualVerification` on the edx-platform.
+
+    Args:
+        user_id: The user id to check the Id Verifications.
+
+    Returns:
+        If the user has an active Id Verification
+    """
+    return False
+
+
 def create_user_id_verification(user_id, *args, **kwargs):  # pylint: disable=unused-argument
     """
     Create a new `ManualVerification` on the edx-platform.
@@ -26,3 +41,30 @@ def create_user_id_verification(user_id, *args, **kwargs):  # pylint: disable=un
         The object created
     """
     return None
+
+
+def create_user_id_verifications(users, *args, **kwargs):  # pylint: disable=unused-argument
+    """
+    Create the `ManualVerification` of the users without an active one on the edx-platform.
+
+    Args:
+        users: The `(user_id, name)` of the users.
+
+    Returns:
+        The number of objects created
+    """
+    return 0
+
+
+def get_users_without_active_id_verification(enrollment_modes, *args, **kwargs):  # pylint: disable=unused-argument
+    """
+    Read the users with an active enrollment on the enrollment modes and without an active
+    `ManualVerification` on the edx-platform.
+
+    Args:
+        enrollment_modes: The enrollment modes.
+
+    Returns:
+        A queryset of the users
+    """
+    return get_user_model().objects.none()
@@ -1,15 +1,40 @@
 """ CourseMetadata backend abstraction """
 
-from importlib import import_module
-
 from django.conf import settings
+from django.core.cache import cache
+from edx_django_utils.cache import RequestCache
+
+from nau_openedx_extensions.edxapp_wrapper.registry import get_backend_function
+
+COHORT_NAME_CACHE_KEY = "nau_openedx_extensions.cohort_name.{user_id}.{course_key}"
+COHORT_NAME_REQUEST_CACHE_NAMESPACE = "nau_openedx_extensions.cohort_name"
+# cached instead of None, so a user without a cohort is also cached
+NO_COHORT = ""
 
 
 def get_cohort(*args, **kwargs):
     """
     Get the Course Cohort for the User that belongs the username if available other case return None.
     """
-    backend_module = settings.NAU_COHORT_MODULE
-    backend = import_module(backend_module)
+    return get_backend_function("NAU_COHORT_MODULE", "get_cohort")(*args, **kwargs)
+
 
-    return backend.get_cohort(*args, **kwargs)
+def get_cohort_name(user_id, course_key):
+    """
+    Get the name of the Course Cohort of the user with the id, or None if the user isn't in a cohort.
+
+    The name is cached during the request and for `NAU_COHORT_NAME_CACHE_TIMEOUT` seconds on the
+    shared cache, so a change of the user cohort may take that time to be seen.
+    """
+    key = COHORT_NAME_CACHE_KEY.format(user_id=user_id, course_key=course_key)
+    request_cache = RequestCache(COHORT_NAME_REQUEST_CACHE_NAMESPACE)
+    cached_response = request_cache.get_cached_response(key)
+    if cached_response.is_found:
+        return cached_response.value or None
+    cohort_name = cache.get(key)
+    if cohort_name is None:
+        cohort_name = get_backend_function("NAU_COHORT_MODULE", "get_cohort_name")(user_id, course_key)
+        cohort_name = cohort_name or NO_COHORT
+        cache.set(key, cohort_name, getattr(settings, "NAU_COHORT_NAME_CACHE_TIMEOUT", 300))
+    request_cache.set(key, cohort_name)
+    return cohort_name or None
@@ -1,21 +1,18 @@
 """ CourseMetadata backend abstraction """
 
-from importlib import import_module
-
-from django.conf import settings
+from nau_openedx_extensions.edxapp_wrapper.registry import get_backend_function
 
 
 def get_other_course_settings(*args, **kwargs):
     """ Get Other Course Settings """
-    backend_module = settings.NAU_COURSE_MODULE
-    backend = import_module(backend_module)
-
-    return backend.get_other_course_settings(*args, **kwargs)
+    return get_backend_function("NAU_COURSE_MODULE", "get_other_course_settings")(*args, **kwargs)
 
 
 def get_course_name(*args, **kwargs):
     """ Get course name """
-    backend_module = settings.NAU_COURSE_MODULE
-    backend = import_module(backend_module)
+    return get_backend_function("NAU_COURSE_MODULE", "get_course_name")(*args, **kwargs)
+
 
-    return backend.get_course_name(*args, **kwargs)
+def get_course_published_signal():
+    """ Get the signal sent when a course is published """
+    return get_backend_function("NAU_COURSE_MODULE", "get_course_published_signal")()
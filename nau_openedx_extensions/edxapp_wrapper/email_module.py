@@ -1,26 +1,16 @@
 """Email block backend abstraction."""
 
-from importlib import import_module
-
-from django.conf import settings
+from nau_openedx_extensions.edxapp_wrapper.registry import get_backend_function
 
 
 def get_email_target():
     """ Get has_access function from edx-platform"""
-
-    backend_module = settings.NAU_EMAIL_MODULE
-    backend = import_module(backend_module)
-
-    return backend.get_email_target()
+    return get_backend_function("NAU_EMAIL_MODULE", "get_email_target")()
 
 
 def get_target():
     """ Get has_access function from edx-platform"""
-
-    backend_module = settings.NAU_EMAIL_MODULE
-    backend = import_module(backend_module)
-
-    return backend.get_target()
+    return get_backend_function("NAU_EMAIL_MODULE", "get_target")()
 
 
 EMAIL_TARGETS = get_email_target()
@@ -1,15 +1,55 @@
 """ Grades backend abstraction """
 from __future__ import absolute_import, unicode_literals
 
-from importlib import import_module
+from collections import namedtuple
 
 from django.conf import settings
+from django.core.cache import cache
+
+from nau_openedx_extensions.edxapp_wrapper.registry import get_backend_function
+
+CourseGradeSummary = namedtuple("CourseGradeSummary", ["percent", "letter_grade", "passed"])
+
+COURSE_GRADE_SUMMARY_CACHE_KEY = "nau_openedx_extensions.course_grade_summary.{user_id}.{course_key}"
 
 
 def get_course_grades(*args, **kwargs):
     """ Gets course grades for a given student """
+    return get_backend_function("NAU_GRADES_MODULE", "get_course_grades")(*args, **kwargs)
+
+
+def get_course_grade_changed_signal():
+    """ Gets the signal sent when the course grade of a student changes """
+    return get_backend_function("NAU_GRADES_MODULE", "get_course_grade_changed_signal")()
+
+
+def get_course_grade_summary(user, course):
+    """
+    Gets the percent, letter grade and passed of the course grade of a student.
+
+    The summary is cached until the course grade of the student changes or the course is
+    published again, so the course grade isn't computed each time it's needed.
+    """
+    cache_key = COURSE_GRADE_SUMMARY_CACHE_KEY.format(user_id=user.id, course_key=course.id)
+    course_version = str(
+        getattr(course, "course_version", None) or getattr(course, "subtree_edited_on", None)
+    )
+    cached = cache.get(cache_key)
+    if cached and cached[0] == course_version:
+        return CourseGradeSummary(*cached[1])
+
+    grades = get_course_grades(user, course)
+    summary = CourseGradeSummary(grades.percent, grades.letter_grade, grades.passed)
+    cache.set(
+        cache_key,
+        (course_version, tuple(summary)),
+        getattr(settings, "NAU_COURSE_GRADE_SUMMARY_CACHE_TIMEOUT", 86400),
+    )
+    return summary
 
-    backend_module = settings.NAU_GRADES_MODULE
-    backend = import_module(backend_module)
 
-    return backend.get_course_grades(*args, **kwargs)
+def invalidate_course_grade_summary(sender, user, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Removes the cached course grade summary of a student when the course grade changes.
+    """
+    cache.delete(COURSE_GRADE_SUMMARY_CACHE_KEY.format(user_id=user.id, course_key=course_key))
@@ -1,27 +1,17 @@
 """ Registration backend abstraction """
 from __future__ import absolute_import, unicode_literals
 
-from importlib import import_module
-
-from django.conf import settings
+from nau_openedx_extensions.edxapp_wrapper.registry import get_backend_function
 
 
 def get_registration_extension_form(*args, **kwargs):
     """ Gets the registration extension form """
-
-    backend_module = settings.NAU_REGISTRATION_MODULE
-    backend = import_module(backend_module)
-
-    return backend.get_registration_extension_form(*args, **kwargs)
+    return get_backend_function("NAU_REGISTRATION_MODULE", "get_registration_extension_form")(*args, **kwargs)
 
 
 def get_edx_saml_identity_provider(*args, **kwargs):
     """ Gets the registration extension form """
-
-    backend_module = settings.NAU_REGISTRATION_MODULE
-    backend = import_module(backend_module)
-
-    return backend.get_edx_saml_identity_provider(*args, **kwargs)
+    return get_backend_function("NAU_REGISTRATION_MODULE", "get_edx_saml_identity_provider")(*args, **kwargs)
 
 
 EdXSAMLIdentityProvider = get_edx_saml_identity_provider()
@@ -0,0 +1,36 @@
+"""
+Registry of the edxapp backends.
+
+Each backend module configured on a `NAU_*_MODULE` setting is imported once, and its functions
+are kept so the wrappers call them directly. The registry is cleared when the settings change,
+e.g. with `override_settings` on the tests.
+"""
+from importlib import import_module
+
+from django.conf import settings
+from django.core.signals import setting_changed
+
+_backend_functions = {}
+
+
+def get_backend_function(setting_name, function_name):
+    """
+    Get the function of the backend module configured on the `setting_name` setting.
+    """
+    try:
+        return _backend_functions[(setting_name, function_name)]
+    except KeyError:
+        backend = import_module(getattr(settings, setting_name))
+        function = getattr(backend, function_name)
+        _backend_functions[(setting_name, function_name)] = function
+        return function
+
+
+def clear_backends(**kwargs):
+    """
+    Forget the resolved backends, so they are imported again with the current settings.
+    """
+    _backend_functions.clear()
+
+
+setting_changed.connect(clear_backends, dispatch_uid="nau_openedx_extensions.edxapp_wrapper.registry")
@@ -2,17 +2,11 @@
 Make it more easy to mock the way that open edx allows to get the site configurations inside the
 edxapp.
 """
-from importlib import import_module
-
-from django.conf import settings
+from nau_openedx_extensions.edxapp_wrapper.registry import get_backend_function
 
 
 def get_value(*args, **kwargs):
     """
     Get correct site configuration helper module.
     """
-
-    backend_module = settings.NAU_SITE_CONFIGURATION_HELPERS_MODULE
-    backend = import_module(backend_module)
-
-    return backend.get_value(*args, **kwargs)
+    return get_backend_function("NAU_SITE_CONFIGURATION_HELPERS_MODULE", "get_value")(*args, **kwargs)
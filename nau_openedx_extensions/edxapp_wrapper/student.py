@@ -3,19 +3,14 @@ Student backend abstraction
 """
 from __future__ import absolute_import, unicode_literals
 
-from importlib import import_module
+from nau_openedx_extensions.edxapp_wrapper.registry import get_backend_function
 
-from django.conf import settings
 
-
-def get_student_course_enrollment_allowed(user, course_id, *args, **kwargs):
+def get_course_enrollments_allowed(emails, user_ids, course_id, *args, **kwargs):
     """
-    Gets the student CourseEnrollmentAllowed class from the edx-platform.
-    This class represents an user represented by its email address that is
-    allowed to enroll in a course.
+    Gets the email and user id of the student CourseEnrollmentAllowed on the course of
+    the emails or of the users, with a single query.
     """
-
-    backend_module = settings.NAU_STUDENT_MODULE
-    backend = import_module(backend_module)
-
-    return backend.get_student_course_enrollment_allowed(user, course_id, *args, **kwargs)
+    return get_backend_function("NAU_STUDENT_MODULE", "get_course_enrollments_allowed")(
+        emails, user_ids, course_id, *args, **kwargs
+    )
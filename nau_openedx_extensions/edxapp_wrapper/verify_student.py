@@ -3,27 +3,45 @@ Student backend abstraction
 """
 from __future__ import absolute_import, unicode_literals
 
-from importlib import import_module
-
-from django.conf import settings
+from nau_openedx_extensions.edxapp_wrapper.registry import get_backend_function
 
 
 def get_user_id_verifications(user_id, *args, **kwargs):
     """
     Read the user's `ManualVerification` from the edx-platform.
     """
+    return get_backend_function("NAU_VERIFY_STUDENT_MODULE", "get_user_id_verifications")(user_id, *args, **kwargs)
 
-    backend_module = settings.NAU_VERIFY_STUDENT_MODULE
-    backend = import_module(backend_module)
 
-    return backend.get_user_id_verifications(user_id, *args, **kwargs)
+def has_active_user_id_verification(user_id, *args, **kwargs):
+    """
+    Check if the user has an active `ManualVerification` on the edx-platform.
+    """
+    return get_backend_function("NAU_VERIFY_STUDENT_MODULE", "has_active_user_id_verification")(
+        user_id, *args, **kwargs
+    )
 
 
 def create_user_id_verification(user_id, *args, **kwargs):
     """
     Create an user Id Verification `ManualVerification` instance on the edx-platform.
     """
-    backend_module = settings.NAU_VERIFY_STUDENT_MODULE
-    backend = import_module(backend_module)
+    return get_backend_function("NAU_VERIFY_STUDENT_MODULE", "create_user_id_verification")(user_id, *args, **kwargs)
+
+
+def create_user_id_verifications(users, *args, **kwargs):
+    """
+    Create the user Id Verification `ManualVerification` instances of the users that don't have an active one
+    on the edx-platform.
+    """
+    return get_backend_function("NAU_VERIFY_STUDENT_MODULE", "create_user_id_verifications")(users, *args, **kwargs)
+
 
-    return backend.create_user_id_verification(user_id, *args, **kwargs)
+def get_users_without_active_id_verification(enrollment_modes, *args, **kwargs):
+    """
+    Gets the users with an active enrollment on the enrollment modes and without an active Id Verification
+    `ManualVerification` on the edx-platform.
+    """
+    return get_backend_function("NAU_VERIFY_STUDENT_MODULE", "get_users_without_active_id_verification")(
+        enrollment_modes, *args, **kwargs
+    )
@@ -0,0 +1,66 @@
+"""
+Matcher of email domains against a list of allowed domains.
+"""
+
+
+class DomainMatcher:
+    """
+    Check if an email domain is allowed by a list of domains, compiled once to sets of domain
+    suffixes so each check only looks up the suffixes of the email domain.
+
+    Each entry of the list can be:
+        - `example.com`: allows the domain and all its sub-domains.
+        - `*.example.com`: allows only the sub-domains of the domain.
+        - `!example.com` or `!*.example.com`: excludes the domain and its sub-domains, or only
+          its sub-domains, from the allowed domains.
+
+    The most specific entry wins, and an exclusion wins over an allowed entry of the same domain.
+    """
+
+    def __init__(self, domains):
+        self.allowed_domains = set()
+        self.allowed_parent_domains = set()
+        self.excluded_domains = set()
+        self.excluded_parent_domains = set()
+        for domain in domains:
+            domain = domain.strip().lower()
+            excluded = domain.startswith("!")
+            if excluded:
+                domain = domain[1:]
+            only_sub_domains = domain.startswith("*.")
+            if only_sub_domains:
+                domain = domain[2:]
+            if not domain:
+                continue
+            if excluded:
+                if not only_sub_domains:
+                    self.excluded_domains.add(domain)
+                self.excluded_parent_domains.add(domain)
+            else:
+                if not only_sub_domains:
+                    self.allowed_domains.add(domain)
+                self.allowed_parent_domains.add(domain)
+
+    def is_allowed(self, domain):
+        """
+        Check if the domain is allowed, looking up from the whole domain to its top level domain.
+        """
+        domain = domain.lower()
+        if domain in self.excluded_domains:
+            return False
+        if domain in self.allowed_domains:
+            return True
+        labels = domain.split(".")
+        for index in range(1, len(labels)):
+            parent_domain = ".".join(labels[index:])
+            if parent_domain in self.excluded_parent_domains:
+                return False
+            if parent_domain in self.allowed_parent_domains:
+                return True
+        return False
+
+    def is_email_allowed(self, email):
+        """
+        Check if the domain of the email is allowed.
+        """
+        return self.is_allowed(email.rsplit("@", 1)[-1])
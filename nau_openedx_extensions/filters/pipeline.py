@@ -1,17 +1,58 @@
 """
 Defined filters.
 """
-
-from fnmatch import fnmatch
+from collections import namedtuple
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.translation import gettext as _
 from openedx_filters import PipelineStep
 from openedx_filters.learning.filters import CourseEnrollmentStarted
 
 from nau_openedx_extensions.edxapp_wrapper import site_configuration_helpers as configuration_helpers
 from nau_openedx_extensions.edxapp_wrapper.course_module import get_other_course_settings
-from nau_openedx_extensions.edxapp_wrapper.student import get_student_course_enrollment_allowed
+from nau_openedx_extensions.edxapp_wrapper.student import get_course_enrollments_allowed
+from nau_openedx_extensions.filters.domain_matcher import DomainMatcher
+
+ENROLLMENT_DOMAIN_FILTER_CACHE_KEY = "nau_openedx_extensions.enrollment_domain_filter.{course_key}"
+
+
+def get_enrollment_domain_filter_settings(course_key):
+    """
+    Get the allowed domains, compiled to a `DomainMatcher`, and the custom exception message of the
+    enrollment domain filter of the course, from its other course settings.
+
+    They are cached until the course is published again, so the courses without a domain filter
+    only cost a cache hit.
+    """
+    cache_key = ENROLLMENT_DOMAIN_FILTER_CACHE_KEY.format(course_key=course_key)
+    domain_filter_settings = cache.get(cache_key)
+    if domain_filter_settings is None:
+        other_course_settings_value = get_other_course_settings(course_key).get("value", {})
+        domains_allowed = other_course_settings_value.get("filter_enrollment_by_domain_list")
+        custom_message = None
+        if domains_allowed:
+            custom_message = other_course_settings_value.get(
+                "filter_enrollment_by_domain_custom_exception_message"
+            )
+        domain_filter_settings = {
+            "domains_allowed": list(domains_allowed or []),
+            "domain_matcher": DomainMatcher(domains_allowed or []),
+            "custom_message": custom_message,
+        }
+        cache.set(
+            cache_key,
+            domain_filter_settings,
+            getattr(settings, "NAU_ENROLLMENT_DOMAIN_FILTER_CACHE_TIMEOUT", 3600),
+        )
+    return domain_filter_settings
+
+
+def invalidate_enrollment_domain_filter_settings(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Remove the cached enrollment domain filter settings of the course when it's published.
+    """
+    cache.delete(ENROLLMENT_DOMAIN_FILTER_CACHE_KEY.format(course_key=course_key))
 
 
 class FilterEnrollmentByDomain(PipelineStep):   # pylint: disable=too-few-public-methods
@@ -26,6 +67,9 @@ class FilterEnrollmentByDomain(PipelineStep):   # pylint: disable=too-few-public
     the course. If this happens, the user needs to activate their account before the instructor
     could create the enrollment.
 
+    Each allowed domain also allows its sub-domains, a `*.` prefix allows only the sub-domains and
+    a `!` prefix excludes a domain, see `DomainMatcher`.
+
     Example usage:
     Add the following configurations to your configuration file:
         "OPEN_EDX_FILTERS_CONFIG": {
@@ -41,39 +85,85 @@ class FilterEnrollmentByDomain(PipelineStep):   # pylint: disable=too-few-public
     def run_filter(self, user, course_key, mode):   # pylint: disable=unused-argument, arguments-differ
         """Filter."""
 
-        other_course_settings = get_other_course_settings(course_key)
-        domains_allowed = other_course_settings.get("value", {}).get("filter_enrollment_by_domain_list")
-
-        if domains_allowed:
-            if not user.is_active:
-                platform_name = configuration_helpers.get_value("platform_name", settings.PLATFORM_NAME)
-                exception_msg = _(
-                    "You need to activate your account before you can enroll in the course. "
-                    "Check your {email} inbox for an account activation link from {platform_name}."
-                ).format(email=user.email, platform_name=platform_name)
-                raise CourseEnrollmentStarted.PreventEnrollment(exception_msg)
-
-            cea = get_student_course_enrollment_allowed(user, course_key)
-            # if the student is allowed to enroll, skip checking the email domain
-            if not cea:
-                if not FilterEnrollmentByDomain._is_user_email_allowed(user, domains_allowed):
-                    custom_message = other_course_settings.get("value", {}).get(
-                        "filter_enrollment_by_domain_custom_exception_message",
-                        _("If you think this is an error, contact the course support."))
-                    exception_msg = _("You can't enroll on this course because your email domain is not allowed. "
-                                      "%(custom_message)s") % {
-                        'custom_message': custom_message}
-                    raise CourseEnrollmentStarted.PreventEnrollment(exception_msg)
+        validation, = validate_enrollments_by_domain([user], course_key)
+        if not validation.allowed:
+            raise CourseEnrollmentStarted.PreventEnrollment(validation.message)
 
         return {}
 
-    @staticmethod
-    def _is_user_email_allowed(user, domains_allowed):
-        """
-        Check if the user email is a domain or sub-domain of the allowed domains.
-        """
-        user_domain = user.email.split("@")[1].lower()
-        for domain in domains_allowed:
-            if user_domain == domain or fnmatch(user_domain, f"*.{domain}"):
-                return True
-        return False
+
+def get_inactive_account_message(email):
+    """
+    The message shown to a user that needs to activate the account before enrolling.
+    """
+    platform_name = configuration_helpers.get_value("platform_name", settings.PLATFORM_NAME)
+    return _(
+        "You need to activate your account before you can enroll in the course. "
+        "Check your {email} inbox for an account activation link from {platform_name}."
+    ).format(email=email, platform_name=platform_name)
+
+
+def get_email_domain_not_allowed_message(domain_filter_settings):
+    """
+    The message shown to a user with an email domain that isn't allowed by the course.
+    """
+    custom_message = domain_filter_settings["custom_message"] or _(
+        "If you think this is an error, contact the course support.")
+    return _("You can't enroll on this course because your email domain is not allowed. "
+             "%(custom_message)s") % {
+        'custom_message': custom_message}
+
+
+EnrollmentValidation = namedtuple("EnrollmentValidation", ["email", "allowed", "reason", "message"])
+
+INACTIVE_ACCOUNT = "inactive_account"
+EMAIL_DOMAIN_NOT_ALLOWED = "email_domain_not_allowed"
+
+
+def validate_enrollments_by_domain(users_or_emails, course_key):
+    """
+    Validate a list of users, or of emails of learners that may not have an account yet, against
+    the enrollment domain filter of the course, before bulk enrolling them. The
+    `FilterEnrollmentByDomain` step validates each enrollment with it.
+
+    The course settings are read once and the Course Enrollment Allowed of all the emails, and the
+    ones linked to the accounts of the users, are read with a single query.
+
+    Returns an `EnrollmentValidation` for each user or email, on the same order, with the
+    `reason` and `message` of why it's not allowed to enroll.
+    """
+    domain_filter_settings = get_enrollment_domain_filter_settings(course_key)
+    emails = [getattr(user_or_email, "email", user_or_email) for user_or_email in users_or_emails]
+    if not domain_filter_settings["domains_allowed"]:
+        return [EnrollmentValidation(email, True, None, None) for email in emails]
+
+    user_ids = [getattr(user_or_email, "id", None) for user_or_email in users_or_emails]
+    enrollments_allowed = get_course_enrollments_allowed(
+        emails, [user_id for user_id in user_ids if user_id is not None], course_key
+    )
+    enrollment_allowed_emails = {email.lower() for email, _ in enrollments_allowed}
+    # the enrollments allowed linked to the account of a user that changed the email
+    enrollment_allowed_user_ids = {user_id for _, user_id in enrollments_allowed if user_id is not None}
+    domain_matcher = domain_filter_settings["domain_matcher"]
+    validations = []
+    for user_or_email, email, user_id in zip(users_or_emails, emails, user_ids):
+        if not getattr(user_or_email, "is_active", True):
+            validations.append(
+                EnrollmentValidation(email, False, INACTIVE_ACCOUNT, get_inactive_account_message(email))
+            )
+        elif (
+            email.lower() in enrollment_allowed_emails
+            or user_id in enrollment_allowed_user_ids
+            or domain_matcher.is_email_allowed(email)
+        ):
+            validations.append(EnrollmentValidation(email, True, None, None))
+        else:
+            validations.append(
+                EnrollmentValidation(
+                    email,
+                    False,
+                    EMAIL_DOMAIN_NOT_ALLOWED,
+                    get_email_domain_not_allowed_message(domain_filter_settings),
+                )
+            )
+    return validations
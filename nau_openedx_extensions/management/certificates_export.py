@@ -0,0 +1,322 @@
+"""
+Helpers of the certificates export commands, to write the certificates csv file, to download the
+certificates and to keep the manifest of the exports.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import requests
+from pytz import UTC
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+PARTIAL_DOWNLOAD_SUFFIX = ".part"
+SINCE_LAST_EXPORT = "last_export"
+CSV_HEADER = [
+    "course_id",
+    "student email",
+    "student username",
+    "student name",
+    "certificate created date",
+    "certificate verify_uuid",
+    "certificate_web_link_url",
+    "certificate_download_pdf_link",
+]
+CERTIFICATE_FIELDS = (
+    "course_id",
+    "user__email",
+    "user__username",
+    "name",
+    "created_date",
+    "verify_uuid",
+)
+
+
+def write_certificates_csv(csv_file, certificates, certificate_download_pdf_url, get_lms_root_url):
+    """
+    Write a row for each certificate to the binary `csv_file`.
+
+    The `certificates` are tuples with the `CERTIFICATE_FIELDS`. The LMS root URL of each
+    organization is only read once, with the `get_lms_root_url` function.
+
+    Returns the number of certificates written.
+    """
+    lms_root_urls = {}
+    csv_text_file = io.TextIOWrapper(csv_file, encoding="utf-8", newline="")
+    csv_writer = csv.writer(csv_text_file)
+    csv_writer.writerow(CSV_HEADER)
+    certificates_count = 0
+    for course_key, email, username, name, created_date, verify_uuid in certificates:
+        if course_key.org not in lms_root_urls:
+            lms_root_urls[course_key.org] = get_lms_root_url(course_key.org)
+        lms_root_url = lms_root_urls[course_key.org]
+        certificates_count += 1
+        csv_writer.writerow(
+            [
+                str(course_key),
+                email,
+                username,
+                name,
+                created_date,
+                verify_uuid,
+                f"{lms_root_url}/certificates/{verify_uuid}",
+                certificate_download_pdf_url + verify_uuid,
+            ]
+        )
+    csv_text_file.flush()
+    csv_text_file.detach()
+    csv_file.seek(0)
+    return certificates_count
+
+
+def delete_recursive(folder):
+    """
+    Delete a folder recursively.
+    """
+    try:
+        shutil.rmtree(folder)
+    except FileNotFoundError:
+        # directory doesn't exist
+        pass
+
+
+def create_folder(path):
+    """
+    Crete a folder using the path.
+    """
+    try:
+        os.makedirs(path)
+    except FileExistsError:
+        # directory already exists
+        pass
+
+
+def get_response_filename(response, url):
+    """
+    Get the name of the downloaded file, by default use the filename header, otherwise the last
+    part of the URL.
+    """
+    if "content-disposition" in response.headers:
+        content_disposition = response.headers["content-disposition"]
+        return content_disposition.split("filename=")[1]
+    return url.split("/")[-1]
+
+
+def write_response(response, file):
+    """
+    Write the response content to the file, chunk by chunk.
+
+    Returns the size and the sha256 checksum of the content written.
+    """
+    size = 0
+    checksum = hashlib.sha256()
+    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+        file.write(chunk)
+        size += len(chunk)
+        checksum.update(chunk)
+    return size, checksum.hexdigest()
+
+
+def delete_partial_downloads(folder):
+    """
+    Delete the partial files left on the folder by the downloads of an interrupted export.
+    """
+    for filename in os.listdir(folder):
+        if filename.endswith(PARTIAL_DOWNLOAD_SUFFIX):
+            os.remove(os.path.join(folder, filename))
+
+
+def download_file(base_folder, url, session=None):
+    """
+    Download a file from an URL to a folder, by default use the filename header as the name of the
+    file.
+
+    The content is written to a partial file that is only renamed to the final name when the
+    download finishes, so a failed download never leaves a truncated file on the folder.
+
+    Returns a dict with the name, the ETag, the size and the checksum of the downloaded file.
+    """
+    session = session or requests
+    with session.get(url, timeout=60, stream=True) as response:
+        response.raise_for_status()
+        filename = get_response_filename(response, url)
+        path = base_folder + "/" + filename
+        partial_path = path + PARTIAL_DOWNLOAD_SUFFIX
+        try:
+            with open(partial_path, mode="wb") as file:
+                size, sha256 = write_response(response, file)
+            os.replace(partial_path, path)
+        except BaseException:
+            try:
+                os.remove(partial_path)
+            except FileNotFoundError:
+                pass
+            raise
+    return {
+        "filename": filename,
+        "etag": response.headers.get("etag"),
+        "size": size,
+        "sha256": sha256,
+    }
+
+
+def download_file_to_zip(zip_file, zip_lock, spool_max_size, url, session=None):
+    """
+    Download a file from an URL and add it to an open zip file, by default use the filename header
+    as the name of the zip entry.
+
+    The response is spooled on a temporary file, that only uses the disk if it's bigger than
+    `spool_max_size`, so multiple files can be downloaded at the same time, and only then copied to
+    the zip file while holding the `zip_lock`, because a zip file only accepts an entry at a time.
+
+    Returns a dict with the name, the ETag, the size and the checksum of the downloaded file.
+    """
+    session = session or requests
+    with session.get(url, timeout=60, stream=True) as response:
+        response.raise_for_status()
+        filename = get_response_filename(response, url)
+        with tempfile.SpooledTemporaryFile(max_size=spool_max_size) as spooled_file:
+            size, sha256 = write_response(response, spooled_file)
+            spooled_file.seek(0)
+            with zip_lock, zip_file.open(filename, mode="w") as zip_entry:
+                shutil.copyfileobj(spooled_file, zip_entry, DOWNLOAD_CHUNK_SIZE)
+    return {
+        "filename": filename,
+        "etag": response.headers.get("etag"),
+        "size": size,
+        "sha256": sha256,
+    }
+
+
+def download_files(download_function, urls, concurrency, progress_callback=None):
+    """
+    Download all the `urls`, a dict of certificate verify_uuid to its URL, using a bounded pool of
+    `concurrency` workers that run the `download_function` for each URL.
+
+    Returns the list of the verify_uuid that couldn't be downloaded.
+    """
+    failed = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(download_function, url): verify_uuid
+            for verify_uuid, url in urls.items()
+        }
+        for count, future in enumerate(as_completed(futures), start=1):
+            verify_uuid = futures[future]
+            error = future.exception()
+            if error:
+                failed.append(verify_uuid)
+            if progress_callback:
+                progress_callback(
+                    verify_uuid, None if error else future.result(), error, count, len(futures)
+                )
+    return failed
+
+
+class ExportManifest:
+    """
+    Manifest of the certificates already downloaded by a course export.
+
+    It's an append only file with a JSON document per line, so each download is recorded as soon
+    as it finishes and the manifest survives an interrupted export. A line for a certificate
+    already on the manifest replaces the previous one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.last_export_date = None
+
+    def load(self):
+        """
+        Read the manifest file, if it exists.
+        """
+        self.entries = {}
+        self.last_export_date = None
+        line = "\n"
+        try:
+            with open(self.path) as manifest_file:
+                for line in manifest_file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # the last line could have been truncated by an interrupted export
+                        continue
+                    if "verify_uuid" in record:
+                        self.entries[record["verify_uuid"]] = record
+                    elif "export_date" in record:
+                        self.last_export_date = datetime.fromisoformat(record["export_date"])
+        except FileNotFoundError:
+            return self
+        if not line.endswith("\n"):
+            # terminate the truncated line, so the next records are appended on their own lines
+            with open(self.path, "a") as manifest_file:
+                manifest_file.write("\n")
+        return self
+
+    def delete(self):
+        """
+        Delete the manifest file.
+        """
+        self.entries = {}
+        self.last_export_date = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _append(self, record):
+        with open(self.path, "a") as manifest_file:
+            manifest_file.write(json.dumps(record) + "\n")
+
+    def add(self, verify_uuid, modified_date, download_info):
+        """
+        Record a downloaded certificate.
+        """
+        record = {
+            "verify_uuid": verify_uuid,
+            "modified_date": modified_date.isoformat(),
+            **download_info,
+        }
+        self._append(record)
+        self.entries[verify_uuid] = record
+
+    def finish(self, export_date):
+        """
+        Record a successful export, the date of the export is used by the next `--since` export.
+        """
+        self._append({"export_date": export_date.isoformat()})
+        self.last_export_date = export_date
+
+    def is_downloaded(self, verify_uuid, modified_date, folder):
+        """
+        Check if the certificate has already been downloaded, since it was last modified, to
+        the folder.
+        """
+        entry = self.entries.get(verify_uuid)
+        if not entry or entry["modified_date"] != modified_date.isoformat():
+            return False
+        try:
+            return os.path.getsize(os.path.join(folder, entry["filename"])) == entry["size"]
+        except OSError:
+            return False
+
+
+def get_since_date(since, manifest):
+    """
+    Get the date since when the certificates have to be exported, or None to export all of them.
+    """
+    if not since:
+        return None
+    if since == SINCE_LAST_EXPORT:
+        return manifest.last_export_date
+    since_date = datetime.fromisoformat(since)
+    if since_date.tzinfo is None:
+        since_date = since_date.replace(tzinfo=UTC)
+    return since_date
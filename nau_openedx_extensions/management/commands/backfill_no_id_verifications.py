@@ -0,0 +1,96 @@
+"""
+Script that creates the missing ID verifications of the learners enrolled on the enrollment modes
+that don't need an ID verification.
+"""
+import logging
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pytz import UTC
+
+from nau_openedx_extensions.edxapp_wrapper.verify_student import (
+    create_user_id_verifications,
+    get_users_without_active_id_verification,
+)
+from nau_openedx_extensions.verify_student.id_verification import get_id_verification_fields, parse_enrollment_modes
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Command that creates a `ManualVerification` for each user with an active enrollment on the
+    `NAU_NO_ID_VERIFY_FOR_ENROLLMENT_MODES` enrollment modes that doesn't have an active one.
+    The enrollment receiver only creates them on new enrollment events, so this command catches up
+    the existing learners when the setting changes.
+
+    The users are computed by the database and the verifications are created in batches.
+
+    To check how many verifications would be created:
+    python manage.py lms backfill_no_id_verifications --dry-run
+
+    To create them for other enrollment modes:
+    python manage.py lms backfill_no_id_verifications --modes "verified,professional"
+    """
+
+    help = (
+        "Creates the missing ID verifications of the learners enrolled on the modes that don't need one"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--modes",
+            type=str,
+            default=None,
+            required=False,
+            help="Comma separated enrollment modes, defaults to the NAU_NO_ID_VERIFY_FOR_ENROLLMENT_MODES setting",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            required=False,
+            help="Number of ID verifications created on each batch",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            default=False,
+            help="Only count the users without an ID verification",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Creates the missing ID verifications.
+        """
+        enrollment_modes = parse_enrollment_modes(
+            options["modes"] or getattr(settings, "NAU_NO_ID_VERIFY_FOR_ENROLLMENT_MODES", "verified")
+        )
+        users = get_users_without_active_id_verification(sorted(enrollment_modes))
+        total = users.count()
+        self.stdout.write(
+            "Found {} users without an ID verification enrolled on the modes: {}".format(
+                total, ", ".join(sorted(enrollment_modes))
+            )
+        )
+        if options["dry_run"] or not total:
+            return
+
+        batch_size = options["batch_size"]
+        created = 0
+        last_user_id = None
+        while True:
+            batch = users.order_by("pk")
+            if last_user_id is not None:
+                batch = batch.filter(pk__gt=last_user_id)
+            batch = list(batch.values_list("pk", "profile__name")[:batch_size])
+            if not batch:
+                break
+            created += create_user_id_verifications(
+                batch, **get_id_verification_fields(datetime.now(UTC))
+            )
+            last_user_id = batch[-1][0]
+            self.stdout.write("Created {} of {} ID verifications".format(created, total))
+
+        log.info("Backfilled %d ID verifications", created)
@@ -8,22 +8,76 @@ docker cp export_course_certificates.py \
         management/commands/export_course_certificates.py && \
     docker exec -i openedx_lms python manage.py lms export_course_certificates \
         course-v1:FCT+CTC101x+2020_T2
+
+Use the `--workers` parameter to export multiple courses in parallel.
+
+Use the `--org` parameter to export the certificates of all the courses of an organization, or the
+`--all` parameter to export the certificates of all the courses, to a single csv file ordered by
+course. That file is written by a single query, so they can't be used with `--workers`.
 """
+import tempfile
 from datetime import datetime
 
+from common.djangoapps.util.file import course_filename_prefix_generator  # lint-amnesty, pylint: disable=import-error
 from common.djangoapps.util.query import use_read_replica_if_available  # lint-amnesty, pylint: disable=import-error
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from lms.djangoapps.certificates.models import GeneratedCertificate  # lint-amnesty, pylint: disable=import-error
-from lms.djangoapps.instructor_task.tasks_helper.utils import (  # lint-amnesty, pylint: disable=import-error
-    upload_csv_to_report_store,
-)
+from lms.djangoapps.instructor_task.models import ReportStore  # lint-amnesty, pylint: disable=import-error
 from opaque_keys.edx.keys import CourseKey
+from openedx.core.djangoapps.content.course_overviews.models import (  # lint-amnesty, pylint: disable=import-error
+    CourseOverview,
+)
 from openedx.core.djangoapps.site_configuration.models import (  # lint-amnesty, pylint: disable=import-error
     SiteConfiguration,
 )
 from pytz import UTC
 
+from nau_openedx_extensions.management.certificates_export import CERTIFICATE_FIELDS, write_certificates_csv
+from nau_openedx_extensions.management.utils import run_for_courses
+
+QUERY_CHUNK_SIZE = 2000
+
+
+def upload_csv_file_to_report_store(csv_file, csv_name, course_id, timestamp, config_name="GRADES_DOWNLOAD"):
+    """
+    Upload a CSV file to the report store, with the same name that the edx-platform
+    `upload_csv_to_report_store` would use, but without having all the rows in memory.
+    """
+    report_store = ReportStore.from_config(config_name)
+    report_name = "{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M"),
+    )
+    report_store.store(course_id, report_name, csv_file)
+
+
+def upload_consolidated_csv_file_to_report_store(
+    csv_file, csv_name, scope, timestamp, config_name="GRADES_DOWNLOAD"
+):
+    """
+    Upload a CSV file that isn't from a single course to the report store, on a folder of the
+    `scope`, e.g. the organization.
+
+    Returns the URL of the uploaded file.
+    """
+    report_store = ReportStore.from_config(config_name)
+    report_name = "{scope}_{csv_name}_{timestamp_str}.csv".format(
+        scope=scope,
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M"),
+    )
+    report_store.store(scope, report_name, csv_file)
+    return dict(report_store.links_for(scope)).get(report_name)
+
+
+def get_lms_root_url(org):
+    """
+    The LMS root URL of the site of the organization.
+    """
+    return SiteConfiguration.get_value_for_org(org, "LMS_ROOT_URL", settings.LMS_ROOT_URL)
+
 
 class Command(BaseCommand):
     """
@@ -37,87 +91,136 @@ class Command(BaseCommand):
             default="course-certificate.nau.edu.pt",
             help="The domain to use to download the certificates",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of courses exported in parallel, each one on its own process, not used by --org or --all",
+        )
+        parser.add_argument(
+            "--org",
+            default=None,
+            help="Export the certificates of all the courses of the organization to a single file",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Export the certificates of all the courses to a single file",
+        )
         parser.add_argument("course_ids", nargs="*", metavar="course_id")
 
     def log_msg(self, msg):
         self.stdout.write(msg)
         self.stdout.flush()
 
-    def handle(self, *args, **options):
-        """
-        Execute the command
-        """
+    @staticmethod
+    def get_certificate_download_pdf_url(options):
         certificate_download_domain = options["certificate_download_domain"]
-        course_ids = options["course_ids"]
-        certificate_download_pdf_url = getattr(
+        return getattr(
             settings,
             "NAU_CERTIFICATE_DOWNLOAD_PDF_URL",
             f"https://{certificate_download_domain}/attachment/certificates/",
         )
 
-        for course_id in course_ids:
-            course_key = CourseKey.from_string(course_id)
-
-            start_date = datetime.now(UTC)
-
-            course_generated_certificates = use_read_replica_if_available(
-                GeneratedCertificate.objects.filter(course_id=course_id)
-            )
+    def handle(self, *args, **options):
+        """
+        Execute the command
+        """
+        if options["org"] or options["all"]:
+            if options["course_ids"] or (options["org"] and options["all"]):
+                raise CommandError("Use only one of the course ids, the --org or the --all parameters")
+            if options["workers"] > 1:
+                raise CommandError("The --workers parameter can't be used with --org or --all")
+            self.export_consolidated(options["org"], options)
+            return
+        if not options["course_ids"]:
+            raise CommandError("Use the course ids, the --org or the --all parameters")
+
+        results = run_for_courses(self, options["course_ids"], options, options["workers"])
+
+        failed_courses = {
+            course_id: error for course_id, error in results.items() if isinstance(error, Exception)
+        }
+        exported_certificates = sum(
+            result for result in results.values() if not isinstance(result, Exception)
+        )
+        self.log_msg(
+            f"Exported {exported_certificates} certificates of "
+            f"{len(results) - len(failed_courses)}/{len(results)} courses"
+        )
+        for course_id, error in failed_courses.items():
+            self.log_msg(f"Error exporting the certificates of course {course_id}: {error}")
+        if failed_courses:
+            raise CommandError(f"Couldn't export the certificates of {len(failed_courses)} courses")
 
-            course_key = CourseKey.from_string(course_id)
-            lms_root_url = SiteConfiguration.get_value_for_org(
-                course_key.org, "LMS_ROOT_URL", settings.LMS_ROOT_URL
-            )
+    def export_course(self, course_id, options):
+        """
+        Export the certificates of a course.
 
-            # prepare output
-            rows = []
-
-            # append header
-            rows.append(
-                [
-                    "course_id",
-                    "student email",
-                    "student username",
-                    "student name",
-                    "certificate created date",
-                    "certificate verify_uuid",
-                    "certificate_web_link_url",
-                    "certificate_download_pdf_link",
-                ]
+        Returns the number of certificates exported.
+        """
+        course_key = CourseKey.from_string(course_id)
+
+        start_date = datetime.now(UTC)
+
+        # only read the needed columns, joined with the user table, in chunks
+        course_generated_certificates = use_read_replica_if_available(
+            GeneratedCertificate.objects.filter(course_id=course_key)
+        ).values_list(*CERTIFICATE_FIELDS).iterator(chunk_size=QUERY_CHUNK_SIZE)
+
+        # write each certificate as a row of a temporary csv file
+        with tempfile.TemporaryFile() as csv_file:
+            certificates_count = write_certificates_csv(
+                csv_file,
+                course_generated_certificates,
+                self.get_certificate_download_pdf_url(options),
+                get_lms_root_url,
             )
-
-            # iterate each certificate and append each certificate as a row
-            for certificate in course_generated_certificates:
-                certificate_web_link_url = (
-                    f"{lms_root_url}/certificates/{certificate.verify_uuid}"
-                )
-                certificate_download_pdf_link = (
-                    certificate_download_pdf_url + certificate.verify_uuid
-                )
-
-                rows.append(
-                    [
-                        course_id,
-                        certificate.user.email,
-                        certificate.user.username,
-                        certificate.name,
-                        certificate.created_date,
-                        certificate.verify_uuid,
-                        certificate_web_link_url,
-                        certificate_download_pdf_link,
-                    ]
-                )
-
-            upload_csv_to_report_store(
-                rows,
+            upload_csv_file_to_report_store(
+                csv_file,
                 "export_course_certificates",
                 course_key,
                 start_date,
             )
 
-            lms_instructor_data_download_url = (
-                f"{lms_root_url}/courses/{course_id}/instructor#view-data_download"
+        lms_root_url = get_lms_root_url(course_key.org)
+        lms_instructor_data_download_url = (
+            f"{lms_root_url}/courses/{course_id}/instructor#view-data_download"
+        )
+        self.log_msg(
+            f"You can confirm the existence of the file on: {lms_instructor_data_download_url}"
+        )
+        return certificates_count
+
+    def export_consolidated(self, org, options):
+        """
+        Export the certificates of all the courses of the organization, or of all the courses if
+        there is no organization, with a single query ordered by course, to a single csv file.
+        """
+        start_date = datetime.now(UTC)
+
+        generated_certificates = GeneratedCertificate.objects.all()
+        if org:
+            generated_certificates = generated_certificates.filter(
+                course_id__in=CourseOverview.objects.filter(org=org).values("id")
+            )
+        generated_certificates = use_read_replica_if_available(
+            generated_certificates
+        ).order_by("course_id", "id").values_list(*CERTIFICATE_FIELDS).iterator(chunk_size=QUERY_CHUNK_SIZE)
+
+        scope = org or "all"
+        with tempfile.TemporaryFile() as csv_file:
+            certificates_count = write_certificates_csv(
+                csv_file,
+                generated_certificates,
+                self.get_certificate_download_pdf_url(options),
+                get_lms_root_url,
             )
-            self.log_msg(
-                f"You can confirm the existence of the file on: {lms_instructor_data_download_url}"
+            report_url = upload_consolidated_csv_file_to_report_store(
+                csv_file,
+                "export_course_certificates",
+                scope,
+                start_date,
             )
+
+        self.log_msg(f"Exported {certificates_count} certificates of {scope} courses to: {report_url}")
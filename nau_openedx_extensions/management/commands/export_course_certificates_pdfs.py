@@ -3,6 +3,17 @@ Export all PDF course certificates to a zip file and upload it to the `GRADES_DO
 
 You can skip the `certificate_download_domain` parameter on production environment.
 
+Use the `--streaming` parameter to write each downloaded certificate directly to the zip file,
+without saving every PDF on the `NAU_EXPORT_COURSE_CERTIFICATES_PDFS_TEMP_FOLDER` folder first.
+
+Each course export keeps a manifest with the certificates already downloaded, next to the course
+folder. Use `--resume` to continue an export that has been interrupted or that couldn't download
+some certificates, it skips the certificates already downloaded. Use `--since` to only export the
+certificates changed since the last successful export, or since a specific date, e.g.
+`--since 2022-09-01T00:00:00`.
+
+Use the `--workers` parameter to export multiple courses in parallel.
+
 To manually develop the script you can edit it on the fly and execute it.
     docker cp export_course_certificates_pdfs.py \
         openedx_lms:/openedx/venv/lib/python3.8/site-packages/nau_openedx_extensions/management/\
@@ -13,12 +24,15 @@ To manually develop the script you can edit it on the fly and execute it.
 """
 import os
 import shutil
+import tempfile
+import threading
+import zipfile
 from datetime import datetime
+from functools import partial
 
-import requests  # lint-amnesty, pylint: disable=import-error
 from common.djangoapps.util.query import use_read_replica_if_available  # lint-amnesty, pylint: disable=import-error
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from lms.djangoapps.certificates.models import GeneratedCertificate  # lint-amnesty, pylint: disable=import-error
 from lms.djangoapps.instructor_task.tasks_helper.utils import (  # lint-amnesty, pylint: disable=import-error
     upload_zip_to_report_store,
@@ -29,27 +43,19 @@ from openedx.core.djangoapps.site_configuration.models import (  # lint-amnesty,
 )
 from pytz import UTC
 
-
-def delete_recursive(folder):
-    """
-    Delete a folder recursively.
-    """
-    try:
-        shutil.rmtree(folder)
-    except FileNotFoundError:
-        # directory doesn't exist
-        pass
-
-
-def create_folder(path):
-    """
-    Crete a folder using the path.
-    """
-    try:
-        os.makedirs(path)
-    except FileExistsError:
-        # directory already exists
-        pass
+from nau_openedx_extensions.management.certificates_export import (
+    SINCE_LAST_EXPORT,
+    ExportManifest,
+    create_folder,
+    delete_partial_downloads,
+    delete_recursive,
+    download_file,
+    download_file_to_zip,
+    download_files,
+    get_since_date,
+)
+from nau_openedx_extensions.management.utils import run_for_courses
+from nau_openedx_extensions.utils.http_session import create_session
 
 
 def save_file(filename, content):
@@ -60,23 +66,6 @@ def save_file(filename, content):
         certificates_file.write(content)
 
 
-def download_file(base_folder, url):
-    """
-    Download a file from an URL to a folder, by default use the filename header as the name of the
-    file.
-    """
-    response = requests.get(url, timeout=60)
-    filename = base_folder + "/"
-    if "content-disposition" in response.headers:
-        content_disposition = response.headers["content-disposition"]
-        filename += content_disposition.split("filename=")[1]
-    else:
-        filename += url.split("/")[-1]
-    with open(filename, mode="wb") as file:
-        file.write(response.content)
-    file.close()
-
-
 class Command(BaseCommand):
     """
     Export all PDF course certificates with its links to a csv file and upload it to the
@@ -88,6 +77,11 @@ class Command(BaseCommand):
         "NAU_EXPORT_COURSE_CERTIFICATES_PDFS_TEMP_FOLDER",
         "/tmp/export_certificates",
     )
+    spool_max_size = getattr(
+        settings,
+        "NAU_EXPORT_COURSE_CERTIFICATES_PDFS_SPOOL_MAX_SIZE",
+        64 * 1024 * 1024,
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -95,72 +89,254 @@ class Command(BaseCommand):
             default="course-certificate.nau.edu.pt",
             help="The domain to use to download the certificates",
         )
+        parser.add_argument(
+            "--download_concurrency",
+            type=int,
+            default=8,
+            help="Number of certificates downloaded in parallel",
+        )
+        parser.add_argument(
+            "--download_retries",
+            type=int,
+            default=3,
+            help="Number of retries of each failed certificate download",
+        )
+        parser.add_argument(
+            "--download_retry_backoff",
+            type=float,
+            default=1.0,
+            help="Backoff factor in seconds between the retries of a failed certificate download",
+        )
+        parser.add_argument(
+            "--streaming",
+            action="store_true",
+            help="Write the downloaded certificates directly to the zip file, without a temporary folder",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of courses exported in parallel, each one on its own process",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted export, skipping the certificates already downloaded",
+        )
+        parser.add_argument(
+            "--since",
+            nargs="?",
+            const=SINCE_LAST_EXPORT,
+            default=None,
+            help=(
+                "Only download the certificates modified since the last successful export, "
+                "or since the given ISO 8601 date"
+            ),
+        )
         parser.add_argument("course_ids", nargs="+", metavar="course_id")
 
     def log_msg(self, msg):
         self.stdout.write(msg)
         self.stdout.flush()
 
+    def record_download(
+        self, manifest, modified_dates, verify_uuid, download_info, error, count, total
+    ):  # pylint: disable=too-many-arguments
+        """
+        Log the download progress and record each downloaded certificate on the manifest.
+        """
+        if error:
+            self.log_msg(f"Error downloading certificate {verify_uuid}: {error}")
+        else:
+            manifest.add(verify_uuid, modified_dates[verify_uuid], download_info)
+        self.log_msg(f"Downloading {count}/{total}")
+
+    def export_with_folder(
+        self, course_key, start_date, certificate_links, session, download_concurrency, download_callback, resume
+    ):  # pylint: disable=too-many-arguments
+        """
+        Download the certificates to a course folder, then compress that folder to a zip file and
+        upload it to the report store.
+
+        The course folder is kept if some certificates couldn't be downloaded, so they can be
+        downloaded later by a `resume` export.
+        """
+        course_certificate_folder = self.output_base_folder + "/" + str(course_key)
+        if not resume:
+            delete_recursive(course_certificate_folder)
+        create_folder(course_certificate_folder)
+        delete_partial_downloads(course_certificate_folder)
+
+        failed_verify_uuids = download_files(
+            partial(download_file, course_certificate_folder, session=session),
+            certificate_links,
+            download_concurrency,
+            progress_callback=download_callback,
+        )
+
+        self.log_msg(
+            "Compressing output to a single zip file - "
+            + course_certificate_folder
+            + ".zip"
+        )
+        shutil.make_archive(
+            course_certificate_folder, "zip", course_certificate_folder
+        )
+
+        with open(course_certificate_folder + ".zip", "rb") as zip_file:
+            upload_zip_to_report_store(
+                zip_file,
+                "export_course_certificates_pdfs",
+                course_key,
+                start_date,
+            )
+        os.remove(course_certificate_folder + ".zip")
+        if not failed_verify_uuids:
+            delete_recursive(course_certificate_folder)
+        return failed_verify_uuids
+
+    def export_streaming(
+        self, course_key, start_date, certificate_links, session, download_concurrency, download_callback
+    ):  # pylint: disable=too-many-arguments
+        """
+        Download the certificates directly to a spooled zip file and upload it to the report store.
+        """
+        zip_lock = threading.Lock()
+        with tempfile.SpooledTemporaryFile(max_size=self.spool_max_size, dir=self.output_base_folder) as archive:
+            with zipfile.ZipFile(archive, mode="w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+                failed_verify_uuids = download_files(
+                    partial(download_file_to_zip, zip_file, zip_lock, self.spool_max_size, session=session),
+                    certificate_links,
+                    download_concurrency,
+                    progress_callback=download_callback,
+                )
+            archive.seek(0)
+            self.log_msg(f"Uploading zip file of course {course_key}")
+            upload_zip_to_report_store(
+                archive,
+                "export_course_certificates_pdfs",
+                course_key,
+                start_date,
+            )
+        return failed_verify_uuids
+
     def handle(self, *args, **options):
         """
         Execute the command
         """
+        if options["resume"] and options["streaming"]:
+            raise CommandError("The --resume option can't be used with --streaming")
+        create_folder(self.output_base_folder)
+
+        results = run_for_courses(self, options["course_ids"], options, options["workers"])
+
+        failed_courses = {
+            course_id: error for course_id, error in results.items() if isinstance(error, Exception)
+        }
+        exported_results = [result for result in results.values() if not isinstance(result, Exception)]
+        exported_certificates = sum(result["certificates"] for result in exported_results)
+        failed_certificates = sum(len(result["failed_verify_uuids"]) for result in exported_results)
+        self.log_msg(
+            f"Exported {exported_certificates - failed_certificates}/{exported_certificates} certificates of "
+            f"{len(results) - len(failed_courses)}/{len(results)} courses"
+        )
+        for course_id, error in failed_courses.items():
+            self.log_msg(f"Error exporting the certificates of course {course_id}: {error}")
+        if failed_courses:
+            raise CommandError(f"Couldn't export the certificates of {len(failed_courses)} courses")
+
+    def export_course(self, course_id, options):
+        """
+        Export the certificates of a course.
+
+        Returns a dict with the number of certificates to export and the verify_uuid of those that
+        couldn't be downloaded.
+        """
         certificate_download_domain = options["certificate_download_domain"]
-        course_ids = options["course_ids"]
+        download_concurrency = max(options["download_concurrency"], 1)
         certificate_download_pdf_url = getattr(
             settings,
             "NAU_CERTIFICATE_DOWNLOAD_PDF_URL",
             f"https://{certificate_download_domain}/attachment/certificates/",
         )
 
-        for course_id in course_ids:
-            course_key = CourseKey.from_string(course_id)
+        course_key = CourseKey.from_string(course_id)
+
+        start_date = datetime.now(UTC)
 
-            start_date = datetime.now(UTC)
+        manifest = ExportManifest(self.output_base_folder + "/" + course_id + ".manifest.jsonl")
+        if options["resume"] or options["since"]:
+            manifest.load()
+        else:
+            manifest.delete()
 
-            course_generated_certificates = use_read_replica_if_available(
-                GeneratedCertificate.objects.filter(course_id=course_id)
+        course_generated_certificates = use_read_replica_if_available(
+            GeneratedCertificate.objects.filter(course_id=course_id)
+        )
+        since_date = get_since_date(options["since"], manifest)
+        if since_date:
+            self.log_msg(f"Exporting the certificates of course {course_id} modified since {since_date}")
+            course_generated_certificates = course_generated_certificates.filter(
+                modified_date__gt=since_date
             )
-            course_certificate_folder = self.output_base_folder + "/" + course_id
-            delete_recursive(course_certificate_folder)
-            create_folder(course_certificate_folder)
 
-            # iterate each certificate and append each certificate as a row
-            count = 0
-            certificate_links_total = len(course_generated_certificates)
+        modified_dates = dict(course_generated_certificates.values_list("verify_uuid", "modified_date"))
+        if options["resume"]:
+            course_certificate_folder = self.output_base_folder + "/" + course_id
+            modified_dates = {
+                verify_uuid: modified_date
+                for verify_uuid, modified_date in modified_dates.items()
+                if not manifest.is_downloaded(verify_uuid, modified_date, course_certificate_folder)
+            }
+        certificate_links = {
+            verify_uuid: certificate_download_pdf_url + verify_uuid
+            for verify_uuid in modified_dates
+        }
+        download_callback = partial(self.record_download, manifest, modified_dates)
 
-            for certificate in course_generated_certificates:
-                certificate_download_pdf_link = (
-                    certificate_download_pdf_url + certificate.verify_uuid
+        with create_session(
+            download_concurrency,
+            options["download_retries"],
+            options["download_retry_backoff"],
+        ) as session:
+            if options["streaming"]:
+                failed_verify_uuids = self.export_streaming(
+                    course_key, start_date, certificate_links, session, download_concurrency, download_callback
                 )
-                download_file(course_certificate_folder, certificate_download_pdf_link)
-                count += 1
-                self.log_msg(f"Downloading {count}/{certificate_links_total}")
-
-            self.log_msg(
-                "Compressing output to a single zip file - "
-                + course_certificate_folder
-                + ".zip"
-            )
-            shutil.make_archive(
-                course_certificate_folder, "zip", course_certificate_folder
-            )
-
-            with open(course_certificate_folder + ".zip", "rb") as zip_file:
-                upload_zip_to_report_store(
-                    zip_file,
-                    "export_course_certificates_pdfs",
+            else:
+                failed_verify_uuids = self.export_with_folder(
                     course_key,
                     start_date,
+                    certificate_links,
+                    session,
+                    download_concurrency,
+                    download_callback,
+                    options["resume"],
                 )
-            delete_recursive(course_certificate_folder)
 
-            lms_root_url = SiteConfiguration.get_value_for_org(
-                course_key.org, "LMS_ROOT_URL", settings.LMS_ROOT_URL
-            )
-            lms_instructor_data_download_url = (
-                f"{lms_root_url}/courses/{course_id}/instructor#view-data_download"
+        if failed_verify_uuids:
+            self.log_msg(
+                f"The export of course {course_id} isn't recorded as finished on its manifest, "
+                "because some certificates couldn't be downloaded"
             )
+        else:
+            manifest.finish(start_date)
+
+        lms_root_url = SiteConfiguration.get_value_for_org(
+            course_key.org, "LMS_ROOT_URL", settings.LMS_ROOT_URL
+        )
+        lms_instructor_data_download_url = (
+            f"{lms_root_url}/courses/{course_id}/instructor#view-data_download"
+        )
+        self.log_msg(
+            f"You can confirm the existence of the file on: {lms_instructor_data_download_url}"
+        )
+        if failed_verify_uuids:
             self.log_msg(
-                f"You can confirm the existence of the file on: {lms_instructor_data_download_url}"
+                f"Failed to download {len(failed_verify_uuids)}/{len(certificate_links)} certificates "
+                f"of course {course_id}, with the verify_uuid: {', '.join(failed_verify_uuids)}"
             )
+        return {
+            "certificates": len(certificate_links),
+            "failed_verify_uuids": failed_verify_uuids,
+        }
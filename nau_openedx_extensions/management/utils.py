@@ -0,0 +1,51 @@
+"""
+Helpers shared by the management commands.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.db import connections
+
+
+def _run_course_in_worker(command_class, course_id, options):
+    """
+    Run the export of a course on a worker process, with a new command instance.
+    """
+    return command_class().export_course(course_id, options)
+
+
+def run_for_courses(command, course_ids, options, workers=1):
+    """
+    Run the `export_course` method of the command for each course, on a pool of `workers`
+    processes, or one course after the other if there is a single worker.
+
+    Each worker process opens its own database connections and uploads its own reports.
+
+    Returns a dict with the result of each course, or the error that was raised while
+    exporting it.
+    """
+    results = {}
+    total = len(course_ids)
+    if workers <= 1:
+        for count, course_id in enumerate(course_ids, start=1):
+            try:
+                results[course_id] = command.export_course(course_id, options)
+            except Exception as error:  # pylint: disable=broad-except
+                results[course_id] = error
+            command.log_msg(f"Finished course {course_id} ({count}/{total})")
+        return results
+
+    # the output streams can't be sent to the workers
+    worker_options = {key: value for key, value in options.items() if key not in ("stdout", "stderr")}
+    # the forked workers can't share the connections of this process
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_run_course_in_worker, type(command), course_id, worker_options): course_id
+            for course_id in course_ids
+        }
+        for count, future in enumerate(as_completed(futures), start=1):
+            course_id = futures[future]
+            error = future.exception()
+            results[course_id] = error or future.result()
+            command.log_msg(f"Finished course {course_id} ({count}/{total})")
+    return results
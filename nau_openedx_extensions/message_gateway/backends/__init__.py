@@ -3,21 +3,51 @@ Message gateway backends
 """
 from __future__ import absolute_import, unicode_literals
 
-import logging
+import os
 
 from django.conf import settings
+from django.core.signals import setting_changed
 
 from . import logfile
 
+_backends = {}
+
 
 def get_backend():
     """
     Use Message gateway backend defined in the settings.
+
+    The backend is created once per process, so its connections are reused by all the messages
+    sent by the process.
     """
     backend_setting = getattr(settings, "NAU_MESSAGE_GATEWAY_BACKEND", "log_file")
+    key = (os.getpid(), backend_setting)
+    if key not in _backends:
+        _backends[key] = _create_backend(backend_setting)
+    return _backends[key]
+
+
+def _create_backend(backend_setting):
+    """
+    Create the message gateway backend.
+    """
     if backend_setting == "log_file":
         return logfile.Backend()
+    elif backend_setting == "http":
+        # only import the HTTP client dependencies when the backend is used
+        from . import http  # pylint: disable=import-outside-toplevel
+        return http.Backend.from_settings(settings.NAU_MESSAGE_GATEWAY_HTTP)
     else:
         raise ValueError(
             "Invalid NAU_MESSAGE_GATEWAY_BACKEND setting value: %s" % backend_setting
         )
+
+
+def clear_backends(**kwargs):
+    """
+    Forget the created backends, so they are created again with the current settings.
+    """
+    _backends.clear()
+
+
+setting_changed.connect(clear_backends, dispatch_uid="nau_openedx_extensions.message_gateway.backends")
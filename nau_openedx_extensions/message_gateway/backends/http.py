@@ -0,0 +1,117 @@
+"""
+HTTP backend for the message gateway integration.
+"""
+from __future__ import absolute_import, unicode_literals
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from nau_openedx_extensions.utils.http_session import create_session
+
+from .base import BaseBackend
+
+log = logging.getLogger("nau_message_gateway")
+
+
+class Backend(BaseBackend):
+    """
+    Backend that submits the messages to an HTTP message gateway.
+
+    The recipients are posted in batches of `batch_size` to the `url` batch submit endpoint,
+    with `concurrency` requests in parallel. The requests are retried with an exponential
+    backoff when the gateway fails or is rate limiting, respecting its `Retry-After` header.
+
+    The HTTP connections are kept on a pool that is reused by all the messages sent by the
+    process.
+
+    Configure it with the settings:
+        NAU_MESSAGE_GATEWAY_BACKEND = "http"
+        NAU_MESSAGE_GATEWAY_HTTP = {
+            "URL": "https://gateway.example.com/api/messages/batch",
+            "TOKEN": "secret",
+            "BATCH_SIZE": 100,
+            "CONCURRENCY": 4,
+            "TIMEOUT": 30,
+            "RETRIES": 3,
+            "BACKOFF_FACTOR": 0.5,
+        }
+    """
+
+    def __init__(
+        self,
+        url,
+        token=None,
+        batch_size=100,
+        concurrency=4,
+        timeout=30,
+        retries=3,
+        backoff_factor=0.5,
+    ):  # pylint: disable=too-many-arguments
+        self.url = url
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.timeout = timeout
+        # the posts have an idempotency key, so they can be retried
+        self.session = create_session(concurrency, retries, backoff_factor, retry_all_methods=True)
+        if token:
+            self.session.headers["Authorization"] = "Bearer {}".format(token)
+
+    @classmethod
+    def from_settings(cls, http_settings):
+        """
+        Create the backend from the `NAU_MESSAGE_GATEWAY_HTTP` settings.
+        """
+        return cls(
+            http_settings["URL"],
+            token=http_settings.get("TOKEN"),
+            batch_size=http_settings.get("BATCH_SIZE", 100),
+            concurrency=http_settings.get("CONCURRENCY", 4),
+            timeout=http_settings.get("TIMEOUT", 30),
+            retries=http_settings.get("RETRIES", 3),
+            backoff_factor=http_settings.get("BACKOFF_FACTOR", 0.5),
+        )
+
+    def send_message(self, message, recipients):
+        batches = [
+            recipients[index:index + self.batch_size]
+            for index in range(0, len(recipients), self.batch_size)
+        ]
+        if self.concurrency <= 1 or len(batches) <= 1:
+            for batch in batches:
+                self.submit_batch(message, batch)
+        else:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                # consume the results so the first error is raised
+                list(executor.map(lambda batch: self.submit_batch(message, batch), batches))
+        log.info(
+            "Sent message with id (%s) to %d recipients in %d requests",
+            message.id,
+            len(recipients),
+            len(batches),
+        )
+
+    def submit_batch(self, message, recipients):
+        """
+        Post the message to a batch of recipients, raising an error if the gateway doesn't
+        accept it after the retries.
+
+        The `Idempotency-Key` header identifies the batch, so the gateway can ignore a retry of
+        a request that it already accepted.
+        """
+        response = self.session.post(
+            self.url,
+            headers={
+                "Idempotency-Key": "{}:{}:{}".format(
+                    message.id, recipients[0].get("pk"), recipients[-1].get("pk")
+                ),
+            },
+            json={
+                "message_id": message.id,
+                "course_id": str(message.course_id),
+                "message": message.message,
+                "recipients": recipients,
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response
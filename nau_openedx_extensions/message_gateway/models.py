@@ -4,9 +4,12 @@ Django models for the message gateway integration
 from __future__ import absolute_import, unicode_literals
 
 import logging
+from datetime import timedelta
 
+from django.conf import settings
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
 from django.db import models
+from django.utils import timezone
 from opaque_keys.edx.django.models import CourseKeyField
 
 from nau_openedx_extensions.edxapp_wrapper.email_module import EMAIL_TARGETS, Target
@@ -56,8 +59,278 @@ class NauCourseMessage(models.Model):
         course_message.save()  # Must exist in db before setting M2M relationship values
         course_message.targets.add(*new_targets)
         course_message.save()
+        NauCourseMessageProgress.objects.create(message=course_message)
 
         return course_message
 
     def __str__(self):
         return "<Nau Course Message from course {} with id {}>".format(self.course_id, self.id)
+
+
+class NauCourseMessageBatch(models.Model):
+    """
+    Model that stores the send state of each batch of recipients of a NauCourseMessage.
+
+    The idempotency key identifies the batch by its message and its first and last recipient,
+    so submitting the message again skips the batches that were already sent.
+
+    The batch keeps the ids of its recipients, so the tasks that send it only receive its id and
+    read the recipients from the database.
+
+    A task claims the batch before sending it, so a batch queued twice is only sent once.
+    """
+
+    QUEUED = "queued"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (QUEUED, "Queued"),
+        (SENDING, "Sending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    )
+
+    message = models.ForeignKey(
+        NauCourseMessage, related_name="batches", on_delete=models.CASCADE
+    )
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    first_recipient_id = models.IntegerField()
+    last_recipient_id = models.IntegerField()
+    recipients_count = models.PositiveIntegerField()
+    # comma separated ids of the recipients, so the batch can be sent by its id
+    recipient_ids = models.TextField(default="", blank=True)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=QUEUED, db_index=True
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    @staticmethod
+    def get_idempotency_key(message_id, recipient_ids):
+        """
+        Key of the batch of the message with the recipient ids, ordered by id.
+        """
+        return "{}:{}:{}".format(message_id, recipient_ids[0], recipient_ids[-1])
+
+    @classmethod
+    def get_or_create_for_recipients(cls, message, recipient_ids):
+        """
+        Get the batch of the message with the recipient ids, creating it as queued if it's new.
+        """
+        batch, _ = cls.objects.get_or_create(
+            idempotency_key=cls.get_idempotency_key(message.id, recipient_ids),
+            defaults={
+                "message": message,
+                "first_recipient_id": recipient_ids[0],
+                "last_recipient_id": recipient_ids[-1],
+                "recipients_count": len(recipient_ids),
+                "recipient_ids": ",".join(str(recipient_id) for recipient_id in recipient_ids),
+            },
+        )
+        return batch
+
+    def get_recipient_ids(self):
+        """
+        The ids of the recipients of the batch.
+        """
+        return [int(recipient_id) for recipient_id in self.recipient_ids.split(",") if recipient_id]
+
+    @staticmethod
+    def get_stale_date(now=None):
+        """
+        The batches queued or being sent that weren't modified since this date were lost, e.g. by
+        a worker that stopped, and can be sent again.
+        """
+        stale_seconds = getattr(settings, "NAU_COURSE_MESSAGE_BATCH_STALE_SECONDS", 60 * 60)
+        return (now or timezone.now()) - timedelta(seconds=stale_seconds)
+
+    def is_stale(self, now=None):
+        """
+        Whether the batch is queued or being sent and wasn't modified for too long.
+        """
+        return self.status in (self.QUEUED, self.SENDING) and self.modified < self.get_stale_date(now)
+
+    def claim(self):
+        """
+        Atomically mark the batch as being sent and count a new send attempt, if it's queued,
+        failed or stale, so only one task sends it.
+
+        Returns the status of the batch before it was claimed, or None if it was already sent or
+        is being sent by another task.
+        """
+        now = timezone.now()
+        for status, stale_filter in (
+            (self.QUEUED, {}),
+            (self.FAILED, {}),
+            (self.SENDING, {"modified__lt": self.get_stale_date(now)}),
+        ):
+            claimed = NauCourseMessageBatch.objects.filter(id=self.id, status=status, **stale_filter).update(
+                status=self.SENDING, attempts=models.F("attempts") + 1, modified=now
+            )
+            if claimed:
+                self.status = self.SENDING
+                return status
+        return None
+
+    def mark_sent(self):
+        """
+        Mark the batch as sent.
+        """
+        self.status = self.SENT
+        self.last_error = None
+        self.save(update_fields=["status", "last_error", "modified"])
+
+    def mark_failed(self, error):
+        """
+        Mark the batch as failed with the error.
+        """
+        self.status = self.FAILED
+        self.last_error = str(error)
+        self.save(update_fields=["status", "last_error", "modified"])
+
+    def __str__(self):
+        return "<Nau Course Message batch {} of message {} with status {}>".format(
+            self.idempotency_key, self.message_id, self.status
+        )
+
+
+class NauCourseMessageProgress(models.Model):
+    """
+    Model that stores the send progress of a NauCourseMessage.
+
+    The counters are updated by the tasks with atomic database updates, so the concurrent
+    subtasks don't overwrite each other.
+    """
+
+    message = models.OneToOneField(
+        NauCourseMessage, related_name="progress", on_delete=models.CASCADE
+    )
+    recipients_total = models.PositiveIntegerField(default=0)
+    recipients_sent = models.PositiveIntegerField(default=0)
+    recipients_failed = models.PositiveIntegerField(default=0)
+    # all the recipients were queued, so the recipients total is final
+    dispatch_finished = models.BooleanField(default=False)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    # why the recipients of the message couldn't all be queued
+    error = models.TextField(null=True, blank=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def start(cls, message_id):
+        """
+        Record the start of the send of the message.
+        """
+        cls.objects.filter(message_id=message_id, started__isnull=True).update(
+            started=timezone.now(), modified=timezone.now()
+        )
+
+    @classmethod
+    def reset(cls, message_id, total, sent, failed):
+        """
+        Set the counters of the message, when its submit is resumed from its batches, and clear
+        the end and the error of the previous submit.
+        """
+        cls.objects.filter(message_id=message_id).update(
+            recipients_total=total,
+            recipients_sent=sent,
+            recipients_failed=failed,
+            dispatch_finished=False,
+            finished=None,
+            error=None,
+            modified=timezone.now(),
+        )
+
+    @classmethod
+    def add_recipients(cls, message_id, count, dispatch_finished=False):
+        """
+        Count the recipients queued for the message.
+        """
+        cls.objects.filter(message_id=message_id).update(
+            recipients_total=models.F("recipients_total") + count,
+            dispatch_finished=dispatch_finished,
+            modified=timezone.now(),
+        )
+        cls._mark_finished(message_id)
+
+    @classmethod
+    def add_results(cls, message_id, sent=0, failed=0):
+        """
+        Count the recipients that the message was sent to or failed, a negative count of failed
+        recipients removes the ones of a failed batch that was sent on a retry.
+        """
+        cls.objects.filter(message_id=message_id).update(
+            recipients_sent=models.F("recipients_sent") + sent,
+            recipients_failed=models.F("recipients_failed") + failed,
+            modified=timezone.now(),
+        )
+        cls._mark_finished(message_id)
+
+    @classmethod
+    def fail(cls, message_id, error):
+        """
+        Record the error that stopped the queuing of the recipients of the message, no more
+        recipients are queued, so the send finishes when the queued ones are sent or failed.
+        """
+        cls.objects.filter(message_id=message_id).update(
+            dispatch_finished=True,
+            error=str(error),
+            modified=timezone.now(),
+        )
+        cls._mark_finished(message_id)
+
+    @classmethod
+    def _mark_finished(cls, message_id):
+        """
+        Record the end of the send when all the recipients were queued and sent or failed.
+        """
+        cls.objects.filter(
+            message_id=message_id,
+            dispatch_finished=True,
+            finished__isnull=True,
+            recipients_total__lte=models.F("recipients_sent") + models.F("recipients_failed"),
+        ).update(finished=timezone.now())
+
+    def get_messages_per_second(self, now=None):
+        """
+        The send rate of the message since it started.
+        """
+        if not self.started:
+            return 0.0
+        elapsed = ((self.finished or now or timezone.now()) - self.started).total_seconds()
+        if elapsed <= 0:
+            return 0.0
+        return self.recipients_sent / elapsed
+
+    def to_dict(self):
+        """
+        The progress of the message as a JSON serializable dict.
+        """
+        now = timezone.now()
+        messages_per_second = self.get_messages_per_second(now)
+        pending = max(self.recipients_total - self.recipients_sent - self.recipients_failed, 0)
+        estimated_seconds_left = None
+        if self.dispatch_finished and messages_per_second and not self.finished:
+            estimated_seconds_left = int(pending / messages_per_second)
+        return {
+            "message_id": self.message_id,
+            "recipients_total": self.recipients_total,
+            "recipients_sent": self.recipients_sent,
+            "recipients_failed": self.recipients_failed,
+            "recipients_pending": pending,
+            "dispatch_finished": self.dispatch_finished,
+            "started": self.started.isoformat() if self.started else None,
+            "finished": self.finished.isoformat() if self.finished else None,
+            "modified": self.modified.isoformat() if self.modified else None,
+            "error": self.error,
+            "messages_per_second": round(messages_per_second, 2),
+            "estimated_seconds_left": estimated_seconds_left,
+        }
+
+    def __str__(self):
+        return "<Nau Course Message progress of message {}: {} of {} sent>".format(
+            self.message_id, self.recipients_sent, self.recipients_total
+        )
@@ -0,0 +1,76 @@
+"""
+Resolve the recipients of a course message from its targets.
+
+The user ids of each target are streamed ordered by id with keyset pagination, and merged into
+a single ordered stream without duplicates, so the database never needs to compute the distinct
+union of all the targets nor count it.
+"""
+from __future__ import absolute_import, unicode_literals
+
+import heapq
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+RECIPIENT_IDS_CHUNK_SIZE = 5000
+
+
+def iterate_user_ids(users, chunk_size=RECIPIENT_IDS_CHUNK_SIZE, after_id=None):
+    """
+    Iterate over the ids of the users queryset ordered by id, reading `chunk_size` ids per query
+    with keyset pagination, starting after the `after_id`.
+    """
+    last_id = after_id
+    while True:
+        chunk = users.order_by("pk")
+        if last_id is not None:
+            chunk = chunk.filter(pk__gt=last_id)
+        user_ids = list(chunk.values_list("pk", flat=True)[:chunk_size])
+        yield from user_ids
+        if len(user_ids) < chunk_size:
+            return
+        last_id = user_ids[-1]
+
+
+def iterate_recipient_ids(users_querysets, chunk_size=RECIPIENT_IDS_CHUNK_SIZE, after_id=None):
+    """
+    Iterate over the ids of the users of all the querysets ordered by id, each id only once,
+    starting after the `after_id`.
+    """
+    last_user_id = None
+    for user_id in heapq.merge(
+        *(iterate_user_ids(users, chunk_size, after_id) for users in users_querysets)
+    ):
+        if user_id != last_user_id:
+            yield user_id
+            last_user_id = user_id
+
+
+def iterate_recipient_id_batches(
+    users_querysets, batch_size, chunk_size=RECIPIENT_IDS_CHUNK_SIZE, after_id=None
+):
+    """
+    Iterate over lists of at most `batch_size` ids of the users of all the querysets,
+    starting after the `after_id`.
+    """
+    batch = []
+    for user_id in iterate_recipient_ids(users_querysets, chunk_size, after_id):
+        batch.append(user_id)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def get_recipients(user_ids):
+    """
+    Read the `NAU_COURSE_MESSAGE_RECIPIENT_FIELDS` and the `pk` of the users, ordered by id.
+    """
+    recipient_fields = list(
+        getattr(settings, "NAU_COURSE_MESSAGE_RECIPIENT_FIELDS", [])
+    )
+    recipient_fields.append("pk")
+    return list(
+        get_user_model().objects.filter(pk__in=user_ids).order_by("pk").values(*recipient_fields)
+    )
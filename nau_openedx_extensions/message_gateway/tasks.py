@@ -4,24 +4,49 @@ Async tasks for the message gateway integration.
 from __future__ import absolute_import, unicode_literals
 
 import logging
+import time
 
 from celery import shared_task  # lint-amnesty, pylint: disable=import-error
 from django.conf import settings
-from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
+from django.utils import timezone
 from opaque_keys.edx.keys import CourseKey
 
 from nau_openedx_extensions.message_gateway.backends import get_backend
-from nau_openedx_extensions.message_gateway.models import NauCourseMessage
+from nau_openedx_extensions.message_gateway.models import (
+    NauCourseMessage,
+    NauCourseMessageBatch,
+    NauCourseMessageProgress,
+)
+from nau_openedx_extensions.message_gateway.recipients import get_recipients, iterate_recipient_id_batches
+from nau_openedx_extensions.message_gateway.throttling import get_batch_size, record_send_result, take_send_tokens
 
 log = logging.getLogger(__name__)
 
 
 @shared_task
-def submit_bulk_course_message(message_id, course_id):
+def submit_bulk_course_message(message_id, course_id, after_recipient_id=None, total_recipients=0):
     """
     Submit course messages. This will create the subtasks that submits
-    the course messages. Each subtask will send at most
-    settings.NAU_COURSE_MESSAGE_BATCH_SIZE messages
+    the course messages. Each subtask only receives the id of its batch,
+    so the recipients data isn't sent through the broker.
+
+    The subtasks are fed gradually: each run queues at most
+    settings.NAU_COURSE_MESSAGE_DISPATCH_BATCHES batches, sized by the
+    backend latency and errors, while the backend and the course send
+    rates allow it, and then reschedules itself to continue after the
+    last recipient it queued.
+    """
+    try:
+        dispatch_course_message_batches(message_id, course_id, after_recipient_id, total_recipients)
+    except Exception as error:
+        # so the progress of the message shows why it stopped
+        NauCourseMessageProgress.fail(message_id, error)
+        raise
+
+
+def dispatch_course_message_batches(message_id, course_id, after_recipient_id, total_recipients):
+    """
+    Queue the next batches of the course message, see `submit_bulk_course_message`.
     """
     try:
         message_obj = NauCourseMessage.objects.get(id=message_id)
@@ -37,61 +62,138 @@ def submit_bulk_course_message(message_id, course_id):
         log.error(format_msg, course_key, message_obj.course_id)
         raise ValueError(format_msg % (course_id, message_obj.course_id))
 
+    if after_recipient_id is None:
+        NauCourseMessageProgress.start(message_id)
+        after_recipient_id = resume_course_message_batches(message_obj)
+
     # Get arguments that will be passed to every subtask.
     targets = message_obj.targets.all()
     user_id = message_obj.sender.id
 
     recipient_qsets = [target.get_users(course_key, user_id) for target in targets]
-    combined_set = User.objects.none()
-    for qset in recipient_qsets:
-        combined_set |= qset
-    combined_set = combined_set.distinct()
-
-    total_recipients = combined_set.count()
-
-    if total_recipients == 0:
+    backend_name = getattr(settings, "NAU_MESSAGE_GATEWAY_BACKEND", "log_file")
+    batch_size = get_batch_size(backend_name)
+    dispatch_batches = getattr(settings, "NAU_COURSE_MESSAGE_DISPATCH_BATCHES", 20)
+
+    dispatched_batches = 0
+    dispatched_recipients = 0
+    for recipient_ids in iterate_recipient_id_batches(
+        recipient_qsets, batch_size, after_id=after_recipient_id
+    ):
+        if dispatched_batches == dispatch_batches:
+            # continue on the next run, so the subtasks don't flood the queue
+            NauCourseMessageProgress.add_recipients(message_id, dispatched_recipients)
+            reschedule_bulk_course_message(message_id, course_id, after_recipient_id, total_recipients, 0)
+            return
+        wait_time = take_send_tokens(backend_name, course_key, len(recipient_ids))
+        if wait_time:
+            NauCourseMessageProgress.add_recipients(message_id, dispatched_recipients)
+            reschedule_bulk_course_message(
+                message_id, course_id, after_recipient_id, total_recipients, wait_time
+            )
+            return
+
+        batch = NauCourseMessageBatch.get_or_create_for_recipients(message_obj, recipient_ids)
+        submit_course_message.delay(message_id, batch.id)
+        dispatched_batches += 1
+        dispatched_recipients += len(recipient_ids)
+        total_recipients += len(recipient_ids)
+        after_recipient_id = recipient_ids[-1]
+
+    NauCourseMessageProgress.add_recipients(message_id, dispatched_recipients, dispatch_finished=True)
+
+    if total_recipients == 0 and not message_obj.batches.exists():
         msg = "Bulk Course Email Task: Empty recipient set"
         log.error(msg)
         raise ValueError(msg)
-    batch_size = getattr(settings, "NAU_COURSE_MESSAGE_BATCH_SIZE", 50)
-    for recipients in _iterate_over_recipients(combined_set, batch_size):
-        submit_course_message.delay(message_id, recipients)
+    log.info(
+        "Submitted the course message with id (%d) to %d recipients",
+        message_id,
+        total_recipients,
+    )
 
 
-def _iterate_over_recipients(combined_set, batch_size):
+def reschedule_bulk_course_message(message_id, course_id, after_recipient_id, total_recipients, countdown):
     """
-    Iterate over recipients and generate lists of batch_size size.
+    Continue the submit of the course message after the `after_recipient_id`, in `countdown`
+    seconds.
     """
-    recipient_fields = list(
-        getattr(settings, "NAU_COURSE_MESSAGE_RECIPIENT_FIELDS", [])
+    submit_bulk_course_message.apply_async(
+        (message_id, course_id),
+        {"after_recipient_id": after_recipient_id, "total_recipients": total_recipients},
+        countdown=countdown,
     )
-    recipient_fields.append("pk")
-    recipients = []
-    num_subtasks = 0
-    num_items_queued = 0
-    for recipient in combined_set.values(*recipient_fields).iterator():
-        if len(recipients) == batch_size:
-            yield recipients
-            num_items_queued += batch_size
-            recipients = []
-            num_subtasks += 1
-        recipients.append(recipient)
-
-        # yield remainder items for task, if any
-    if recipients:
-        yield recipients
-        num_items_queued += len(recipients)
+
+
+def resume_course_message_batches(message_obj):
+    """
+    Queue again the batches of a previous submit of the message that failed or that were lost,
+    and return the last recipient id of its batches, so the new submit continues after them.
+
+    The batches that are queued or being sent are left alone, unless they are stale, because
+    their tasks may still be on the broker. A batch queued twice is only sent once, because the
+    task claims it before sending it.
+
+    The batch sizes change with the backend latency, so the batches of the previous submit
+    wouldn't match the new ones. The progress of the message is counted again from the
+    batches.
+    """
+    batches = list(message_obj.batches.order_by("last_recipient_id"))
+    counts = {status: 0 for status, _ in NauCourseMessageBatch.STATUS_CHOICES}
+    for batch in batches:
+        counts[batch.status] += batch.recipients_count
+    # counted before the batches are queued again, so their results aren't overwritten
+    NauCourseMessageProgress.reset(
+        message_obj.id,
+        total=sum(counts.values()),
+        sent=counts[NauCourseMessageBatch.SENT],
+        failed=counts[NauCourseMessageBatch.FAILED],
+    )
+    now = timezone.now()
+    last_recipient_id = None
+    for batch in batches:
+        if batch.status == NauCourseMessageBatch.FAILED or batch.is_stale(now):
+            submit_course_message.delay(message_obj.id, batch.id)
+        last_recipient_id = batch.last_recipient_id
+    return last_recipient_id
 
 
 @shared_task
-def submit_course_message(message_id, recipients):
+def submit_course_message(message_id, batch_id):
     """
-    Send course message to the recipients given.
+    Send course message to the recipients of the batch, and record the send state of the batch.
     """
     try:
         message = NauCourseMessage.objects.get(id=message_id)
     except NauCourseMessage.DoesNotExist:  # lint-amnesty, pylint: disable=try-except-raise
         raise
 
+    batch = NauCourseMessageBatch.objects.get(id=batch_id, message=message)
+    previous_status = batch.claim()
+    if previous_status is None:
+        log.info("The batch %s of the course message was already sent or is being sent", batch.idempotency_key)
+        return
+
+    recipients = get_recipients(batch.get_recipient_ids())
     backend = get_backend()
-    backend.send_message(message, recipients)
+    backend_name = getattr(settings, "NAU_MESSAGE_GATEWAY_BACKEND", "log_file")
+    # adapt the size chosen for the next batches, not the size of this batch, that may be the
+    # last short batch of a message or have been queued with an older size
+    batch_size = get_batch_size(backend_name)
+    started = time.monotonic()
+    try:
+        backend.send_message(message, recipients)
+    except Exception as error:
+        record_send_result(backend_name, batch_size, time.monotonic() - started, failed=True)
+        batch.mark_failed(error)
+        if previous_status != NauCourseMessageBatch.FAILED:
+            NauCourseMessageProgress.add_results(message_id, failed=batch.recipients_count)
+        raise
+    record_send_result(backend_name, batch_size, time.monotonic() - started, failed=False)
+    batch.mark_sent()
+    NauCourseMessageProgress.add_results(
+        message_id,
+        sent=batch.recipients_count,
+        # the batch failed on a previous attempt
+        failed=-batch.recipients_count if previous_status == NauCourseMessageBatch.FAILED else 0,
+    )
@@ -0,0 +1,124 @@
+"""
+Throttling of the course messages delivery.
+
+The send rate is limited by token buckets kept on the Django cache, shared by all the workers,
+one for each message gateway backend and one for each course. The size of the batches sent to
+the backend adapts to the latency and the errors of the backend.
+
+The buckets are read and written without a lock, so with many concurrent dispatchers the rate is
+approximate, which is enough to keep a bulk message from flooding the workers and the gateway.
+"""
+from __future__ import absolute_import, unicode_literals
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+TOKEN_BUCKET_CACHE_KEY = "nau_openedx_extensions.course_message_token_bucket.{name}"
+BATCH_SIZE_CACHE_KEY = "nau_openedx_extensions.course_message_batch_size.{backend}"
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class TokenBucket:
+    """
+    Token bucket that refills `rate` tokens per second up to `capacity` tokens.
+    """
+
+    def __init__(self, name, rate, capacity):
+        self.cache_key = TOKEN_BUCKET_CACHE_KEY.format(name=name)
+        self.rate = rate
+        self.capacity = capacity
+
+    def _available(self, now):
+        """
+        The tokens on the bucket, refilled since it was last used.
+        """
+        state = cache.get(self.cache_key)
+        if state is None:
+            return self.capacity
+        tokens, updated = state
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def wait_time(self, tokens, now):
+        """
+        Seconds to wait until the bucket has the tokens.
+        """
+        tokens = min(tokens, self.capacity)
+        available = self._available(now)
+        if available >= tokens:
+            return 0
+        return (tokens - available) / self.rate
+
+    def take(self, tokens, now):
+        """
+        Remove the tokens from the bucket.
+        """
+        tokens = min(tokens, self.capacity)
+        cache.set(self.cache_key, (self._available(now) - tokens, now), CACHE_TIMEOUT)
+
+
+def get_token_buckets(backend_name, course_key):
+    """
+    The token buckets that limit the messages per second sent to the backend and of the course.
+    """
+    burst_seconds = getattr(settings, "NAU_COURSE_MESSAGE_RATE_LIMIT_BURST_SECONDS", 10)
+    buckets = []
+    for name, rate in (
+        ("backend.{}".format(backend_name), getattr(settings, "NAU_COURSE_MESSAGE_BACKEND_RATE_LIMIT", None)),
+        ("course.{}".format(course_key), getattr(settings, "NAU_COURSE_MESSAGE_COURSE_RATE_LIMIT", None)),
+    ):
+        if rate:
+            buckets.append(TokenBucket(name, rate, rate * burst_seconds))
+    return buckets
+
+
+def take_send_tokens(backend_name, course_key, recipients_count):
+    """
+    Take the tokens to send a message to `recipients_count` recipients from the backend and the
+    course buckets.
+
+    Returns 0 if the message can be sent now, or the seconds to wait before trying again, without
+    taking any token.
+    """
+    now = time.time()
+    buckets = get_token_buckets(backend_name, course_key)
+    wait_time = max([bucket.wait_time(recipients_count, now) for bucket in buckets] or [0])
+    if wait_time:
+        return wait_time
+    for bucket in buckets:
+        bucket.take(recipients_count, now)
+    return 0
+
+
+def get_batch_size(backend_name):
+    """
+    The current size of the batches of recipients for the backend.
+    """
+    return cache.get(
+        BATCH_SIZE_CACHE_KEY.format(backend=backend_name),
+        getattr(settings, "NAU_COURSE_MESSAGE_BATCH_SIZE", 50),
+    )
+
+
+def record_send_result(backend_name, batch_size, seconds, failed):
+    """
+    Adapt the size of the batches of the backend to the result of sending a batch.
+
+    The size is halved when the backend fails, decreased when it's slower than the
+    `NAU_COURSE_MESSAGE_TARGET_LATENCY_SECONDS` and slowly increased otherwise, between the
+    `NAU_COURSE_MESSAGE_MIN_BATCH_SIZE` and the `NAU_COURSE_MESSAGE_MAX_BATCH_SIZE`.
+    """
+    min_batch_size = getattr(settings, "NAU_COURSE_MESSAGE_MIN_BATCH_SIZE", 10)
+    max_batch_size = getattr(settings, "NAU_COURSE_MESSAGE_MAX_BATCH_SIZE", 500)
+    target_latency = getattr(settings, "NAU_COURSE_MESSAGE_TARGET_LATENCY_SECONDS", 5)
+
+    if failed:
+        new_batch_size = batch_size // 2
+    elif seconds > target_latency:
+        new_batch_size = int(batch_size * 0.75)
+    else:
+        new_batch_size = batch_size + max(batch_size // 10, 1)
+    new_batch_size = max(min_batch_size, min(max_batch_size, new_batch_size))
+    cache.set(BATCH_SIZE_CACHE_KEY.format(backend=backend_name), new_batch_size, CACHE_TIMEOUT)
+    return new_batch_size
@@ -9,14 +9,15 @@ import logging
 import six
 from common.djangoapps.util.json_request import JsonResponse  # pylint: disable=import-error
 from django.contrib.auth.decorators import permission_required
-from django.http import HttpResponseBadRequest
+from django.http import Http404, HttpResponseBadRequest
+from django.urls import reverse
 from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import ensure_csrf_cookie
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from opaque_keys.edx.keys import CourseKey
 
 from nau_openedx_extensions.message_gateway import tasks
-from nau_openedx_extensions.message_gateway.models import NauCourseMessage
+from nau_openedx_extensions.message_gateway.models import NauCourseMessage, NauCourseMessageProgress
 from nau_openedx_extensions.permissions import NAU_SEND_MESSAGE_PERMISSION_NAME
 
 log = logging.getLogger(__name__)
@@ -54,5 +55,26 @@ def send_message(request, course_id):
     response_payload = {
         "course_id": six.text_type(course_id),
         "success": True,
+        "message_id": message.id,
+        "progress_url": reverse(
+            "nau-openedx-extensions:message_progress",
+            kwargs={"course_id": six.text_type(course_id), "message_id": message.id},
+        ),
     }
     return JsonResponse(response_payload)
+
+
+@require_GET
+@permission_required(NAU_SEND_MESSAGE_PERMISSION_NAME)
+@cache_control(no_cache=True, no_store=True, must_revalidate=True)
+def message_progress(request, course_id, message_id):
+    """
+    Return the send progress of a course message, to be polled while it's sent.
+    """
+    course_key = CourseKey.from_string(course_id)
+    progress = NauCourseMessageProgress.objects.filter(
+        message_id=message_id, message__course_id=course_key
+    ).first()
+    if progress is None:
+        raise Http404()
+    return JsonResponse(progress.to_dict())
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.28 on 2026-10-18 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nau_openedx_extensions', '0008_rename_data_authorization'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NauCourseMessageBatch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=255, unique=True)),
+                ('first_recipient_id', models.IntegerField()),
+                ('last_recipient_id', models.IntegerField()),
+                ('recipients_count', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('sent', 'Sent'), ('failed', 'Failed')], db_index=True, default='queued', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('modified', models.DateTimeField(auto_now=True)),
+                ('message', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='batches', to='nau_openedx_extensions.NauCourseMessage')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nau_openedx_extensions', '0009_naucoursemessagebatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='naucoursemessagebatch',
+            name='recipient_ids',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
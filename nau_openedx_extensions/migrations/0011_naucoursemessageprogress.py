@@ -0,0 +1,28 @@
+# Generated by Django 2.2.28 on 2026-10-18 14:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nau_openedx_extensions', '0010_naucoursemessagebatch_recipient_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NauCourseMessageProgress',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipients_total', models.PositiveIntegerField(default=0)),
+                ('recipients_sent', models.PositiveIntegerField(default=0)),
+                ('recipients_failed', models.PositiveIntegerField(default=0)),
+                ('dispatch_finished', models.BooleanField(default=False)),
+                ('started', models.DateTimeField(blank=True, null=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('modified', models.DateTimeField(auto_now=True)),
+                ('message', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='nau_openedx_extensions.NauCourseMessage')),
+            ],
+        ),
+    ]
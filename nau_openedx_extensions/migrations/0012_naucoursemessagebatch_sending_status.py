@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nau_openedx_extensions', '0011_naucoursemessageprogress'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='naucoursemessagebatch',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], db_index=True, default='queued', max_length=10),
+        ),
+    ]
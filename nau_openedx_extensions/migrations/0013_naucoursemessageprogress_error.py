@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nau_openedx_extensions', '0012_naucoursemessagebatch_sending_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='naucoursemessageprogress',
+            name='error',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
@@ -4,4 +4,9 @@
 from __future__ import absolute_import, unicode_literals
 
 from nau_openedx_extensions.custom_registration_form.models import NauUserExtendedModel  # pylint: disable=unused-import
-from nau_openedx_extensions.message_gateway.models import NauCourseMessage  # pylint: disable=unused-import
+from nau_openedx_extensions.message_gateway.models import (  # pylint: disable=unused-import
+    NauCourseMessage,
+    NauCourseMessageBatch,
+    NauCourseMessageProgress,
+)
+from nau_openedx_extensions.verify_student.models import NauIdVerificationQueueItem  # pylint: disable=unused-import
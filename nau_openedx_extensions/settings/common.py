@@ -56,6 +56,7 @@ def plugin_settings(settings):
     settings.NAU_STUDENT_ACCOUNT_CONTEXT_EXTENSION = "nau_openedx_extensions.custom_registration_form.context_extender.update_account_view"
     settings.NAU_STUDENT_SERIALIZER_CONTEXT_EXTENSION = "nau_openedx_extensions.custom_registration_form.context_extender.update_account_serializer"
     settings.NAU_STUDENT_ACCOUNT_PARTIAL_UPDATE = "nau_openedx_extensions.custom_registration_form.context_extender.partial_update"
+    settings.NAU_CERTIFICATES_SETTINGS_CACHE_SIZE = 512
     settings.NAU_COURSEWARE_MODULE = (
         "nau_openedx_extensions.edxapp_wrapper.backends.courseware_h_v1"
     )
@@ -65,6 +66,7 @@ def plugin_settings(settings):
     settings.NAU_GRADES_MODULE = (
         "nau_openedx_extensions.edxapp_wrapper.backends.grades_h_v1"
     )
+    settings.NAU_COURSE_GRADE_SUMMARY_CACHE_TIMEOUT = 60 * 60 * 24
     settings.NAU_REGISTRATION_MODULE = (
         "nau_openedx_extensions.edxapp_wrapper.backends.registration_l_v1"
     )
@@ -74,7 +76,16 @@ def plugin_settings(settings):
     settings.NAU_EMAIL_MODULE = (
         "nau_openedx_extensions.edxapp_wrapper.backends.email_module_l_v1"
     )
+    settings.NAU_ENROLLMENT_DOMAIN_FILTER_CACHE_TIMEOUT = 60 * 60
     settings.NAU_COURSE_MESSAGE_BATCH_SIZE = 50
+    settings.NAU_COURSE_MESSAGE_MIN_BATCH_SIZE = 10
+    settings.NAU_COURSE_MESSAGE_MAX_BATCH_SIZE = 500
+    settings.NAU_COURSE_MESSAGE_TARGET_LATENCY_SECONDS = 5
+    settings.NAU_COURSE_MESSAGE_BACKEND_RATE_LIMIT = 100
+    settings.NAU_COURSE_MESSAGE_COURSE_RATE_LIMIT = 50
+    settings.NAU_COURSE_MESSAGE_RATE_LIMIT_BURST_SECONDS = 10
+    settings.NAU_COURSE_MESSAGE_DISPATCH_BATCHES = 20
+    settings.NAU_COURSE_MESSAGE_BATCH_STALE_SECONDS = 60 * 60
     settings.NAU_COURSE_MESSAGE_RECIPIENT_FIELDS = ["profile__name", "email"]
     settings.NAU_CC_ALLOWED_SLUG = "cccmd:"
     settings.NAU_ACCOUNTS_CC_VISIBLE_FIELDS = ["employment_situation", "nif"]
@@ -88,6 +99,13 @@ def plugin_settings(settings):
     settings.NAU_COHORT_MODULE = (
         "nau_openedx_extensions.edxapp_wrapper.backends.cohort_v1"
     )
+    settings.NAU_COHORT_NAME_CACHE_TIMEOUT = 60 * 5
     settings.NAU_VERIFY_STUDENT_MODULE = (
         "nau_openedx_extensions.edxapp_wrapper.backends.verify_student_v1"
     )
+    settings.NAU_NO_ID_VERIFY_ASYNC = False
+    settings.NAU_NO_ID_VERIFY_ASYNC_FLUSH_DELAY = 30
+    settings.NAU_NO_ID_VERIFY_ASYNC_BATCH_SIZE = 500
+    settings.CELERY_IMPORTS = tuple(getattr(settings, "CELERY_IMPORTS", ())) + (
+        "nau_openedx_extensions.verify_student.tasks",
+    )
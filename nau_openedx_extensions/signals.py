@@ -2,6 +2,21 @@
 File that contains the definition of all signals and its receivers.
 """
 
+from nau_openedx_extensions.edxapp_wrapper.course_module import get_course_published_signal
+from nau_openedx_extensions.edxapp_wrapper.grades import (
+    get_course_grade_changed_signal,
+    invalidate_course_grade_summary,
+)
+from nau_openedx_extensions.filters.pipeline import invalidate_enrollment_domain_filter_settings
 from nau_openedx_extensions.verify_student.id_verification import (  # pylint: disable=unused-import
     event_receiver_no_id_verify_for_enrollment_modes,
 )
+
+get_course_grade_changed_signal().connect(
+    invalidate_course_grade_summary,
+    dispatch_uid="nau_openedx_extensions.invalidate_course_grade_summary",
+)
+get_course_published_signal().connect(
+    invalidate_enrollment_domain_filter_settings,
+    dispatch_uid="nau_openedx_extensions.invalidate_enrollment_domain_filter_settings",
+)
@@ -27,7 +27,10 @@ function sendMessage(form) {
       dataType: "json",
       url: messageApiEndpoint,
       data: sendData,
-      success: function () {
+      success: function (data) {
+        if (data.progress_url) {
+          poll_progress(data.progress_url);
+        }
         return display_response(
           gettext(
             "Your message was successfully queued for sending. In courses with a large number of learners, messages to learners might take some time to be sent."
@@ -64,3 +67,82 @@ function display_response(msg, form) {
   });
 }
 
+
+var PROGRESS_POLL_INTERVAL = 3000;
+// stop polling when the progress doesn't change for this long, e.g. because the workers stopped
+var PROGRESS_STALE_TIMEOUT = 10 * 60 * 1000;
+
+function poll_progress(progressUrl, lastModified, lastChangeTime) {
+  return $.ajax({
+    type: "GET",
+    dataType: "json",
+    url: progressUrl,
+    success: function (progress) {
+      display_progress(progress);
+      if (progress.finished) {
+        return;
+      }
+      var now = Date.now();
+      if (progress.modified !== lastModified) {
+        lastModified = progress.modified;
+        lastChangeTime = now;
+      }
+      if (now - (lastChangeTime || now) >= PROGRESS_STALE_TIMEOUT) {
+        $("#send-message-progress .send-message-progress-status").text(
+          gettext("The send progress hasn't changed for a while. Reload the page later to check it again.")
+        );
+        return;
+      }
+      setTimeout(function () {
+        poll_progress(progressUrl, lastModified, lastChangeTime);
+      }, PROGRESS_POLL_INTERVAL);
+    },
+    error: function () {
+      $("#send-message-progress .send-message-progress-status").text(
+        gettext("Error reading the send progress.")
+      );
+    },
+  });
+}
+
+function display_progress(progress) {
+  var $progress = $("#send-message-progress");
+  var status = interpolate(
+    gettext("Sent to %(sent)s of %(total)s recipients, %(failed)s failed, %(rate)s messages per second."),
+    {
+      sent: progress.recipients_sent,
+      total: progress.recipients_total,
+      failed: progress.recipients_failed,
+      rate: progress.messages_per_second,
+    },
+    true
+  );
+  if (progress.error) {
+    status += " " + interpolate(
+      gettext("Not all the recipients could be queued: %(error)s"),
+      { error: progress.error },
+      true
+    );
+  }
+  if (progress.finished) {
+    status += " " + gettext("The send has finished.");
+  } else if (progress.estimated_seconds_left !== null) {
+    status +=
+      " " +
+      interpolate(
+        gettext("About %(minutes)s minutes left."),
+        { minutes: Math.ceil(progress.estimated_seconds_left / 60) },
+        true
+      );
+  } else if (!progress.dispatch_finished) {
+    status += " " + gettext("Still queuing the recipients.");
+  }
+  $progress.find(".send-message-progress-bar").attr({
+    value: progress.recipients_sent + progress.recipients_failed,
+    max: Math.max(progress.recipients_total, 1),
+  });
+  $progress.find(".send-message-progress-status").text(status);
+  return $progress.css({
+    display: "block",
+  });
+}
@@ -0,0 +1,111 @@
+"""
+Tests for the command that creates the missing ID verifications.
+"""
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from nau_openedx_extensions.management.commands import backfill_no_id_verifications
+from nau_openedx_extensions.management.commands.backfill_no_id_verifications import Command
+
+
+class UsersQuerySet:
+    """
+    The part of the queryset of the users used by the command, with the `(pk, name)` of the users.
+    """
+
+    def __init__(self, users):
+        self.users = users
+
+    def count(self):
+        return len(self.users)
+
+    def order_by(self, field):
+        return UsersQuerySet(sorted(self.users)) if field == "pk" else self
+
+    def filter(self, pk__gt):
+        return UsersQuerySet([user for user in self.users if user[0] > pk__gt])
+
+    def values_list(self, *fields):  # pylint: disable=unused-argument
+        return self.users
+
+
+@override_settings(NAU_NO_ID_VERIFY_FOR_ENROLLMENT_MODES="verified, honor")
+@patch.object(backfill_no_id_verifications, "create_user_id_verifications")
+@patch.object(backfill_no_id_verifications, "get_users_without_active_id_verification")
+class BackfillNoIdVerificationsTest(TestCase):
+    """
+    Test the backfill of the ID verifications of the learners enrolled on the modes that don't
+    need one.
+    """
+
+    users = [(5, "Learner 5"), (1, "Learner 1"), (3, "Learner 3"), (8, "Learner 8"), (2, "Learner 2")]
+
+    def call_command(self, *args):
+        """
+        Run the command and return its output.
+        """
+        stdout = StringIO()
+        call_command(Command(), *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_create_in_batches(self, get_users_mock, create_mock):
+        """
+        The verifications are created for the users in batches, in the order of their ids.
+        """
+        get_users_mock.return_value = UsersQuerySet(self.users)
+        create_mock.side_effect = lambda batch, **kwargs: len(batch) - 1 if batch[0][0] == 1 else len(batch)
+
+        output = self.call_command("--batch-size", "2")
+
+        get_users_mock.assert_called_once_with(["honor", "verified"])
+        self.assertEqual(
+            [
+                [(1, "Learner 1"), (2, "Learner 2")],
+                [(3, "Learner 3"), (5, "Learner 5")],
+                [(8, "Learner 8")],
+            ],
+            [call_args[0][0] for call_args in create_mock.call_args_list],
+        )
+        self.assertEqual("approved", create_mock.call_args[1]["status"])
+        self.assertIn("Found 5 users without an ID verification enrolled on the modes: honor, verified", output)
+        self.assertIn("Created 1 of 5 ID verifications", output)
+        self.assertIn("Created 4 of 5 ID verifications", output)
+
+    def test_modes(self, get_users_mock, create_mock):
+        """
+        The enrollment modes of the option are used instead of the setting.
+        """
+        get_users_mock.return_value = UsersQuerySet(self.users)
+        create_mock.side_effect = lambda batch, **kwargs: len(batch)
+
+        output = self.call_command("--modes", "professional")
+
+        get_users_mock.assert_called_once_with(["professional"])
+        self.assertEqual(1, create_mock.call_count)
+        self.assertIn("Created 5 of 5 ID verifications", output)
+
+    def test_dry_run(self, get_users_mock, create_mock):
+        """
+        The dry run only counts the users.
+        """
+        get_users_mock.return_value = UsersQuerySet(self.users)
+
+        output = self.call_command("--dry-run")
+
+        create_mock.assert_not_called()
+        self.assertIn("Found 5 users without an ID verification", output)
+        self.assertNotIn("Created", output)
+
+    def test_no_users(self, get_users_mock, create_mock):
+        """
+        Nothing is created when all the users have an ID verification.
+        """
+        get_users_mock.return_value = UsersQuerySet([])
+
+        output = self.call_command()
+
+        create_mock.assert_not_called()
+        self.assertIn("Found 0 users without an ID verification", output)
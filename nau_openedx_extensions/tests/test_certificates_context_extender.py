@@ -4,10 +4,17 @@ Tests for the pipeline module used in nau_openex_extensions
 
 from unittest.mock import MagicMock
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
+from nau_openedx_extensions.certificates.compiled_settings import (
+    CompiledCertificateSettings,
+    QualitativeGradeRanges,
+    QualitativeGradeRangesError,
+    get_compiled_certificate_settings,
+)
 from nau_openedx_extensions.certificates.context_extender import (
     get_qualitative_grade,
+    get_qualitative_grades,
     update_context_with_interpolated_strings,
 )
 
@@ -96,3 +103,118 @@ on scale from 0 to 10 and a qualitative grade of {course_grade_qualitative}."
         update_context_with_interpolated_strings(context, nau_certs_settings, "pt-pt")
         print(context)
         self.assertDictEqual(expected_context, context)
+
+
+class CompiledCertificateSettingsTest(TestCase):
+    """Test the compiled certificate settings."""
+
+    nau_certs_settings = {
+        "interpolated_strings": {
+            "accomplishment_copy_course_description": {
+                "pt-pt": "nota qualitativa de {course_grade_qualitative}",
+                "en": "qualitative grade of {course_grade_qualitative}",
+            }
+        },
+        "calculate_grades_context": True,
+        "course_qualitative_grade": {
+            "ranges": [
+                {"grade_text": "Insuficient", "min_included": 0, "max_excluded": 50},
+                {"grade_text": {"pt-pt": "Bom", "en": "Good"}, "min_included": 50, "max_excluded": 101},
+            ],
+            "grade_round_format": "course_percent_grade:.0%",
+        },
+    }
+
+    def test_compile_settings(self):
+        """
+        Test that the settings are parsed for the certificate language.
+        """
+        compiled_settings = CompiledCertificateSettings(self.nau_certs_settings, "pt-pt")
+
+        self.assertTrue(compiled_settings.calculate_grades_context)
+        self.assertEqual(
+            {"accomplishment_copy_course_description": "nota qualitativa de {course_grade_qualitative}"},
+            compiled_settings.interpolated_strings,
+        )
+        self.assertEqual([0.0, 50.0], compiled_settings.qualitative_ranges.boundaries)
+        self.assertEqual(["Insuficient", "Bom"], compiled_settings.qualitative_ranges.grade_texts)
+        self.assertEqual([], compiled_settings.qualitative_ranges.errors)
+        self.assertEqual("52", compiled_settings.round_grade({"course_percent_grade": 0.521}))
+        self.assertEqual("Bom", compiled_settings.get_qualitative_grade("52"))
+
+    def test_compiled_settings_cached_per_course_version(self):
+        """
+        Test that the settings are only compiled again when the course version changes.
+        """
+        course = MagicMock(id="course-v1:Demo+DemoX+Demo_Course", course_version="1")
+
+        compiled_settings = get_compiled_certificate_settings(course, self.nau_certs_settings, "en")
+
+        self.assertIs(compiled_settings, get_compiled_certificate_settings(course, self.nau_certs_settings, "en"))
+        self.assertIsNot(compiled_settings, get_compiled_certificate_settings(course, self.nau_certs_settings, "pt-pt"))
+        course.course_version = "2"
+        self.assertIsNot(compiled_settings, get_compiled_certificate_settings(course, self.nau_certs_settings, "en"))
+
+    def test_get_qualitative_grades(self):
+        """
+        Test the batch lookup of the qualitative grades.
+        """
+        ranges = self.nau_certs_settings["course_qualitative_grade"]["ranges"]
+
+        self.assertEqual(
+            ["Good", "Insuficient", None, None, "Good"],
+            get_qualitative_grades("en", ranges, ["50", "49.99", "101", "not a grade", 100]),
+        )
+
+    @override_settings(LANGUAGE_CODE="fr")
+    def test_range_without_grade_text(self):
+        """
+        Test that a range without a grade text for the language doesn't hide the range that
+        overlaps it.
+        """
+        ranges = [
+            {"min_included": 0, "max_excluded": 60, "grade_text": {"pt-pt": "Insuficiente"}},
+            {"min_included": 50, "max_excluded": 101, "grade_text": {"en": "Good"}},
+        ]
+
+        self.assertEqual(["Good", None], get_qualitative_grades("en", ranges, ["55", "40"]))
+        self.assertEqual(["Insuficiente", None], get_qualitative_grades("pt-pt", ranges, ["55", "70"]))
+
+
+class QualitativeGradeRangesTest(TestCase):
+    """Test the qualitative grade ranges."""
+
+    def test_unordered_ranges(self):
+        """
+        Test that the ranges don't need to be ordered on the settings.
+        """
+        ranges = QualitativeGradeRanges([(50.0, 100.0, "Good"), (0.0, 50.0, "Bad")])
+
+        self.assertEqual("Bad", ranges.get(0))
+        self.assertEqual("Good", ranges.get(50))
+        self.assertIsNone(ranges.get(100))
+        self.assertIsNone(ranges.get(-1))
+        ranges.validate()
+
+    def test_overlapping_ranges(self):
+        """
+        Test that the range that starts first wins on an overlap and that the overlap is an error.
+        """
+        ranges = QualitativeGradeRanges([(0.0, 60.0, "Bad"), (50.0, 100.0, "Good")])
+
+        self.assertEqual("Bad", ranges.get(55))
+        self.assertEqual("Good", ranges.get(60))
+        self.assertEqual(1, len(ranges.errors))
+        with self.assertRaises(QualitativeGradeRangesError):
+            ranges.validate()
+
+    def test_ranges_with_gaps(self):
+        """
+        Test that a grade on a gap between ranges doesn't have a text and that the gap is an error.
+        """
+        ranges = QualitativeGradeRanges([(0.0, 40.0, "Bad"), (50.0, 100.0, "Good")])
+
+        self.assertIsNone(ranges.get(45))
+        self.assertEqual(1, len(ranges.errors))
+        with self.assertRaises(QualitativeGradeRangesError):
+            ranges.validate()
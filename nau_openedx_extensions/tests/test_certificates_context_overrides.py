@@ -5,7 +5,11 @@ from unittest.mock import MagicMock, PropertyMock, patch
 
 from django.test import TestCase
 
-from nau_openedx_extensions.certificates.context_overrides import CertificatesContextCohortOverride
+from nau_openedx_extensions.certificates.context_overrides import (
+    CertificatesContextCohortOverride,
+    _compiled_cohort_overrides_cache,
+    get_compiled_cohort_overrides,
+)
 
 
 class CertificatesContextOverridesTest(TestCase):
@@ -151,3 +155,144 @@ class CertificatesContextOverridesTest(TestCase):
                 },
             },
         })
+
+    @patch('nau_openedx_extensions.certificates.context_overrides.get_cohort')
+    @patch('nau_openedx_extensions.certificates.context_overrides.get_cohort_name')
+    def test_certificates_context_overrides_by_user_id(self, get_cohort_name_mock, get_cohort_mock):
+        """
+        Check that the cohort is read by the user id of the context, without reading the user by its username.
+        """
+        get_cohort_name_mock.return_value = "SomeGroup"
+
+        context = {
+            "username": "nau@example.com",
+            "accomplishment_user_id": 10,
+            "course_id": "course-v1:Demo+DemoX+Demo_Course",
+            "footer_additional_logo": "http://lms.example.com/base_logo.png",
+            "cohort_overrides": {
+                "SomeGroup": {
+                    "footer_additional_logo": "http://lms.example.com/override_logo.png",
+                },
+            },
+        }
+        result = CertificatesContextCohortOverride.run_filter(None, context, "some_template")
+        get_cohort_name_mock.assert_called_once_with(10, "course-v1:Demo+DemoX+Demo_Course")
+        get_cohort_mock.assert_not_called()
+
+        self.assertEqual(result['context']["footer_additional_logo"], "http://lms.example.com/override_logo.png")
+
+    @patch('nau_openedx_extensions.certificates.context_overrides.get_cohort_name')
+    def test_certificates_context_overrides_empty(self, get_cohort_name_mock):
+        """
+        Check that the cohort isn't read when the cohort overrides don't have any cohort.
+        """
+        context = {
+            "username": "nau@example.com",
+            "accomplishment_user_id": 10,
+            "course_id": "course-v1:Demo+DemoX+Demo_Course",
+            "cohort_overrides": {},
+        }
+        CertificatesContextCohortOverride.run_filter(None, context, "some_template")
+        get_cohort_name_mock.assert_not_called()
+
+
+class CompiledCohortOverridesTest(TestCase):
+    """
+    Test the cohort overrides compiled once per course.
+    """
+
+    def setUp(self):
+        _compiled_cohort_overrides_cache.clear()
+        self.context = {
+            "username": "nau@example.com",
+            "course_id": "course-v1:Demo+DemoX+Demo_Course",
+            "footer": {"logo": "http://lms.example.com/base_logo.png", "text": "NAU"},
+            "cohort_overrides": {
+                "SomeGroup": {
+                    "footer": {"logo": "http://lms.example.com/override_logo.png"},
+                    "partners": ["A", "B"],
+                },
+                "OtherGroup": {
+                    "footer": {"text": "Other"},
+                },
+            },
+        }
+
+    @patch('nau_openedx_extensions.certificates.context_overrides.get_cohort_name', return_value="SomeGroup")
+    def test_nested_overrides_are_merged(self, _):
+        """
+        Check that a cohort can override only some of the keys of a nested dict.
+        """
+        context = dict(self.context, accomplishment_user_id=10)
+
+        result = CertificatesContextCohortOverride.run_filter(None, context, "some_template")
+
+        self.assertEqual(
+            {"logo": "http://lms.example.com/override_logo.png", "text": "NAU"},
+            result["context"]["footer"],
+        )
+        self.assertEqual(["A", "B"], result["context"]["partners"])
+        self.assertEqual("nau@example.com", result["context"]["username"])
+
+    @patch('nau_openedx_extensions.certificates.context_overrides.get_cohort_name', return_value="SomeGroup")
+    def test_changes_dont_touch_the_layers(self, _):
+        """
+        Check that the changes of the next pipeline steps don't change the compiled overrides.
+        """
+        context = dict(self.context, accomplishment_user_id=10)
+
+        result = CertificatesContextCohortOverride.run_filter(None, context, "some_template")
+        result["context"]["footer"]["logo"] = "changed"
+        result["context"]["partners"].append("C")
+
+        layer = get_compiled_cohort_overrides(self.context).get_layer("SomeGroup")
+        self.assertEqual("http://lms.example.com/override_logo.png", layer["footer"]["logo"])
+        self.assertEqual(("A", "B"), layer["partners"])
+        self.assertEqual("http://lms.example.com/base_logo.png", self.context["footer"]["logo"])
+        with self.assertRaises(TypeError):
+            layer["footer"]["logo"] = "changed"
+
+    def test_compiled_once_per_cohort_overrides(self):
+        """
+        Check that the overrides are only compiled again when the cohort overrides change.
+        """
+        compiled_overrides = get_compiled_cohort_overrides(self.context)
+
+        self.assertIs(compiled_overrides, get_compiled_cohort_overrides(dict(self.context, footer={})))
+
+        self.context["cohort_overrides"]["OtherGroup"]["footer"]["text"] = "New"
+        recompiled_overrides = get_compiled_cohort_overrides(self.context)
+        self.assertIsNot(compiled_overrides, recompiled_overrides)
+        self.assertEqual("New", recompiled_overrides.get_layer("OtherGroup")["footer"]["text"])
+
+    @patch('nau_openedx_extensions.certificates.context_overrides.get_cohort_name', return_value="SomeGroup")
+    def test_merged_with_the_context_of_each_render(self, _):
+        """
+        Check that the cached overrides are merged with the nested dicts of the context of each render.
+        """
+        CertificatesContextCohortOverride.run_filter(
+            None, dict(self.context, accomplishment_user_id=10), "some_template"
+        )
+        context = dict(
+            self.context,
+            accomplishment_user_id=11,
+            footer={"logo": "http://lms.example.com/base_logo.png", "text": "NAU", "lang": "en"},
+        )
+
+        result = CertificatesContextCohortOverride.run_filter(None, context, "some_template")
+
+        self.assertEqual(
+            {"logo": "http://lms.example.com/override_logo.png", "text": "NAU", "lang": "en"},
+            result["context"]["footer"],
+        )
+
+    def test_invalid_cohort_overrides(self):
+        """
+        Check that the cohorts with overrides that aren't a dict are ignored.
+        """
+        self.context["cohort_overrides"]["BadGroup"] = "not a dict"
+
+        compiled_overrides = get_compiled_cohort_overrides(self.context)
+
+        self.assertIsNone(compiled_overrides.get_layer("BadGroup"))
+        self.assertEqual(1, len(compiled_overrides.errors))
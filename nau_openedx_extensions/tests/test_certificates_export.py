@@ -0,0 +1,329 @@
+"""
+Tests for the helpers of the certificates export commands.
+"""
+import csv
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from opaque_keys.edx.keys import CourseKey
+from pytz import UTC
+
+from nau_openedx_extensions.management.certificates_export import (
+    CSV_HEADER,
+    SINCE_LAST_EXPORT,
+    ExportManifest,
+    delete_partial_downloads,
+    download_file,
+    download_files,
+    get_since_date,
+    write_certificates_csv,
+)
+
+
+def mock_session(chunks, headers=None):
+    """
+    A requests session whose responses return the `chunks`, an exception on the chunks is raised
+    while the content is read.
+    """
+
+    def iter_content(chunk_size):  # pylint: disable=unused-argument
+        for chunk in chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    response = MagicMock()
+    response.headers = headers or {}
+    response.iter_content.side_effect = iter_content
+    response.__enter__.return_value = response
+    session = MagicMock()
+    session.get.return_value = response
+    return session
+
+
+class WriteCertificatesCsvTest(TestCase):
+    """
+    Test the csv file with the links of the certificates.
+    """
+
+    def test_write_certificates(self):
+        """
+        A row is written for each certificate, with the links of the LMS of its organization, and
+        the LMS root URL of each organization is only read once.
+        """
+        fct_course = CourseKey.from_string("course-v1:FCT+CTC101x+2020_T2")
+        nau_course = CourseKey.from_string("course-v1:NAU+N101+2021_T1")
+        certificates = iter([
+            (fct_course, "learner1@example.com", "learner1", "Learner 1", "2022-09-01", "uuid1"),
+            (fct_course, "learner2@example.com", "learner2", "Learner 2", "2022-09-02", "uuid2"),
+            (nau_course, "learner3@example.com", "learner3", "Learner 3", "2022-09-03", "uuid3"),
+        ])
+        get_lms_root_url = MagicMock(side_effect=lambda org: f"https://{org.lower()}.example.com")
+
+        with tempfile.TemporaryFile() as csv_file:
+            count = write_certificates_csv(
+                csv_file, certificates, "https://certificates.example.com/", get_lms_root_url
+            )
+            rows = list(csv.reader(io.TextIOWrapper(csv_file, encoding="utf-8", newline="")))
+
+        self.assertEqual(3, count)
+        self.assertEqual(CSV_HEADER, rows[0])
+        self.assertEqual(
+            [
+                "course-v1:FCT+CTC101x+2020_T2",
+                "learner1@example.com",
+                "learner1",
+                "Learner 1",
+                "2022-09-01",
+                "uuid1",
+                "https://fct.example.com/certificates/uuid1",
+                "https://certificates.example.com/uuid1",
+            ],
+            rows[1],
+        )
+        self.assertEqual("https://nau.example.com/certificates/uuid3", rows[3][6])
+        self.assertEqual(["FCT", "NAU"], [args[0] for args, _ in get_lms_root_url.call_args_list])
+
+    def test_no_certificates(self):
+        """
+        The file only has the header when there are no certificates.
+        """
+        with tempfile.TemporaryFile() as csv_file:
+            count = write_certificates_csv(csv_file, [], "https://certificates.example.com/", MagicMock())
+            rows = list(csv.reader(io.TextIOWrapper(csv_file, encoding="utf-8", newline="")))
+
+        self.assertEqual(0, count)
+        self.assertEqual([CSV_HEADER], rows)
+
+
+class DownloadFileTest(TestCase):
+    """
+    Test the download of a certificate to a folder.
+    """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+
+    def test_download(self):
+        """
+        The content is saved with the name of the filename header.
+        """
+        session = mock_session(
+            [b"%PDF", b"-1.4"], {"content-disposition": "attachment; filename=cert.pdf", "etag": "abc"}
+        )
+
+        info = download_file(self.folder, "https://example.com/certificates/uuid", session=session)
+
+        self.assertEqual(
+            {"filename": "cert.pdf", "etag": "abc", "size": 8, "sha256": hashlib.sha256(b"%PDF-1.4").hexdigest()},
+            info,
+        )
+        self.assertEqual(["cert.pdf"], os.listdir(self.folder))
+        with open(os.path.join(self.folder, "cert.pdf"), "rb") as pdf_file:
+            self.assertEqual(b"%PDF-1.4", pdf_file.read())
+
+    def test_failed_download_leaves_no_file(self):
+        """
+        A download that fails while reading the content doesn't leave a truncated file.
+        """
+        session = mock_session([b"%PDF", ConnectionError("connection reset")])
+
+        with self.assertRaises(ConnectionError):
+            download_file(self.folder, "https://example.com/certificates/uuid", session=session)
+
+        self.assertEqual([], os.listdir(self.folder))
+
+    def test_delete_partial_downloads(self):
+        """
+        The partial files of an interrupted export are deleted, the downloaded files are kept.
+        """
+        for filename in ("done.pdf", "interrupted.pdf.part"):
+            with open(os.path.join(self.folder, filename), "wb") as pdf_file:
+                pdf_file.write(b"%PDF")
+
+        delete_partial_downloads(self.folder)
+
+        self.assertEqual(["done.pdf"], os.listdir(self.folder))
+
+
+class DownloadFilesTest(TestCase):
+    """
+    Test the parallel download of the certificates.
+    """
+
+    def test_returns_failed_downloads(self):
+        """
+        A failed download doesn't stop the others and its verify_uuid is returned.
+        """
+        def download(url):
+            if url.endswith("bad"):
+                raise ValueError("Not found")
+            return {"filename": url}
+
+        progress_callback = MagicMock()
+        urls = {
+            "uuid1": "https://example.com/ok1",
+            "uuid2": "https://example.com/bad",
+            "uuid3": "https://example.com/ok3",
+        }
+
+        failed = download_files(download, urls, concurrency=2, progress_callback=progress_callback)
+
+        self.assertEqual(["uuid2"], failed)
+        self.assertEqual(3, progress_callback.call_count)
+        results = {args[0]: (args[1], args[2]) for args, _ in progress_callback.call_args_list}
+        self.assertEqual({"filename": "https://example.com/ok1"}, results["uuid1"][0])
+        self.assertIsNone(results["uuid2"][0])
+        self.assertIsInstance(results["uuid2"][1], ValueError)
+        self.assertEqual([3, 3, 3], [args[4] for args, _ in progress_callback.call_args_list])
+        self.assertEqual([1, 2, 3], sorted(args[3] for args, _ in progress_callback.call_args_list))
+
+    def test_no_urls(self):
+        """
+        Nothing fails when there's nothing to download.
+        """
+        self.assertEqual([], download_files(MagicMock(), {}, concurrency=4))
+
+
+class ExportManifestTest(TestCase):
+    """
+    Test the manifest of the certificates downloaded by a course export.
+    """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.path = os.path.join(self.folder, "course.manifest.jsonl")
+        self.modified_date = datetime(2022, 9, 1, tzinfo=UTC)
+
+    def add_certificate(self, manifest, verify_uuid, content=b"%PDF"):
+        """
+        Save a downloaded certificate to the folder and record it on the manifest.
+        """
+        filename = verify_uuid + ".pdf"
+        with open(os.path.join(self.folder, filename), "wb") as pdf_file:
+            pdf_file.write(content)
+        manifest.add(verify_uuid, self.modified_date, {"filename": filename, "size": len(content)})
+
+    def test_resume(self):
+        """
+        A loaded manifest has the certificates downloaded by the previous export.
+        """
+        manifest = ExportManifest(self.path)
+        self.add_certificate(manifest, "uuid1")
+
+        manifest = ExportManifest(self.path).load()
+
+        self.assertTrue(manifest.is_downloaded("uuid1", self.modified_date, self.folder))
+        self.assertFalse(manifest.is_downloaded("uuid2", self.modified_date, self.folder))
+        self.assertIsNone(manifest.last_export_date)
+
+    def test_modified_certificate_is_downloaded_again(self):
+        """
+        A certificate modified after it was downloaded has to be downloaded again.
+        """
+        manifest = ExportManifest(self.path)
+        self.add_certificate(manifest, "uuid1")
+
+        self.assertFalse(manifest.is_downloaded("uuid1", datetime(2022, 9, 2, tzinfo=UTC), self.folder))
+
+    def test_missing_or_truncated_file_is_downloaded_again(self):
+        """
+        A certificate whose file was deleted or doesn't have the downloaded size has to be
+        downloaded again.
+        """
+        manifest = ExportManifest(self.path)
+        self.add_certificate(manifest, "uuid1")
+        self.add_certificate(manifest, "uuid2")
+        os.remove(os.path.join(self.folder, "uuid1.pdf"))
+        with open(os.path.join(self.folder, "uuid2.pdf"), "wb") as pdf_file:
+            pdf_file.write(b"%P")
+
+        self.assertFalse(manifest.is_downloaded("uuid1", self.modified_date, self.folder))
+        self.assertFalse(manifest.is_downloaded("uuid2", self.modified_date, self.folder))
+
+    def test_interrupted_manifest(self):
+        """
+        A line truncated by an interrupted export is ignored, and the next records are still read.
+        """
+        manifest = ExportManifest(self.path)
+        self.add_certificate(manifest, "uuid1")
+        with open(self.path, "a") as manifest_file:
+            manifest_file.write('{"verify_uuid": "uuid2", "modi')
+
+        manifest = ExportManifest(self.path).load()
+        self.add_certificate(manifest, "uuid3")
+        manifest = ExportManifest(self.path).load()
+
+        self.assertEqual(["uuid1", "uuid3"], sorted(manifest.entries))
+
+    def test_finish(self):
+        """
+        The date of the last successful export is kept by the manifest.
+        """
+        export_date = datetime(2022, 10, 1, 12, 30, tzinfo=UTC)
+        manifest = ExportManifest(self.path)
+        self.add_certificate(manifest, "uuid1")
+        manifest.finish(export_date)
+
+        manifest = ExportManifest(self.path).load()
+
+        self.assertEqual(export_date, manifest.last_export_date)
+
+    def test_delete(self):
+        """
+        A deleted manifest starts a new export.
+        """
+        manifest = ExportManifest(self.path)
+        self.add_certificate(manifest, "uuid1")
+        manifest.finish(datetime(2022, 10, 1, tzinfo=UTC))
+
+        manifest.delete()
+        manifest.delete()
+
+        self.assertFalse(os.path.exists(self.path))
+        manifest = ExportManifest(self.path).load()
+        self.assertEqual({}, manifest.entries)
+        self.assertIsNone(manifest.last_export_date)
+
+
+class GetSinceDateTest(TestCase):
+    """
+    Test the date since when the certificates are exported.
+    """
+
+    def test_export_all(self):
+        """
+        All the certificates are exported without the since parameter.
+        """
+        self.assertIsNone(get_since_date(None, ExportManifest("unused")))
+
+    def test_since_last_export(self):
+        """
+        The last export date of the manifest is used, or all the certificates are exported if there
+        wasn't a successful export.
+        """
+        manifest = ExportManifest("unused")
+        self.assertIsNone(get_since_date(SINCE_LAST_EXPORT, manifest))
+
+        manifest.last_export_date = datetime(2022, 10, 1, tzinfo=UTC)
+        self.assertEqual(manifest.last_export_date, get_since_date(SINCE_LAST_EXPORT, manifest))
+
+    def test_since_date(self):
+        """
+        A date without a timezone is in UTC.
+        """
+        self.assertEqual(
+            datetime(2022, 9, 1, tzinfo=UTC), get_since_date("2022-09-01T00:00:00", ExportManifest("unused"))
+        )
+        self.assertEqual(
+            datetime(2022, 9, 1, 1, tzinfo=UTC),
+            get_since_date("2022-09-01T02:00:00+01:00", ExportManifest("unused")),
+        )
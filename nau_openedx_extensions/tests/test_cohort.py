@@ -0,0 +1,45 @@
+"""
+Tests for the cached cohort names.
+"""
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from edx_django_utils.cache import RequestCache
+
+from nau_openedx_extensions.edxapp_wrapper.cohort import get_cohort_name
+
+
+@patch("nau_openedx_extensions.edxapp_wrapper.cohort.get_backend_function")
+class CohortNameTest(TestCase):
+    """
+    Test the cohort name of a user that is cached for a short time.
+    """
+
+    def setUp(self):
+        cache.clear()
+        RequestCache.clear_all_namespaces()
+
+    def test_cohort_name_is_cached(self, get_backend_function_mock):
+        """
+        The cohort is only read once.
+        """
+        backend_get_cohort_name = Mock(return_value="SomeGroup")
+        get_backend_function_mock.return_value = backend_get_cohort_name
+
+        get_cohort_name(10, "course-v1:Demo+DemoX+Demo_Course")
+
+        self.assertEqual("SomeGroup", get_cohort_name(10, "course-v1:Demo+DemoX+Demo_Course"))
+        backend_get_cohort_name.assert_called_once_with(10, "course-v1:Demo+DemoX+Demo_Course")
+
+    def test_without_cohort_is_cached(self, get_backend_function_mock):
+        """
+        A user without a cohort is also cached.
+        """
+        backend_get_cohort_name = Mock(return_value=None)
+        get_backend_function_mock.return_value = backend_get_cohort_name
+
+        get_cohort_name(10, "course-v1:Demo+DemoX+Demo_Course")
+
+        self.assertIsNone(get_cohort_name(10, "course-v1:Demo+DemoX+Demo_Course"))
+        backend_get_cohort_name.assert_called_once_with(10, "course-v1:Demo+DemoX+Demo_Course")
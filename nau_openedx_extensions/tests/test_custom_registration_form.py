@@ -0,0 +1,98 @@
+"""
+Tests for the NAU extended data of the users.
+"""
+from unittest.mock import Mock, patch
+
+from django.db import models
+from django.test import TestCase
+from edx_django_utils.cache import RequestCache
+
+from nau_openedx_extensions.custom_registration_form.models import NauUserExtendedModel
+
+
+class NauUserExtendedModelRequestCacheTest(TestCase):
+    """
+    Test the NAU extended data of the users cached during the request.
+    """
+
+    def setUp(self):
+        RequestCache.clear_all_namespaces()
+        self.addCleanup(RequestCache.clear_all_namespaces)
+
+    @patch.object(NauUserExtendedModel, "objects")
+    def test_get_for_user_is_cached(self, objects_mock):
+        """
+        The extended data of a user is only read once, even if the user doesn't have it.
+        """
+        extended_data = NauUserExtendedModel(user_id=10, nif="123456789")
+        objects_mock.filter.return_value.first.side_effect = [extended_data, None]
+        user, other_user = Mock(id=10), Mock(id=11)
+
+        self.assertIs(extended_data, NauUserExtendedModel.get_for_user(user))
+        self.assertIs(extended_data, NauUserExtendedModel.get_for_user(user))
+        self.assertIsNone(NauUserExtendedModel.get_for_user(other_user))
+        self.assertIsNone(NauUserExtendedModel.get_for_user(other_user))
+
+        self.assertEqual(2, objects_mock.filter.call_count)
+        objects_mock.filter.assert_any_call(user=user)
+        objects_mock.filter.assert_any_call(user=other_user)
+
+    @patch.object(NauUserExtendedModel, "objects")
+    def test_anonymous_user(self, objects_mock):
+        """
+        An anonymous user doesn't have extended data.
+        """
+        self.assertIsNone(NauUserExtendedModel.get_for_user(Mock(id=None)))
+        objects_mock.filter.assert_not_called()
+
+    @patch.object(NauUserExtendedModel, "objects")
+    @patch.object(models.Model, "save")
+    def test_save_updates_the_cache(self, save_mock, objects_mock):
+        """
+        The saved instance is returned by the next reads of the request.
+        """
+        objects_mock.filter.return_value.first.return_value = None
+        user = Mock(id=10)
+        self.assertIsNone(NauUserExtendedModel.get_for_user(user))
+
+        extended_data = NauUserExtendedModel(user_id=10, nif="123456789")
+        extended_data.save()
+
+        save_mock.assert_called_once_with()
+        self.assertIs(extended_data, NauUserExtendedModel.get_for_user(user))
+        objects_mock.filter.assert_called_once_with(user=user)
+
+    @patch.object(NauUserExtendedModel, "objects")
+    @patch.object(models.Model, "save", side_effect=ValueError("Invalid"))
+    def test_failed_save_doesnt_update_the_cache(self, save_mock, objects_mock):  # pylint: disable=unused-argument
+        """
+        A failed save removes the instance from the cache, because it may have been changed, so
+        the next read gets the saved data.
+        """
+        saved_data = NauUserExtendedModel(user_id=10, nif="123456789")
+        reread_data = NauUserExtendedModel(user_id=10, nif="123456789")
+        objects_mock.filter.return_value.first.side_effect = [saved_data, reread_data]
+        user = Mock(id=10)
+
+        extended_data = NauUserExtendedModel.get_for_user(user)
+        extended_data.nif = "987654321"
+        with self.assertRaises(ValueError):
+            extended_data.save()
+
+        self.assertIs(reread_data, NauUserExtendedModel.get_for_user(user))
+        self.assertEqual("123456789", NauUserExtendedModel.get_for_user(user).nif)
+
+    @patch.object(NauUserExtendedModel, "objects")
+    @patch.object(models.Model, "delete", return_value=(1, {}))
+    def test_delete_removes_from_the_cache(self, delete_mock, objects_mock):  # pylint: disable=unused-argument
+        """
+        A deleted instance isn't returned by the next reads of the request.
+        """
+        extended_data = NauUserExtendedModel(user_id=10)
+        objects_mock.filter.return_value.first.side_effect = [extended_data, None]
+        user = Mock(id=10)
+        NauUserExtendedModel.get_for_user(user)
+
+        self.assertEqual((1, {}), extended_data.delete())
+
+        self.assertIsNone(NauUserExtendedModel.get_for_user(user))
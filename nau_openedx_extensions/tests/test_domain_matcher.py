@@ -0,0 +1,46 @@
+"""
+Tests for the email domain matcher of the enrollment domain filter.
+"""
+from django.test import TestCase
+
+from nau_openedx_extensions.filters.domain_matcher import DomainMatcher
+
+
+class DomainMatcherTest(TestCase):
+    """
+    Test the DomainMatcher compiled from a list of allowed domains.
+    """
+
+    def test_domain_and_sub_domains_are_allowed(self):
+        """
+        A domain allows itself and its sub-domains, but not similar domains.
+        """
+        matcher = DomainMatcher(["Example.com"])
+
+        self.assertTrue(matcher.is_email_allowed("user@example.com"))
+        self.assertTrue(matcher.is_email_allowed("user@a.b.EXAMPLE.com"))
+        self.assertFalse(matcher.is_email_allowed("user@xample.com"))
+        self.assertFalse(matcher.is_email_allowed("user@eexample.com"))
+        self.assertFalse(matcher.is_email_allowed("user@example.com.pt"))
+
+    def test_wildcard_only_allows_sub_domains(self):
+        """
+        A `*.` domain only allows its sub-domains.
+        """
+        matcher = DomainMatcher(["*.example.com"])
+
+        self.assertFalse(matcher.is_email_allowed("user@example.com"))
+        self.assertTrue(matcher.is_email_allowed("user@students.example.com"))
+
+    def test_exclusions(self):
+        """
+        An excluded domain wins over a less specific allowed domain.
+        """
+        matcher = DomainMatcher(["example.com", "!alumni.example.com", "ok.alumni.example.com", "!*.other.pt"])
+
+        self.assertTrue(matcher.is_email_allowed("user@example.com"))
+        self.assertFalse(matcher.is_email_allowed("user@alumni.example.com"))
+        self.assertFalse(matcher.is_email_allowed("user@old.alumni.example.com"))
+        self.assertTrue(matcher.is_email_allowed("user@ok.alumni.example.com"))
+        self.assertFalse(matcher.is_email_allowed("user@a.other.pt"))
+        self.assertFalse(matcher.is_email_allowed("user@other.pt"))
@@ -0,0 +1,66 @@
+"""
+Tests for the cached course grade summary.
+"""
+from unittest.mock import MagicMock, Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from nau_openedx_extensions import signals  # pylint: disable=unused-import
+from nau_openedx_extensions.edxapp_wrapper.grades import (
+    CourseGradeSummary,
+    get_course_grade_changed_signal,
+    get_course_grade_summary,
+)
+
+
+@patch("nau_openedx_extensions.edxapp_wrapper.grades.get_course_grades")
+class CourseGradeSummaryTest(TestCase):
+    """
+    Test the course grade summary that is cached until the course grade changes.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = Mock(id=10)
+        self.course = MagicMock(id="course-v1:Demo+DemoX+Demo_Course", course_version="1")
+
+    def test_course_grade_summary_is_cached(self, get_course_grades_mock):
+        """
+        The course grade is only read once.
+        """
+        get_course_grades_mock.return_value = Mock(percent=0.5, letter_grade="Pass", passed=True)
+
+        get_course_grade_summary(self.user, self.course)
+        summary = get_course_grade_summary(self.user, self.course)
+
+        self.assertEqual(CourseGradeSummary(0.5, "Pass", True), summary)
+        get_course_grades_mock.assert_called_once_with(self.user, self.course)
+
+    def test_course_grade_changed(self, get_course_grades_mock):
+        """
+        The course grade is read again after it changes.
+        """
+        get_course_grades_mock.return_value = Mock(percent=0.5, letter_grade="Pass", passed=True)
+        get_course_grade_summary(self.user, self.course)
+        get_course_grades_mock.return_value = Mock(percent=0.4, letter_grade=None, passed=False)
+
+        get_course_grade_changed_signal().send(
+            sender=None, user=self.user, course_grade=None, course_key=self.course.id, deadline=None
+        )
+        summary = get_course_grade_summary(self.user, self.course)
+
+        self.assertEqual(CourseGradeSummary(0.4, None, False), summary)
+        self.assertEqual(2, get_course_grades_mock.call_count)
+
+    def test_course_published(self, get_course_grades_mock):
+        """
+        The course grade is read again after the course is published.
+        """
+        get_course_grades_mock.return_value = Mock(percent=0.5, letter_grade="Pass", passed=True)
+        get_course_grade_summary(self.user, self.course)
+
+        self.course.course_version = "2"
+        get_course_grade_summary(self.user, self.course)
+
+        self.assertEqual(2, get_course_grades_mock.call_count)
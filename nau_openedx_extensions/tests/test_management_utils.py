@@ -0,0 +1,75 @@
+"""
+Tests for the helpers shared by the management commands.
+"""
+from unittest import TestCase
+
+from nau_openedx_extensions.management.utils import run_for_courses
+
+
+class ExportCommand:
+    """
+    Command that exports the number of characters of the course id, and fails for the broken
+    courses.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def log_msg(self, msg):
+        self.messages.append(msg)
+
+    def export_course(self, course_id, options):
+        if "Broken" in course_id:
+            raise ValueError(f"Can't export {course_id}")
+        return len(course_id) * options["multiplier"]
+
+
+class RunForCoursesTest(TestCase):
+    """
+    Test the export of multiple courses.
+    """
+
+    course_ids = ["course-v1:NAU+A+1", "course-v1:NAU+Broken+1", "course-v1:NAU+BB+1"]
+
+    def assert_results(self, results):
+        """
+        Check the result of each course and the error of the broken one.
+        """
+        self.assertEqual(set(self.course_ids), set(results))
+        self.assertEqual(34, results["course-v1:NAU+A+1"])
+        self.assertEqual(36, results["course-v1:NAU+BB+1"])
+        self.assertIsInstance(results["course-v1:NAU+Broken+1"], ValueError)
+        self.assertEqual("Can't export course-v1:NAU+Broken+1", str(results["course-v1:NAU+Broken+1"]))
+
+    def test_single_worker(self):
+        """
+        The courses are exported one after the other and the error of a course doesn't stop the
+        export of the next ones.
+        """
+        command = ExportCommand()
+
+        results = run_for_courses(command, self.course_ids, {"multiplier": 2})
+
+        self.assert_results(results)
+        self.assertEqual(
+            [
+                "Finished course course-v1:NAU+A+1 (1/3)",
+                "Finished course course-v1:NAU+Broken+1 (2/3)",
+                "Finished course course-v1:NAU+BB+1 (3/3)",
+            ],
+            command.messages,
+        )
+
+    def test_multiple_workers(self):
+        """
+        The courses are exported on the worker processes, that don't receive the output streams,
+        and the errors are collected.
+        """
+        command = ExportCommand()
+
+        results = run_for_courses(
+            command, self.course_ids, {"multiplier": 2, "stdout": object(), "stderr": object()}, workers=2
+        )
+
+        self.assert_results(results)
+        self.assertEqual(3, len(command.messages))
@@ -0,0 +1,104 @@
+"""
+Tests for the HTTP backend of the message gateway, using a local stub gateway server.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+
+from django.test import TestCase, override_settings
+
+from nau_openedx_extensions.message_gateway.backends import get_backend
+from nau_openedx_extensions.message_gateway.backends.http import Backend
+
+
+class StubGatewayHandler(BaseHTTPRequestHandler):
+    """
+    Stub of the message gateway batch submit endpoint, that answers with the queued responses.
+    """
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """
+        Record the request and answer with the next queued response.
+        """
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append((dict(self.headers), json.loads(body)))
+        status, headers = self.server.responses.pop(0) if self.server.responses else (200, {})
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class HttpBackendTest(TestCase):
+    """
+    Test the HTTP message gateway backend.
+    """
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubGatewayHandler)
+        self.server.requests = []
+        self.server.responses = []
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True).start()
+        self.url = "http://127.0.0.1:{}/messages/batch".format(self.server.server_port)
+        self.message = Mock(id=1, course_id="course-v1:Demo+DemoX+Demo_Course", message="Hello")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_send_message_in_batches(self):
+        """
+        The recipients are posted in batches, with the token and an idempotency key.
+        """
+        backend = Backend(self.url, token="secret", batch_size=2, concurrency=2)
+        recipients = [{"pk": pk, "email": "user{}@example.com".format(pk)} for pk in range(1, 6)]
+
+        backend.send_message(self.message, recipients)
+
+        self.assertEqual(3, len(self.server.requests))
+        idempotency_keys = sorted(headers["Idempotency-Key"] for headers, _ in self.server.requests)
+        self.assertEqual(["1:1:2", "1:3:4", "1:5:5"], idempotency_keys)
+        for headers, body in self.server.requests:
+            self.assertEqual("Bearer secret", headers["Authorization"])
+            self.assertEqual("Hello", body["message"])
+            self.assertEqual("course-v1:Demo+DemoX+Demo_Course", body["course_id"])
+        sent_recipients = sorted(
+            recipient["pk"] for _, body in self.server.requests for recipient in body["recipients"]
+        )
+        self.assertEqual([1, 2, 3, 4, 5], sent_recipients)
+
+    def test_rate_limited_request_is_retried(self):
+        """
+        A rate limited request is retried after the Retry-After.
+        """
+        self.server.responses = [(429, {"Retry-After": "0"}), (200, {})]
+        backend = Backend(self.url, batch_size=10, concurrency=1, backoff_factor=0)
+
+        backend.send_message(self.message, [{"pk": 1, "email": "user1@example.com"}])
+
+        self.assertEqual(2, len(self.server.requests))
+
+    def test_error_raised_after_retries(self):
+        """
+        An error is raised when the gateway keeps failing, so the batch is marked as failed.
+        """
+        self.server.responses = [(503, {})] * 3
+        backend = Backend(self.url, batch_size=10, concurrency=1, retries=2, backoff_factor=0)
+
+        with self.assertRaises(Exception):
+            backend.send_message(self.message, [{"pk": 1, "email": "user1@example.com"}])
+        self.assertEqual(3, len(self.server.requests))
+
+    def test_backend_created_once_per_process(self):
+        """
+        The configured backend is reused, so its connection pool is shared.
+        """
+        with override_settings(NAU_MESSAGE_GATEWAY_BACKEND="http", NAU_MESSAGE_GATEWAY_HTTP={"URL": self.url}):
+            backend = get_backend()
+            self.assertIsInstance(backend, Backend)
+            self.assertIs(backend, get_backend())
@@ -0,0 +1,170 @@
+"""
+Tests for the send state of the course messages.
+"""
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+from django.db.models import F
+from django.test import TestCase
+from pytz import UTC
+
+from nau_openedx_extensions.message_gateway.models import NauCourseMessageBatch, NauCourseMessageProgress
+
+
+class NauCourseMessageBatchTest(TestCase):
+    """
+    Test the batches of recipients of a course message.
+    """
+
+    @patch.object(NauCourseMessageBatch, "objects")
+    def test_get_or_create_for_recipients(self, objects_mock):
+        """
+        The batch is identified by its message and its first and last recipient, and a new batch
+        is queued with the ids of its recipients.
+        """
+        message = Mock(id=7)
+        batch = NauCourseMessageBatch(id=1)
+        objects_mock.get_or_create.return_value = (batch, True)
+
+        self.assertIs(batch, NauCourseMessageBatch.get_or_create_for_recipients(message, [3, 5, 8]))
+
+        objects_mock.get_or_create.assert_called_once_with(
+            idempotency_key="7:3:8",
+            defaults={
+                "message": message,
+                "first_recipient_id": 3,
+                "last_recipient_id": 8,
+                "recipients_count": 3,
+                "recipient_ids": "3,5,8",
+            },
+        )
+
+    @patch.object(NauCourseMessageBatch, "objects")
+    def test_get_existing_batch(self, objects_mock):
+        """
+        Submitting the same recipients again gets the existing batch, with its send state.
+        """
+        sent_batch = NauCourseMessageBatch(id=1, status=NauCourseMessageBatch.SENT)
+        objects_mock.get_or_create.return_value = (sent_batch, False)
+
+        batch = NauCourseMessageBatch.get_or_create_for_recipients(Mock(id=7), [3, 5, 8])
+
+        self.assertEqual(NauCourseMessageBatch.SENT, batch.status)
+        self.assertEqual("7:3:8", objects_mock.get_or_create.call_args[1]["idempotency_key"])
+
+    def test_get_recipient_ids(self):
+        """
+        The recipient ids are read back in the order they were stored.
+        """
+        self.assertEqual([3, 5, 8], NauCourseMessageBatch(recipient_ids="3,5,8").get_recipient_ids())
+        self.assertEqual([42], NauCourseMessageBatch(recipient_ids="42").get_recipient_ids())
+        self.assertEqual([], NauCourseMessageBatch(recipient_ids="").get_recipient_ids())
+
+
+@patch.object(NauCourseMessageProgress, "objects")
+class NauCourseMessageProgressTest(TestCase):
+    """
+    Test the send progress of a course message.
+    """
+
+    def test_add_recipients(self, objects_mock):
+        """
+        The queued recipients are added with an atomic update, and the send finishes when the last
+        recipients are queued after all the others were sent.
+        """
+        NauCourseMessageProgress.add_recipients(5, 20, dispatch_finished=True)
+
+        objects_mock.filter.assert_any_call(message_id=5)
+        update_kwargs = objects_mock.filter.return_value.update.call_args_list[0][1]
+        self.assertEqual(F("recipients_total") + 20, update_kwargs["recipients_total"])
+        self.assertTrue(update_kwargs["dispatch_finished"])
+        self.assert_mark_finished(objects_mock)
+
+    def test_add_results(self, objects_mock):
+        """
+        The sent and failed recipients are added with an atomic update.
+        """
+        NauCourseMessageProgress.add_results(5, sent=10, failed=-10)
+
+        update_kwargs = objects_mock.filter.return_value.update.call_args_list[0][1]
+        self.assertEqual(F("recipients_sent") + 10, update_kwargs["recipients_sent"])
+        self.assertEqual(F("recipients_failed") + -10, update_kwargs["recipients_failed"])
+        self.assert_mark_finished(objects_mock)
+
+    def test_fail(self, objects_mock):
+        """
+        A failed dispatch records the error and finishes the send when the queued recipients are
+        sent.
+        """
+        NauCourseMessageProgress.fail(5, ValueError("Bulk Course Email Task: Empty recipient set"))
+
+        update_kwargs = objects_mock.filter.return_value.update.call_args_list[0][1]
+        self.assertTrue(update_kwargs["dispatch_finished"])
+        self.assertEqual("Bulk Course Email Task: Empty recipient set", update_kwargs["error"])
+        self.assert_mark_finished(objects_mock)
+
+    def test_reset_after_fail(self, objects_mock):
+        """
+        A submit resumed after a failed dispatch clears the end and the error of the failed one, so
+        the send is reported as running again.
+        """
+        NauCourseMessageProgress.fail(5, ValueError("Broker error"))
+
+        NauCourseMessageProgress.reset(5, total=12, sent=4, failed=2)
+
+        objects_mock.filter.assert_called_with(message_id=5)
+        update_kwargs = objects_mock.filter.return_value.update.call_args[1]
+        self.assertEqual(12, update_kwargs["recipients_total"])
+        self.assertEqual(4, update_kwargs["recipients_sent"])
+        self.assertEqual(2, update_kwargs["recipients_failed"])
+        self.assertFalse(update_kwargs["dispatch_finished"])
+        self.assertIsNone(update_kwargs["finished"])
+        self.assertIsNone(update_kwargs["error"])
+
+    def assert_mark_finished(self, objects_mock):
+        """
+        The send is only marked as finished when all the recipients were queued and sent or failed.
+        """
+        filter_kwargs = objects_mock.filter.call_args_list[-1][1]
+        self.assertEqual(
+            {
+                "message_id": 5,
+                "dispatch_finished": True,
+                "finished__isnull": True,
+                "recipients_total__lte": F("recipients_sent") + F("recipients_failed"),
+            },
+            filter_kwargs,
+        )
+        self.assertEqual(["finished"], list(objects_mock.filter.return_value.update.call_args_list[-1][1]))
+
+    def test_to_dict(self, objects_mock):  # pylint: disable=unused-argument
+        """
+        The progress has the send rate and, once all the recipients are queued, the time left.
+        """
+        started = datetime(2022, 10, 1, 12, 0, tzinfo=UTC)
+        progress = NauCourseMessageProgress(
+            message_id=5,
+            recipients_total=100,
+            recipients_sent=40,
+            recipients_failed=10,
+            dispatch_finished=True,
+            started=started,
+            modified=started + timedelta(seconds=20),
+        )
+
+        with patch("nau_openedx_extensions.message_gateway.models.timezone.now") as now_mock:
+            now_mock.return_value = started + timedelta(seconds=20)
+            progress_dict = progress.to_dict()
+
+        self.assertEqual(50, progress_dict["recipients_pending"])
+        self.assertEqual(2.0, progress_dict["messages_per_second"])
+        self.assertEqual(25, progress_dict["estimated_seconds_left"])
+        self.assertIsNone(progress_dict["finished"])
+        self.assertIsNone(progress_dict["error"])
+        self.assertEqual("2022-10-01T12:00:20+00:00", progress_dict["modified"])
+
+    def test_messages_per_second_not_started(self, objects_mock):  # pylint: disable=unused-argument
+        """
+        A message that didn't start yet doesn't have a send rate.
+        """
+        self.assertEqual(0.0, NauCourseMessageProgress(message_id=5).get_messages_per_second())
@@ -0,0 +1,82 @@
+"""
+Tests for the recipients resolution of the course messages.
+"""
+from django.test import TestCase
+
+from nau_openedx_extensions.message_gateway.recipients import (
+    iterate_recipient_id_batches,
+    iterate_recipient_ids,
+    iterate_user_ids,
+)
+
+
+class FakeUsersQuerySet:
+    """
+    Minimal queryset of user ids that records the queries that were made.
+    """
+
+    def __init__(self, user_ids, queries=None):
+        self.user_ids = sorted(user_ids)
+        self.queries = queries if queries is not None else []
+
+    def order_by(self, *fields):  # pylint: disable=unused-argument
+        return self
+
+    def filter(self, pk__gt):
+        return FakeUsersQuerySet([user_id for user_id in self.user_ids if user_id > pk__gt], self.queries)
+
+    def values_list(self, *fields, **kwargs):  # pylint: disable=unused-argument
+        return self
+
+    def __getitem__(self, item):
+        self.queries.append(item)
+        return self.user_ids[item]
+
+
+class RecipientsTest(TestCase):
+    """
+    Test the recipients resolution from the users of the course message targets.
+    """
+
+    def test_iterate_user_ids_with_keyset_pagination(self):
+        """
+        The user ids are read in chunks.
+        """
+        users = FakeUsersQuerySet(range(1, 8))
+
+        self.assertEqual(list(range(1, 8)), list(iterate_user_ids(users, chunk_size=3)))
+        self.assertEqual(3, len(users.queries))
+
+    def test_iterate_recipient_ids_without_duplicates(self):
+        """
+        The users of all the targets are merged ordered by id and without duplicates.
+        """
+        users_querysets = [
+            FakeUsersQuerySet([1, 3, 5, 7]),
+            FakeUsersQuerySet([2, 3, 4, 7, 9]),
+            FakeUsersQuerySet([]),
+        ]
+
+        self.assertEqual([1, 2, 3, 4, 5, 7, 9], list(iterate_recipient_ids(users_querysets, chunk_size=2)))
+
+    def test_iterate_recipient_id_batches(self):
+        """
+        The recipient ids are split in batches.
+        """
+        users_querysets = [FakeUsersQuerySet([1, 2, 3]), FakeUsersQuerySet([3, 4, 5])]
+
+        self.assertEqual(
+            [[1, 2], [3, 4], [5]],
+            list(iterate_recipient_id_batches(users_querysets, batch_size=2, chunk_size=2)),
+        )
+
+    def test_iterate_recipient_id_batches_after_id(self):
+        """
+        The recipient ids continue after the given id.
+        """
+        users_querysets = [FakeUsersQuerySet([1, 2, 3]), FakeUsersQuerySet([3, 4, 5])]
+
+        self.assertEqual(
+            [[4, 5]],
+            list(iterate_recipient_id_batches(users_querysets, batch_size=2, chunk_size=2, after_id=3)),
+        )
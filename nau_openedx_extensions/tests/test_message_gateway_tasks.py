@@ -0,0 +1,267 @@
+"""
+Tests for the tasks that send the course messages.
+"""
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from opaque_keys.edx.keys import CourseKey
+
+from nau_openedx_extensions.message_gateway import tasks
+from nau_openedx_extensions.message_gateway.models import NauCourseMessageBatch, NauCourseMessageProgress
+
+
+def make_batch(batch_id, status, recipient_ids, modified=None):
+    """
+    A batch of the message 1 with the recipient ids.
+    """
+    return NauCourseMessageBatch(
+        id=batch_id,
+        message_id=1,
+        idempotency_key="1:{}:{}".format(recipient_ids[0], recipient_ids[-1]),
+        first_recipient_id=recipient_ids[0],
+        last_recipient_id=recipient_ids[-1],
+        recipients_count=len(recipient_ids),
+        recipient_ids=",".join(str(recipient_id) for recipient_id in recipient_ids),
+        status=status,
+        modified=modified or timezone.now(),
+    )
+
+
+@patch.object(NauCourseMessageProgress, "reset")
+@patch.object(tasks.submit_course_message, "delay")
+class ResumeCourseMessageBatchesTest(TestCase):
+    """
+    Test the resume of the batches of a previous submit of a message.
+    """
+
+    def test_only_failed_and_stale_batches_are_queued_again(self, delay_mock, reset_mock):
+        """
+        The failed and the stale batches are queued again, the sent ones and the ones that may
+        still be on the broker aren't, and the submit continues after the last batch.
+        """
+        long_ago = timezone.now() - timedelta(days=1)
+        batches = [
+            make_batch(1, NauCourseMessageBatch.SENT, [1, 2]),
+            make_batch(2, NauCourseMessageBatch.FAILED, [3, 4]),
+            make_batch(3, NauCourseMessageBatch.QUEUED, [5, 6]),
+            make_batch(4, NauCourseMessageBatch.SENDING, [7]),
+            make_batch(5, NauCourseMessageBatch.QUEUED, [8, 9], modified=long_ago),
+            make_batch(6, NauCourseMessageBatch.SENDING, [10], modified=long_ago),
+            make_batch(7, NauCourseMessageBatch.SENT, [11, 12], modified=long_ago),
+        ]
+        message = Mock(id=1)
+        message.batches.order_by.return_value = batches
+
+        self.assertEqual(12, tasks.resume_course_message_batches(message))
+
+        self.assertEqual([2, 5, 6], [call_args[0][1] for call_args in delay_mock.call_args_list])
+        reset_mock.assert_called_once_with(1, total=12, sent=4, failed=2)
+
+    def test_without_batches(self, delay_mock, reset_mock):
+        """
+        A message without batches starts from the first recipient.
+        """
+        message = Mock(id=1)
+        message.batches.order_by.return_value = []
+
+        self.assertIsNone(tasks.resume_course_message_batches(message))
+
+        delay_mock.assert_not_called()
+        reset_mock.assert_called_once_with(1, total=0, sent=0, failed=0)
+
+
+@override_settings(NAU_MESSAGE_GATEWAY_BACKEND="log_file", NAU_COURSE_MESSAGE_DISPATCH_BATCHES=2)
+class SubmitBulkCourseMessageTest(TestCase):
+    """
+    Test the task that queues the batches of a course message.
+    """
+
+    course_id = "course-v1:Demo+DemoX+Demo_Course"
+
+    def setUp(self):
+        message = Mock(id=1, course_id=CourseKey.from_string(self.course_id))
+        message.targets.all.return_value = [Mock()]
+        message_objects = self.start_patch(patch.object(tasks.NauCourseMessage, "objects"))
+        message_objects.get.return_value = message
+        self.start_patch(patch.object(NauCourseMessageProgress, "start"))
+        self.add_recipients = self.start_patch(patch.object(NauCourseMessageProgress, "add_recipients"))
+        self.start_patch(patch.object(tasks, "resume_course_message_batches", Mock(return_value=None)))
+        self.get_batch_size = self.start_patch(patch.object(tasks, "get_batch_size", Mock(return_value=2)))
+        self.iterate_batches = self.start_patch(patch.object(tasks, "iterate_recipient_id_batches"))
+        self.iterate_batches.return_value = iter([[1, 2], [3, 4], [5, 6]])
+        self.take_send_tokens = self.start_patch(patch.object(tasks, "take_send_tokens", Mock(return_value=0)))
+        get_or_create = self.start_patch(patch.object(NauCourseMessageBatch, "get_or_create_for_recipients"))
+        get_or_create.side_effect = lambda message, recipient_ids: Mock(id=recipient_ids[0] * 10)
+        self.delay = self.start_patch(patch.object(tasks.submit_course_message, "delay"))
+        self.apply_async = self.start_patch(patch.object(tasks.submit_bulk_course_message, "apply_async"))
+
+    def start_patch(self, patcher):
+        """
+        Start the patcher until the end of the test.
+        """
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_batch_size(self):
+        """
+        The recipients are read in batches of the current batch size of the backend.
+        """
+        tasks.submit_bulk_course_message(1, self.course_id)
+
+        self.get_batch_size.assert_called_once_with("log_file")
+        self.assertEqual(2, self.iterate_batches.call_args[0][1])
+        self.assertEqual({"after_id": None}, self.iterate_batches.call_args[1])
+
+    def test_reschedule_after_the_dispatch_batches(self):
+        """
+        Each run only queues NAU_COURSE_MESSAGE_DISPATCH_BATCHES batches and then continues after
+        the last recipient it queued.
+        """
+        tasks.submit_bulk_course_message(1, self.course_id)
+
+        self.assertEqual([(1, 10), (1, 30)], [call_args[0] for call_args in self.delay.call_args_list])
+        self.add_recipients.assert_called_once_with(1, 4)
+        self.apply_async.assert_called_once_with(
+            (1, self.course_id), {"after_recipient_id": 4, "total_recipients": 4}, countdown=0
+        )
+
+    def test_wait_for_the_send_tokens(self):
+        """
+        When the send rate is exceeded the batch isn't queued and the submit continues after the
+        wait time.
+        """
+        self.take_send_tokens.side_effect = [0, 2.5]
+
+        tasks.submit_bulk_course_message(1, self.course_id)
+
+        self.delay.assert_called_once_with(1, 10)
+        self.take_send_tokens.assert_called_with("log_file", CourseKey.from_string(self.course_id), 2)
+        self.add_recipients.assert_called_once_with(1, 2)
+        self.apply_async.assert_called_once_with(
+            (1, self.course_id), {"after_recipient_id": 2, "total_recipients": 2}, countdown=2.5
+        )
+
+    def test_continue_after_the_last_queued_recipient(self):
+        """
+        A rescheduled run queues the remaining batches and finishes the dispatch.
+        """
+        self.iterate_batches.return_value = iter([[5, 6]])
+
+        tasks.submit_bulk_course_message(1, self.course_id, after_recipient_id=4, total_recipients=4)
+
+        self.assertEqual({"after_id": 4}, self.iterate_batches.call_args[1])
+        self.delay.assert_called_once_with(1, 50)
+        self.add_recipients.assert_called_once_with(1, 2, dispatch_finished=True)
+        self.apply_async.assert_not_called()
+
+    @patch.object(NauCourseMessageProgress, "fail")
+    def test_empty_recipient_set(self, fail_mock):
+        """
+        A message without recipients fails and its progress records the error.
+        """
+        self.iterate_batches.return_value = iter([])
+        tasks.NauCourseMessage.objects.get.return_value.batches.exists.return_value = False
+
+        with self.assertRaises(ValueError) as error:
+            tasks.submit_bulk_course_message(1, self.course_id)
+
+        self.add_recipients.assert_called_once_with(1, 0, dispatch_finished=True)
+        fail_mock.assert_called_once_with(1, error.exception)
+
+
+class SubmitCourseMessageTest(TestCase):
+    """
+    Test the task that sends a batch of a course message.
+    """
+
+    def setUp(self):
+        self.message_objects = self.start_patch(patch.object(tasks.NauCourseMessage, "objects"))
+        self.batch_objects = self.start_patch(patch.object(NauCourseMessageBatch, "objects"))
+        self.start_patch(patch.object(NauCourseMessageBatch, "save"))
+        self.backend = self.start_patch(patch.object(tasks, "get_backend")).return_value
+        self.get_recipients = self.start_patch(patch.object(tasks, "get_recipients"))
+        self.record_send_result = self.start_patch(patch.object(tasks, "record_send_result"))
+        self.add_results = self.start_patch(patch.object(NauCourseMessageProgress, "add_results"))
+
+    def start_patch(self, patcher):
+        """
+        Start the patcher until the end of the test.
+        """
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_send_claimed_batch(self):
+        """
+        A queued batch is claimed and sent to its recipients.
+        """
+        batch = make_batch(2, NauCourseMessageBatch.QUEUED, [3, 4])
+        self.batch_objects.get.return_value = batch
+        self.batch_objects.filter.return_value.update.return_value = 1
+
+        tasks.submit_course_message(1, 2)
+
+        self.batch_objects.filter.assert_called_once_with(id=2, status=NauCourseMessageBatch.QUEUED)
+        self.get_recipients.assert_called_once_with([3, 4])
+        self.backend.send_message.assert_called_once_with(
+            self.message_objects.get.return_value, self.get_recipients.return_value
+        )
+        self.assertEqual(NauCourseMessageBatch.SENT, batch.status)
+        self.add_results.assert_called_once_with(1, sent=2, failed=0)
+
+    @patch.object(tasks, "get_batch_size", Mock(return_value=40))
+    def test_batch_size_feedback(self):
+        """
+        The result of the send adapts the current batch size of the backend, not the size of the
+        batch, that may be a short one.
+        """
+        self.batch_objects.get.return_value = make_batch(2, NauCourseMessageBatch.QUEUED, [3, 4])
+        self.batch_objects.filter.return_value.update.return_value = 1
+
+        tasks.submit_course_message(1, 2)
+
+        self.assertEqual(("log_file", 40), self.record_send_result.call_args[0][:2])
+        self.assertFalse(self.record_send_result.call_args[1]["failed"])
+
+    def test_batch_claimed_by_other_task_isnt_sent(self):
+        """
+        A batch queued twice is only sent by the task that claims it.
+        """
+        self.batch_objects.get.return_value = make_batch(2, NauCourseMessageBatch.QUEUED, [3, 4])
+        self.batch_objects.filter.return_value.update.return_value = 0
+
+        tasks.submit_course_message(1, 2)
+
+        self.assertEqual(3, self.batch_objects.filter.call_count)
+        self.backend.send_message.assert_not_called()
+        self.add_results.assert_not_called()
+
+    def test_failed_batch_sent_on_retry(self):
+        """
+        A failed batch sent on a retry moves its recipients from the failed to the sent ones.
+        """
+        self.batch_objects.get.return_value = make_batch(2, NauCourseMessageBatch.FAILED, [3, 4])
+        # the claim of a queued batch fails and the claim of a failed one succeeds
+        self.batch_objects.filter.return_value.update.side_effect = [0, 1]
+
+        tasks.submit_course_message(1, 2)
+
+        self.batch_objects.filter.assert_called_with(id=2, status=NauCourseMessageBatch.FAILED)
+        self.add_results.assert_called_once_with(1, sent=2, failed=-2)
+
+    def test_failed_send(self):
+        """
+        A batch that can't be sent is marked as failed and its recipients are counted as failed.
+        """
+        batch = make_batch(2, NauCourseMessageBatch.QUEUED, [3, 4])
+        self.batch_objects.get.return_value = batch
+        self.batch_objects.filter.return_value.update.return_value = 1
+        self.backend.send_message.side_effect = ValueError("Gateway error")
+
+        with self.assertRaises(ValueError):
+            tasks.submit_course_message(1, 2)
+
+        self.assertEqual(NauCourseMessageBatch.FAILED, batch.status)
+        self.assertEqual("Gateway error", batch.last_error)
+        self.add_results.assert_called_once_with(1, failed=2)
@@ -0,0 +1,123 @@
+"""
+Tests for the throttling of the course messages delivery.
+"""
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from nau_openedx_extensions.message_gateway.throttling import (
+    TokenBucket,
+    get_batch_size,
+    record_send_result,
+    take_send_tokens,
+)
+
+
+class TokenBucketTest(TestCase):
+    """
+    Test the token bucket kept on the cache.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_starts_full(self):
+        """
+        A new bucket has all its capacity.
+        """
+        bucket = TokenBucket("test", rate=10, capacity=100)
+
+        self.assertEqual(0, bucket.wait_time(100, now=1000))
+
+    def test_take_and_refill(self):
+        """
+        The taken tokens are refilled at the bucket rate.
+        """
+        bucket = TokenBucket("test", rate=10, capacity=100)
+        bucket.take(100, now=1000)
+
+        self.assertEqual(5, bucket.wait_time(50, now=1000))
+        self.assertEqual(0, bucket.wait_time(50, now=1005))
+        self.assertEqual(0, bucket.wait_time(500, now=1010))
+
+
+@override_settings(
+    NAU_COURSE_MESSAGE_BACKEND_RATE_LIMIT=100,
+    NAU_COURSE_MESSAGE_COURSE_RATE_LIMIT=10,
+    NAU_COURSE_MESSAGE_RATE_LIMIT_BURST_SECONDS=5,
+)
+class TakeSendTokensTest(TestCase):
+    """
+    Test the backend and course send rates.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    @patch("nau_openedx_extensions.message_gateway.throttling.time.time", return_value=1000)
+    def test_course_rate(self, _):
+        """
+        The course has its own rate, and its tokens don't limit other courses.
+        """
+        self.assertEqual(0, take_send_tokens("http", "course-v1:a+b+c", 50))
+        self.assertEqual(5, take_send_tokens("http", "course-v1:a+b+c", 50))
+        self.assertEqual(0, take_send_tokens("http", "course-v1:d+e+f", 50))
+
+    @override_settings(NAU_COURSE_MESSAGE_BACKEND_RATE_LIMIT=20)
+    @patch("nau_openedx_extensions.message_gateway.throttling.time.time", return_value=1000)
+    def test_waiting_doesnt_take_tokens(self, _):
+        """
+        The backend rate limits all the courses, and when a bucket doesn't have the tokens
+        none of the buckets is used.
+        """
+        self.assertEqual(0, take_send_tokens("http", "course-v1:a+b+c", 50))
+        self.assertEqual(5, take_send_tokens("http", "course-v1:a+b+c", 50))
+        self.assertEqual(0, take_send_tokens("http", "course-v1:d+e+f", 50))
+        self.assertEqual(2.5, take_send_tokens("http", "course-v1:g+h+i", 50))
+        self.assertEqual(2.5, take_send_tokens("http", "course-v1:g+h+i", 50))
+
+    @override_settings(NAU_COURSE_MESSAGE_BACKEND_RATE_LIMIT=None, NAU_COURSE_MESSAGE_COURSE_RATE_LIMIT=None)
+    def test_without_rate_limits(self):
+        """
+        Without rates the messages are always sent.
+        """
+        for _ in range(10):
+            self.assertEqual(0, take_send_tokens("http", "course-v1:a+b+c", 1000))
+
+
+@override_settings(
+    NAU_COURSE_MESSAGE_BATCH_SIZE=50,
+    NAU_COURSE_MESSAGE_MIN_BATCH_SIZE=10,
+    NAU_COURSE_MESSAGE_MAX_BATCH_SIZE=60,
+    NAU_COURSE_MESSAGE_TARGET_LATENCY_SECONDS=5,
+)
+class AdaptiveBatchSizeTest(TestCase):
+    """
+    Test the batch size adapted to the backend latency and errors.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_initial_batch_size(self):
+        self.assertEqual(50, get_batch_size("http"))
+
+    def test_increase_when_fast(self):
+        """
+        The batch size grows up to the maximum while the backend is fast.
+        """
+        self.assertEqual(55, record_send_result("http", 50, 1, failed=False))
+        self.assertEqual(55, get_batch_size("http"))
+        self.assertEqual(60, record_send_result("http", 55, 1, failed=False))
+        self.assertEqual(60, record_send_result("http", 60, 1, failed=False))
+
+    def test_decrease_when_slow_or_failing(self):
+        """
+        The batch size shrinks down to the minimum when the backend is slow or fails.
+        """
+        self.assertEqual(37, record_send_result("http", 50, 10, failed=False))
+        self.assertEqual(18, record_send_result("http", 37, 1, failed=True))
+        self.assertEqual(10, record_send_result("http", 18, 1, failed=True))
+        self.assertEqual(10, get_batch_size("http"))
+        self.assertEqual(50, get_batch_size("log_file"))
@@ -0,0 +1,106 @@
+"""
+Tests for the APIs of the message gateway.
+"""
+import importlib
+import json
+import sys
+from datetime import datetime
+from types import ModuleType
+from unittest.mock import Mock, patch
+
+from django.http import Http404, JsonResponse
+from django.test import RequestFactory, TestCase, override_settings
+from pytz import UTC
+
+from nau_openedx_extensions.message_gateway.models import NauCourseMessageProgress
+
+
+def import_api():
+    """
+    Import the message gateway APIs, with the JsonResponse of Django as the one of the
+    edx-platform, that isn't installed on the tests.
+    """
+    json_request = ModuleType("common.djangoapps.util.json_request")
+    json_request.JsonResponse = JsonResponse
+    edx_modules = {
+        "common": ModuleType("common"),
+        "common.djangoapps": ModuleType("common.djangoapps"),
+        "common.djangoapps.util": ModuleType("common.djangoapps.util"),
+        "common.djangoapps.util.json_request": json_request,
+    }
+    with patch.dict(sys.modules, edx_modules):
+        return importlib.import_module("nau_openedx_extensions.message_gateway.views.api")
+
+
+message_progress = import_api().message_progress
+
+# the login redirect doesn't need the plugin urls, that import the edx-platform
+urlpatterns = []
+
+
+@override_settings(ROOT_URLCONF=__name__)
+@patch.object(NauCourseMessageProgress, "objects")
+class MessageProgressViewTest(TestCase):
+    """
+    Test the API that returns the send progress of a course message.
+    """
+
+    course_id = "course-v1:Demo+DemoX+Demo_Course"
+
+    def get(self, has_permission=True, method="get"):
+        """
+        Request the progress of the message 5 of the course.
+        """
+        request = getattr(RequestFactory(), method)("/progress")
+        request.user = Mock(has_perms=Mock(return_value=has_permission))
+        return message_progress(request, course_id=self.course_id, message_id="5")
+
+    def test_progress(self, objects_mock):
+        """
+        The progress of the message of the course is returned.
+        """
+        objects_mock.filter.return_value.first.return_value = NauCourseMessageProgress(
+            message_id=5,
+            recipients_total=10,
+            recipients_sent=10,
+            dispatch_finished=True,
+            started=datetime(2022, 10, 1, 12, 0, tzinfo=UTC),
+            finished=datetime(2022, 10, 1, 12, 0, 5, tzinfo=UTC),
+        )
+
+        response = self.get()
+
+        self.assertEqual(200, response.status_code)
+        progress = json.loads(response.content.decode("utf-8"))
+        self.assertEqual(10, progress["recipients_sent"])
+        self.assertEqual(2.0, progress["messages_per_second"])
+        self.assertEqual("2022-10-01T12:00:05+00:00", progress["finished"])
+        self.assertIn("no-cache", response["Cache-Control"])
+        filter_kwargs = objects_mock.filter.call_args[1]
+        self.assertEqual("5", filter_kwargs["message_id"])
+        self.assertEqual(self.course_id, str(filter_kwargs["message__course_id"]))
+
+    def test_message_of_other_course(self, objects_mock):
+        """
+        A message that doesn't exist on the course isn't found.
+        """
+        objects_mock.filter.return_value.first.return_value = None
+
+        with self.assertRaises(Http404):
+            self.get()
+
+    def test_without_permission(self, objects_mock):
+        """
+        The users without the send message permission can't read the progress.
+        """
+        response = self.get(has_permission=False)
+
+        self.assertEqual(302, response.status_code)
+        objects_mock.filter.assert_not_called()
+
+    def test_only_get(self, objects_mock):
+        """
+        The progress is only read with GET requests.
+        """
+        self.assertEqual(405, self.get(method="post").status_code)
+        objects_mock.filter.assert_not_called()
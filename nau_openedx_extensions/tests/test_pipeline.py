@@ -4,12 +4,20 @@ Tests for the pipeline module used in nau_openex_extensions
 
 from unittest.mock import MagicMock, Mock, patch
 
+from django.core.cache import cache
 from django.test import TestCase
 from django.test.utils import override_settings
 from opaque_keys.edx.keys import CourseKey
 from openedx_filters.learning.filters import CourseEnrollmentStarted
 
-from nau_openedx_extensions.filters.pipeline import FilterEnrollmentByDomain
+from nau_openedx_extensions import signals  # pylint: disable=unused-import
+from nau_openedx_extensions.edxapp_wrapper.course_module import get_course_published_signal
+from nau_openedx_extensions.filters.pipeline import (
+    EMAIL_DOMAIN_NOT_ALLOWED,
+    INACTIVE_ACCOUNT,
+    FilterEnrollmentByDomain,
+    validate_enrollments_by_domain,
+)
 
 
 class FilterEnrollmentByDomainTest(TestCase):
@@ -17,9 +25,11 @@ class FilterEnrollmentByDomainTest(TestCase):
     Test the FilterEnrollmentByDomain that prevent enrollment if the email domain is not allowed.
     """
 
-    @patch('nau_openedx_extensions.filters.pipeline.fnmatch')
+    def setUp(self):
+        cache.clear()
+
     @patch('nau_openedx_extensions.filters.pipeline.get_other_course_settings')
-    def test_user_is_allowed_to_enroll_for_allowed_domain(self, get_other_course_settings_mock, fnmatch_mock):
+    def test_user_is_allowed_to_enroll_for_allowed_domain(self, get_other_course_settings_mock):
         """
         Test the filter when user has a domain that is allowed in the other course settings.
 
@@ -27,7 +37,6 @@ class FilterEnrollmentByDomainTest(TestCase):
         - The get other course settings is called once with the course key.
         - The other_course_settings.get is called once with value and {}
         - The other_course_settings.get calls get with filter_enrollment_by_domain_list and []
-        - The function fnmatch is called with a user_domain and a domain
         - The filter returns {} that means that the user is allowed to enroll.
         """
         course_key = CourseKey.from_string("course-v1:Demo+DemoX+Demo_Course")
@@ -39,26 +48,23 @@ class FilterEnrollmentByDomainTest(TestCase):
         get_other_course_settings_mock.return_value = other_course_settings
         other_course_settings_get = Mock()
         other_course_settings.get.return_value = other_course_settings_get
-        other_course_settings_get.get.return_value = allowed_domains_list
-        fnmatch_mock.return_value = True
+        other_course_settings_get.get.side_effect = {
+            "filter_enrollment_by_domain_list": allowed_domains_list}.get
 
         response = FilterEnrollmentByDomain.run_filter(self, user, course_key, mode)
 
         get_other_course_settings_mock.assert_called_once_with(course_key)
         other_course_settings.get.assert_called_once_with("value", {})
-        other_course_settings_get.get.assert_called_once_with("filter_enrollment_by_domain_list")
-        fnmatch_mock.assert_not_called()
+        other_course_settings_get.get.assert_any_call("filter_enrollment_by_domain_list")
         self.assertEqual(response, {})
 
-    @patch('nau_openedx_extensions.filters.pipeline.fnmatch')
     @patch('nau_openedx_extensions.filters.pipeline.get_other_course_settings')
     def test_user_is_allowed_to_enroll_for_allowed_domain_with_subdomain(
-            self, get_other_course_settings_mock, fnmatch_mock):
+            self, get_other_course_settings_mock):
         """
         Test the filter when user has a subdomain that is allowed in the other course settings.
 
         Expected result:
-        - The fnmatch is called with the all subdomain and a domain
         - The filter returns {} that means that the user is allowed to enroll.
         """
         course_key = CourseKey.from_string("course-v1:Demo+DemoX+Demo_Course")
@@ -69,21 +75,16 @@ class FilterEnrollmentByDomainTest(TestCase):
         get_other_course_settings_mock.return_value = {
             "value": {"filter_enrollment_by_domain_list": allowed_domains_list}}
         user = MagicMock(email="example@subdomain.example.com")
-        fnmatch_mock.return_value = True
-        user_domain = user.email.split("@")[1]
 
         response = FilterEnrollmentByDomain.run_filter(self, user, course_key, mode)
 
-        fnmatch_mock.assert_called_once_with(user_domain, f"*.{allowed_domains_list[0]}")
         self.assertEqual(response, {})
 
-    @patch('nau_openedx_extensions.filters.pipeline.fnmatch')
     @patch('nau_openedx_extensions.filters.pipeline.get_other_course_settings')
-    def test_user_is_allowed_to_enroll_for_no_other_course_setting(self, get_other_course_settings_mock, fnmatch_mock):
+    def test_user_is_allowed_to_enroll_for_no_other_course_setting(self, get_other_course_settings_mock):
         """Test the filter when the course dont have other course settings for filter_enrollment_by_domain_list.
 
         Expected result:
-        - The fnmatch not called
         - The filter returns {} that means that the user is allowed to enroll."""
         course_key = CourseKey.from_string("course-v1:Demo+DemoX+Demo_Course")
         user = MagicMock(email="example@example.com", is_active=True)
@@ -93,19 +94,16 @@ class FilterEnrollmentByDomainTest(TestCase):
 
         response = FilterEnrollmentByDomain.run_filter(self, user, course_key, mode)
 
-        fnmatch_mock.assert_not_called()
         self.assertEqual(response, {})
 
-    @patch('nau_openedx_extensions.filters.pipeline.fnmatch')
     @patch('nau_openedx_extensions.filters.pipeline.get_other_course_settings')
-    def test_user_is_not_allowed_to_enroll(self, get_other_course_settings_mock, fnmatch_mock):
+    def test_user_is_not_allowed_to_enroll(self, get_other_course_settings_mock):
         """
         Test the filter when exists the other course settings with filter_enrollment_by_domain_list,
         but the user is not allowed to enroll because the domain is not in the settings.
 
         Expected result:
         - PreventEnrollment exception has raised
-        - The fnmatch has been called once with the user domain and a domain
         """
         course_key = CourseKey.from_string("course-v1:Demo+DemoX+Demo_Course")
         user = MagicMock(email="example@example.com", is_active=True)
@@ -114,16 +112,12 @@ class FilterEnrollmentByDomainTest(TestCase):
         allowed_domains_list = ["test.com"]
         get_other_course_settings_mock.return_value = {
             "value": {"filter_enrollment_by_domain_list": allowed_domains_list}}
-        fnmatch_mock.return_value = False
-        user_domain = user.email.split("@")[1]
 
         with self.assertRaises(CourseEnrollmentStarted.PreventEnrollment):
             FilterEnrollmentByDomain.run_filter(self, user, course_key, mode)
-            fnmatch_mock.assert_called_once_with(user_domain, f"*.{allowed_domains_list[0]}")
 
-    @patch('nau_openedx_extensions.filters.pipeline.fnmatch')
     @patch('nau_openedx_extensions.filters.pipeline.get_other_course_settings')
-    def test_user_is_not_allowed_to_enroll_similar_email(self, get_other_course_settings_mock, fnmatch_mock):
+    def test_user_is_not_allowed_to_enroll_similar_email(self, get_other_course_settings_mock):
         """
         Test the filter when exists the other course settings with filter_enrollment_by_domain_list,
         but the user is not allowed to enroll because the domain is not in the settings.
@@ -131,7 +125,6 @@ class FilterEnrollmentByDomainTest(TestCase):
 
         Expected result:
         - PreventEnrollment exception has raised
-        - The fnmatch has been called once with the user domain and a domain
         """
         course_key = CourseKey.from_string("course-v1:Demo+DemoX+Demo_Course")
         user = MagicMock(email="example@example.com", is_active=True)
@@ -140,12 +133,9 @@ class FilterEnrollmentByDomainTest(TestCase):
         allowed_domains_list = ["xample.com", "eexample.com"]
         get_other_course_settings_mock.return_value = {
             "value": {"filter_enrollment_by_domain_list": allowed_domains_list}}
-        fnmatch_mock.return_value = False
-        user_domain = user.email.split("@")[1]
 
         with self.assertRaises(CourseEnrollmentStarted.PreventEnrollment):
             FilterEnrollmentByDomain.run_filter(self, user, course_key, mode)
-            fnmatch_mock.assert_called_once_with(user_domain, f"*.{allowed_domains_list[0]}")
 
     @patch('nau_openedx_extensions.filters.pipeline.get_other_course_settings')
     @override_settings(PLATFORM_NAME='NAU')
@@ -172,10 +162,9 @@ class FilterEnrollmentByDomainTest(TestCase):
             "Check your example@example.com inbox for an account activation link from NAU."
         ))
 
-    @patch('nau_openedx_extensions.filters.pipeline.fnmatch')
     @patch('nau_openedx_extensions.filters.pipeline.get_other_course_settings')
     def test_require_user_to_activate_account_for_enrollment_course_no_config_user_active(
-            self, get_other_course_settings_mock, fnmatch_mock):
+            self, get_other_course_settings_mock):
         """
         Test the filter when the course hasn't a configuration in the other course settings
         and the user has an activated account.
@@ -187,12 +176,10 @@ class FilterEnrollmentByDomainTest(TestCase):
         get_other_course_settings_mock.return_value = {"value": {}}
         response = FilterEnrollmentByDomain.run_filter(self, user, course_key, mode)
         self.assertEqual(response, {})
-        fnmatch_mock.assert_not_called()
 
-    @patch('nau_openedx_extensions.filters.pipeline.fnmatch')
     @patch('nau_openedx_extensions.filters.pipeline.get_other_course_settings')
     def test_require_user_to_activate_account_for_enrollment_course_no_config_user_inactive(
-            self, get_other_course_settings_mock, fnmatch_mock):
+            self, get_other_course_settings_mock):
         """
         Test the filter when the course has a configuration in the other course settings
         and the user hasn't an activated account.
@@ -204,30 +191,47 @@ class FilterEnrollmentByDomainTest(TestCase):
         get_other_course_settings_mock.return_value = {"value": {}}
         response = FilterEnrollmentByDomain.run_filter(self, user, course_key, mode)
         self.assertEqual(response, {})
-        fnmatch_mock.assert_not_called()
 
-    @patch('nau_openedx_extensions.filters.pipeline.get_student_course_enrollment_allowed')
-    @patch('nau_openedx_extensions.filters.pipeline.fnmatch')
+    @patch('nau_openedx_extensions.filters.pipeline.get_course_enrollments_allowed')
     @patch('nau_openedx_extensions.filters.pipeline.get_other_course_settings')
     def test_user_email_not_in_allowed_domains_to_enroll_but_with_course_enrollment_allowed(
-            self, get_other_course_settings_mock, fnmatch_mock, get_student_course_enrollment_allowed_mock):
+            self, get_other_course_settings_mock, get_course_enrollments_allowed_mock):
         """
         Test the filter when the user email in not in the allowed domains for self enroll, but the
         user email have been manualy added as a course enrollment allowed.
         """
         course_key = CourseKey.from_string("course-v1:Demo+DemoX+Demo_Course")
-        user = MagicMock(email="example@example.com", is_active=True)
+        user = MagicMock(id=7, email="example@example.com", is_active=True)
         mode = "audit"
 
         allowed_domains_list = ["xample.com", "eexample.com"]
         get_other_course_settings_mock.return_value = {
             "value": {"filter_enrollment_by_domain_list": allowed_domains_list}}
-        get_student_course_enrollment_allowed_mock.return_value = object()
+        get_course_enrollments_allowed_mock.return_value = [("example@example.com", None)]
 
         FilterEnrollmentByDomain.run_filter(self, user, course_key, mode)
 
-        get_student_course_enrollment_allowed_mock.assert_called_once_with(user, course_key)
-        fnmatch_mock.assert_not_called()
+        get_course_enrollments_allowed_mock.assert_called_once_with(["example@example.com"], [7], course_key)
+
+    @patch('nau_openedx_extensions.filters.pipeline.get_course_enrollments_allowed')
+    @patch('nau_openedx_extensions.filters.pipeline.get_other_course_settings')
+    def test_user_with_course_enrollment_allowed_of_a_previous_email(
+            self, get_other_course_settings_mock, get_course_enrollments_allowed_mock):
+        """
+        Test the filter when the user changed the email after the course enrollment allowed was
+        linked to their account.
+        """
+        course_key = CourseKey.from_string("course-v1:Demo+DemoX+Demo_Course")
+        user = MagicMock(id=7, email="new@other.com", is_active=True)
+        mode = "audit"
+
+        get_other_course_settings_mock.return_value = {
+            "value": {"filter_enrollment_by_domain_list": ["example.com"]}}
+        get_course_enrollments_allowed_mock.return_value = [("old@other.com", 7)]
+
+        response = FilterEnrollmentByDomain.run_filter(self, user, course_key, mode)
+
+        self.assertEqual(response, {})
 
     @override_settings(PLATFORM_NAME='NAU')
     def test_inactive_user_with_email_not_in_allowed_domains(self):
@@ -246,3 +250,71 @@ class FilterEnrollmentByDomainTest(TestCase):
             "You need to activate your account before you can enroll in the course. "
             "Check your example@example.com inbox for an account activation link from NAU."
         ))
+
+    @patch('nau_openedx_extensions.filters.pipeline.get_other_course_settings')
+    def test_other_course_settings_cached_until_course_published(self, get_other_course_settings_mock):
+        """
+        Test that the other course settings are only read once until the course is published.
+        """
+        course_key = CourseKey.from_string("course-v1:Demo+DemoX+Demo_Course")
+        user = MagicMock(email="example@example.com", is_active=True)
+        mode = "audit"
+
+        get_other_course_settings_mock.return_value = {"value": {}}
+        FilterEnrollmentByDomain.run_filter(self, user, course_key, mode)
+        FilterEnrollmentByDomain.run_filter(self, user, course_key, mode)
+
+        get_other_course_settings_mock.assert_called_once_with(course_key)
+
+        get_other_course_settings_mock.return_value = {
+            "value": {"filter_enrollment_by_domain_list": ["test.com"]}}
+        get_course_published_signal().send(sender=None, course_key=course_key)
+
+        with self.assertRaises(CourseEnrollmentStarted.PreventEnrollment):
+            FilterEnrollmentByDomain.run_filter(self, user, course_key, mode)
+        self.assertEqual(2, get_other_course_settings_mock.call_count)
+
+
+class ValidateEnrollmentsByDomainTest(TestCase):
+    """
+    Test the bulk validation of the enrollments on a course with a domain filter.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    @patch('nau_openedx_extensions.filters.pipeline.get_course_enrollments_allowed')
+    @patch('nau_openedx_extensions.filters.pipeline.get_other_course_settings')
+    @override_settings(PLATFORM_NAME='NAU')
+    def test_validate_enrollments_by_domain(
+            self, get_other_course_settings_mock, get_course_enrollments_allowed_mock):
+        """
+        Test that the users and emails are validated with a single read of the settings and of
+        the course enrollment allowed.
+        """
+        course_key = CourseKey.from_string("course-v1:Demo+DemoX+Demo_Course")
+        get_other_course_settings_mock.return_value = {
+            "value": {"filter_enrollment_by_domain_list": ["example.com"]}}
+        get_course_enrollments_allowed_mock.return_value = [("allowed@test.com", None)]
+        users_or_emails = [
+            MagicMock(id=1, email="user@example.com", is_active=True),
+            MagicMock(id=2, email="inactive@example.com", is_active=False),
+            "Allowed@test.com",
+            "other@test.com",
+        ]
+
+        validations = validate_enrollments_by_domain(users_or_emails, course_key)
+
+        self.assertEqual(
+            [
+                ("user@example.com", True, None),
+                ("inactive@example.com", False, INACTIVE_ACCOUNT),
+                ("Allowed@test.com", True, None),
+                ("other@test.com", False, EMAIL_DOMAIN_NOT_ALLOWED),
+            ],
+            [(validation.email, validation.allowed, validation.reason) for validation in validations],
+        )
+        get_other_course_settings_mock.assert_called_once_with(course_key)
+        get_course_enrollments_allowed_mock.assert_called_once_with(
+            ["user@example.com", "inactive@example.com", "Allowed@test.com", "other@test.com"], [1, 2], course_key
+        )
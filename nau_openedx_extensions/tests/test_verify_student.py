@@ -3,13 +3,16 @@ Tests for Id Verification of studentes.
 """
 
 from datetime import datetime
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 
 from django.test import TestCase, override_settings
-from openedx_events.learning.data import CourseEnrollmentData, UserData
+from openedx_events.learning.data import CourseEnrollmentData, UserData, UserPersonalData
 from openedx_events.learning.signals import COURSE_ENROLLMENT_CHANGED
 
-from nau_openedx_extensions.verify_student.id_verification import event_receiver_no_id_verify_for_enrollment_modes
+from nau_openedx_extensions.verify_student.id_verification import (
+    event_receiver_no_id_verify_for_enrollment_modes,
+    parse_enrollment_modes,
+)
 
 
 class VerifyStudentTest(TestCase):
@@ -18,19 +21,19 @@ class VerifyStudentTest(TestCase):
     """
 
     @patch(
-        "nau_openedx_extensions.verify_student.id_verification.get_user_id_verifications"
+        "nau_openedx_extensions.verify_student.id_verification.has_active_user_id_verification"
     )
     @patch(
         "nau_openedx_extensions.verify_student.id_verification.create_user_id_verification"
     )
     def test_verify_student_create_new_verification(
-        self, create_user_id_verification_mock, get_user_id_verifications_mock
+        self, create_user_id_verification_mock, has_active_user_id_verification_mock
     ):
         """
         Test an enrollment mode that requires a ID Verification.
         """
         user_id = 10
-        get_user_id_verifications_mock.return_value = []
+        has_active_user_id_verification_mock.return_value = False
         COURSE_ENROLLMENT_CHANGED.connect(event_receiver_no_id_verify_for_enrollment_modes)
         COURSE_ENROLLMENT_CHANGED.send_event(
             enrollment=CourseEnrollmentData(
@@ -72,19 +75,19 @@ class VerifyStudentTest(TestCase):
         )
 
     @patch(
-        "nau_openedx_extensions.verify_student.id_verification.get_user_id_verifications"
+        "nau_openedx_extensions.verify_student.id_verification.has_active_user_id_verification"
     )
     @patch(
         "nau_openedx_extensions.verify_student.id_verification.create_user_id_verification"
     )
     def test_verify_student_enrollment_mode_not_need_id_verification_patch(
-        self, create_user_id_verification_mock, get_user_id_verifications_mock
+        self, create_user_id_verification_mock, has_active_user_id_verification_mock
     ):
         """
         Test a case enrollment mode that doesn't requires a ID Verification.
         """
         user_id = 10
-        get_user_id_verifications_mock.return_value = []
+        has_active_user_id_verification_mock.return_value = False
         COURSE_ENROLLMENT_CHANGED.connect(event_receiver_no_id_verify_for_enrollment_modes)
         COURSE_ENROLLMENT_CHANGED.send_event(
             enrollment=CourseEnrollmentData(
@@ -98,21 +101,21 @@ class VerifyStudentTest(TestCase):
         create_user_id_verification_mock.assert_not_called()
 
     @patch(
-        "nau_openedx_extensions.verify_student.id_verification.get_user_id_verifications"
+        "nau_openedx_extensions.verify_student.id_verification.has_active_user_id_verification"
     )
     @patch(
         "nau_openedx_extensions.verify_student.id_verification.create_user_id_verification"
     )
     @override_settings(NAU_NO_ID_VERIFY_FOR_ENROLLMENT_MODES="verified, somemode")
     def test_verify_student_change_enrollment_modes_require_id_verification(
-        self, create_user_id_verification_mock, get_user_id_verifications_mock
+        self, create_user_id_verification_mock, has_active_user_id_verification_mock
     ):
         """
         Test that changing the setting `NAU_NO_ID_VERIFY_FOR_ENROLLMENT_MODES` to include a custom enrollment mode,
         and test with that new custom enrollment mode, it still creates an id verification.
         """
         user_id = 10
-        get_user_id_verifications_mock.return_value = []
+        has_active_user_id_verification_mock.return_value = False
         COURSE_ENROLLMENT_CHANGED.connect(event_receiver_no_id_verify_for_enrollment_modes)
         COURSE_ENROLLMENT_CHANGED.send_event(
             enrollment=CourseEnrollmentData(
@@ -154,30 +157,98 @@ class VerifyStudentTest(TestCase):
         )
 
     @patch(
-        "nau_openedx_extensions.verify_student.id_verification.get_user_id_verifications"
+        "nau_openedx_extensions.verify_student.id_verification.has_active_user_id_verification"
     )
     @patch(
         "nau_openedx_extensions.verify_student.id_verification.create_user_id_verification"
     )
     def test_verify_student_with_existing_id_verification(
-        self, create_user_id_verification_mock, get_user_id_verifications_mock
+        self, create_user_id_verification_mock, has_active_user_id_verification_mock
     ):
         """
         Test that if the user already has an id verification, it won't try to create a new one.
         """
-        active_at_datetime_mock = Mock()
-        active_at_datetime_mock.return_value = True
-
         user_id = 10
-        get_user_id_verifications_mock.return_value = active_at_datetime_mock
+        has_active_user_id_verification_mock.return_value = True
         COURSE_ENROLLMENT_CHANGED.connect(event_receiver_no_id_verify_for_enrollment_modes)
         COURSE_ENROLLMENT_CHANGED.send_event(
             enrollment=CourseEnrollmentData(
                 user=UserData(id=user_id, is_active=True, pii=None),
-                mode="verify",
+                mode="verified",
+                course=None,
+                is_active=None,
+                creation_date=None,
+            )
+        )
+        create_user_id_verification_mock.assert_not_called()
+        has_active_user_id_verification_mock.assert_called_once()
+        self.assertEqual(has_active_user_id_verification_mock.call_args.args[0], user_id)
+
+    @patch(
+        "nau_openedx_extensions.verify_student.id_verification.has_active_user_id_verification"
+    )
+    @patch(
+        "nau_openedx_extensions.verify_student.id_verification.create_user_id_verification"
+    )
+    def test_verify_student_uses_the_event_user_name(
+        self, create_user_id_verification_mock, has_active_user_id_verification_mock
+    ):
+        """
+        Test that the id verification is created with the user name of the event, so the user isn't read again.
+        """
+        has_active_user_id_verification_mock.return_value = False
+        COURSE_ENROLLMENT_CHANGED.connect(event_receiver_no_id_verify_for_enrollment_modes)
+        COURSE_ENROLLMENT_CHANGED.send_event(
+            enrollment=CourseEnrollmentData(
+                user=UserData(
+                    id=10,
+                    is_active=True,
+                    pii=UserPersonalData(username="nau", email="nau@example.com", name="NAU Learner"),
+                ),
+                mode="verified",
+                course=None,
+                is_active=None,
+                creation_date=None,
+            )
+        )
+        self.assertEqual(create_user_id_verification_mock.call_args.kwargs.get("name"), "NAU Learner")
+
+    def test_parse_enrollment_modes(self):
+        """
+        Test that the enrollment modes setting is parsed once to a set.
+        """
+        modes = parse_enrollment_modes("verified, somemode")
+
+        self.assertEqual(frozenset(["verified", "somemode"]), modes)
+        self.assertIs(modes, parse_enrollment_modes("verified, somemode"))
+
+    @patch(
+        "nau_openedx_extensions.verify_student.id_verification.should_schedule_flush",
+        return_value=False,
+    )
+    @patch(
+        "nau_openedx_extensions.verify_student.id_verification.enqueue_user_id_verification",
+        return_value=True,
+    )
+    @patch(
+        "nau_openedx_extensions.verify_student.id_verification.create_user_id_verification"
+    )
+    @override_settings(NAU_NO_ID_VERIFY_ASYNC=True)
+    def test_verify_student_async(
+        self, create_user_id_verification_mock, enqueue_user_id_verification_mock, _
+    ):
+        """
+        Test that on async mode the user is queued instead of creating the id verification.
+        """
+        COURSE_ENROLLMENT_CHANGED.connect(event_receiver_no_id_verify_for_enrollment_modes)
+        COURSE_ENROLLMENT_CHANGED.send_event(
+            enrollment=CourseEnrollmentData(
+                user=UserData(id=10, is_active=True, pii=None),
+                mode="verified",
                 course=None,
                 is_active=None,
                 creation_date=None,
             )
         )
         create_user_id_verification_mock.assert_not_called()
+        enqueue_user_id_verification_mock.assert_called_once_with(10, None)
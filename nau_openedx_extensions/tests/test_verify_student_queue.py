@@ -0,0 +1,147 @@
+"""
+Tests for the queue of the users that need an ID verification.
+"""
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from nau_openedx_extensions.verify_student import tasks
+from nau_openedx_extensions.verify_student.models import NauIdVerificationQueueItem
+from nau_openedx_extensions.verify_student.queue import (
+    clear_scheduled_flush,
+    enqueue_user_id_verification,
+    pop_user_id_verifications,
+    should_schedule_flush,
+)
+
+
+@patch.object(NauIdVerificationQueueItem, "objects")
+class IdVerificationQueueTest(TestCase):
+    """
+    Test the database backed queue of the users that need an ID verification.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_user_is_only_queued_once(self, objects_mock):
+        """
+        A user is queued with a single row, and isn't queued again while the row exists.
+        """
+        objects_mock.get_or_create.return_value = (NauIdVerificationQueueItem(user_id=10), True)
+        self.assertTrue(enqueue_user_id_verification(10, "NAU Learner"))
+
+        objects_mock.get_or_create.return_value = (NauIdVerificationQueueItem(user_id=10), False)
+        self.assertFalse(enqueue_user_id_verification(10, "NAU Learner"))
+
+        objects_mock.get_or_create.assert_called_with(user_id=10, defaults={"name": "NAU Learner"})
+
+    def test_pop_claims_and_removes_the_users(self, objects_mock):
+        """
+        The users are claimed in the order they were queued, skipping the ones claimed by other
+        flushes, and removed from the queue when the block finishes.
+        """
+        queryset = objects_mock.select_for_update.return_value.order_by.return_value.values_list.return_value
+        queryset.__getitem__.return_value = [(1, 10, "Learner 10"), (2, 11, None)]
+
+        with pop_user_id_verifications(2) as users:
+            self.assertEqual([(10, "Learner 10"), (11, None)], users)
+            objects_mock.filter.assert_not_called()
+
+        objects_mock.select_for_update.assert_called_once_with(skip_locked=True)
+        objects_mock.select_for_update.return_value.order_by.assert_called_once_with("id")
+        queryset.__getitem__.assert_called_once_with(slice(None, 2))
+        objects_mock.filter.assert_called_once_with(id__in=[1, 2])
+        objects_mock.filter.return_value.delete.assert_called_once_with()
+
+    def test_failed_pop_keeps_the_users(self, objects_mock):
+        """
+        The users of a block that fails are kept on the queue.
+        """
+        queryset = objects_mock.select_for_update.return_value.order_by.return_value.values_list.return_value
+        queryset.__getitem__.return_value = [(1, 10, "Learner 10")]
+
+        with self.assertRaises(ValueError):
+            with pop_user_id_verifications(2):
+                raise ValueError("Database error")
+
+        objects_mock.filter.assert_not_called()
+
+    def test_flush_is_scheduled_once(self, objects_mock):  # pylint: disable=unused-argument
+        """
+        The flush is only scheduled once for the users queued until it starts.
+        """
+        self.assertTrue(should_schedule_flush(30))
+        self.assertFalse(should_schedule_flush(30))
+
+        clear_scheduled_flush()
+
+        self.assertTrue(should_schedule_flush(30))
+
+
+@override_settings(NAU_NO_ID_VERIFY_ASYNC_BATCH_SIZE=2)
+@patch.object(tasks, "schedule_id_verifications_flush")
+@patch.object(tasks, "create_user_id_verifications")
+class FlushUserIdVerificationsTest(TestCase):
+    """
+    Test the task that creates the ID verifications of the queued users.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.queue = [(user_id, "Learner {}".format(user_id)) for user_id in range(1, 6)]
+        patcher = patch.object(tasks, "pop_user_id_verifications", self.pop_user_id_verifications)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @contextmanager
+    def pop_user_id_verifications(self, max_count):
+        """
+        In memory queue that only removes the users when the block finishes without an error.
+        """
+        users = self.queue[:max_count]
+        yield users
+        del self.queue[:len(users)]
+
+    def test_flush_in_batches(self, create_mock, schedule_mock):
+        """
+        The ID verifications are created in batches until the queue is empty.
+        """
+        create_mock.side_effect = lambda users, **kwargs: len(users)
+        should_schedule_flush(30)
+
+        tasks.flush_user_id_verifications()
+
+        self.assertEqual(
+            [[(1, "Learner 1"), (2, "Learner 2")], [(3, "Learner 3"), (4, "Learner 4")], [(5, "Learner 5")]],
+            [call_args[0][0] for call_args in create_mock.call_args_list],
+        )
+        self.assertEqual("approved", create_mock.call_args[1]["status"])
+        self.assertEqual([], self.queue)
+        # the users queued after the start of the flush schedule a new one
+        self.assertTrue(should_schedule_flush(30))
+        schedule_mock.assert_not_called()
+
+    def test_failed_batch_is_kept(self, create_mock, schedule_mock):
+        """
+        The users of a batch that fails stay on the queue and a new flush is scheduled.
+        """
+        create_mock.side_effect = [2, ValueError("Database error")]
+
+        with self.assertRaises(ValueError):
+            tasks.flush_user_id_verifications()
+
+        schedule_mock.assert_called_once_with()
+        self.assertEqual([(3, "Learner 3"), (4, "Learner 4"), (5, "Learner 5")], self.queue)
+
+    def test_empty_queue(self, create_mock, schedule_mock):  # pylint: disable=unused-argument
+        """
+        Nothing is created when the queue is empty.
+        """
+        self.queue = []
+
+        tasks.flush_user_id_verifications()
+
+        create_mock.assert_not_called()
@@ -4,23 +4,58 @@ Tests the separation layer between edxapp and the plugin
 from unittest.mock import Mock, patch
 
 from django.conf import settings
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from nau_openedx_extensions.edxapp_wrapper import course_module
+from nau_openedx_extensions.edxapp_wrapper.registry import clear_backends
 
 
 class CourseMetadataTest(TestCase):
     """Test CourseMetadata wrapper that allow to use the course module from the OpenedX platform."""
 
-    @patch('nau_openedx_extensions.edxapp_wrapper.course_module.import_module')
+    def setUp(self):
+        clear_backends()
+
+    def tearDown(self):
+        clear_backends()
+
+    @patch('nau_openedx_extensions.edxapp_wrapper.registry.import_module')
     def test_imported_module_is_used(self, import_mock):
         """
         Testing the backend is imported and used
         """
         import_mock.return_value = Mock()
-        backend = import_mock
+        backend = import_mock.return_value
+
+        course_module.get_other_course_settings()
+
+        import_mock.assert_called_once_with(settings.NAU_COURSE_MODULE)
+        backend.get_other_course_settings.assert_called_once()
+
+    @patch('nau_openedx_extensions.edxapp_wrapper.registry.import_module')
+    def test_imported_module_is_resolved_once(self, import_mock):
+        """
+        Testing the backend is only imported on the first call
+        """
+        import_mock.return_value = Mock()
+        backend = import_mock.return_value
 
+        course_module.get_other_course_settings()
         course_module.get_other_course_settings()
 
         import_mock.assert_called_once_with(settings.NAU_COURSE_MODULE)
-        backend.assert_called_once()
+        self.assertEqual(2, backend.get_other_course_settings.call_count)
+
+    @patch('nau_openedx_extensions.edxapp_wrapper.registry.import_module')
+    def test_imported_module_is_resolved_again_when_settings_change(self, import_mock):
+        """
+        Testing the backend is imported again after the settings change
+        """
+        import_mock.return_value = Mock()
+
+        course_module.get_other_course_settings()
+        with override_settings(NAU_COURSE_MODULE="another_course_module"):
+            course_module.get_other_course_settings()
+
+        import_mock.assert_any_call(settings.NAU_COURSE_MODULE)
+        import_mock.assert_any_call("another_course_module")
@@ -23,25 +23,26 @@ def ensure_cartao_cidadao_data(strategy, details, user, uid, *args, **kwargs):
         strategy.setting("PROTECTED_USER_FIELDS", [])
     )
 
-    # Make sure the user has a nau extended model.
-    if not hasattr(user, "nauuserextendedmodel"):
-        NauUserExtendedModel.objects.create(user=user)
+    # Make sure the user has a nau extended model, creating or saving it also updates the request cache.
+    nau_user_extended_model = NauUserExtendedModel.get_for_user(user)
+    if not nau_user_extended_model:
+        nau_user_extended_model = NauUserExtendedModel.objects.create(user=user)
 
     # Update the NAU extended model.
     for name, value in details.items():
         if (
             value is None
-            or not hasattr(user.nauuserextendedmodel, name)
+            or not hasattr(nau_user_extended_model, name)
             or name in protected
         ):
             continue
 
-        current_value = getattr(user.nauuserextendedmodel, name, None)
+        current_value = getattr(nau_user_extended_model, name, None)
         if current_value == value:
             continue
 
         changed = True
-        setattr(user.nauuserextendedmodel, name, value)
+        setattr(nau_user_extended_model, name, value)
 
     if changed:
-        user.nauuserextendedmodel.save()
+        nau_user_extended_model.save()
@@ -23,4 +23,11 @@ urlpatterns = [
         message_gateway_api.send_message,
         name="send_message",
     ),
+    url(
+        r"^nau-tools/{}/send-message/(?P<message_id>\d+)/progress$".format(
+            settings.COURSE_ID_PATTERN,
+        ),
+        message_gateway_api.message_progress,
+        name="message_progress",
+    ),
 ]
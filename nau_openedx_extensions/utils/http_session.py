@@ -0,0 +1,34 @@
+"""
+HTTP sessions with a pool of keep-alive connections that retry the failed requests.
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def create_session(concurrency, retries, backoff_factor, retry_all_methods=False):
+    """
+    Create a requests session with a pool of `concurrency` connections, so each worker that uses
+    it reuses its keep-alive connection, and that retries the failed and the rate limited requests
+    with an exponential backoff, respecting the `Retry-After` header.
+
+    By default only the idempotent methods are retried, use `retry_all_methods` when the requests
+    of the other methods can also be retried, e.g. because they have an idempotency key.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=False if retry_all_methods else Retry.DEFAULT_ALLOWED_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=max(concurrency, 1), max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
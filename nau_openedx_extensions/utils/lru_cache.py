@@ -0,0 +1,47 @@
+"""
+In process cache with a least recently used eviction.
+"""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread safe dict like cache that keeps at most `maxsize` values, evicting the least
+    recently used ones.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Get the cached value of the key and mark it as the most recently used.
+        """
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        """
+        Cache the value of the key, evicting the least recently used values if the cache is full.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all the cached values.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
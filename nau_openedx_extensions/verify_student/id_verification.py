@@ -3,6 +3,7 @@ NAU Custom code to skip Open edX ID Verification module.
 """
 import logging
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 from django.conf import settings
 from django.dispatch import receiver
@@ -10,41 +11,85 @@ from openedx_events.learning.data import CourseEnrollmentData
 from openedx_events.learning.signals import COURSE_ENROLLMENT_CHANGED
 from pytz import UTC
 
-from nau_openedx_extensions.edxapp_wrapper.verify_student import create_user_id_verification, get_user_id_verifications
+from nau_openedx_extensions.edxapp_wrapper.verify_student import (
+    create_user_id_verification,
+    has_active_user_id_verification,
+)
+from nau_openedx_extensions.verify_student.queue import enqueue_user_id_verification, should_schedule_flush
 
 log = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=16)
+def parse_enrollment_modes(enrollment_modes_as_str):
+    """
+    The set of the comma separated enrollment modes, parsed once for each setting value.
+    """
+    return frozenset(map(str.strip, enrollment_modes_as_str.split(',')))
+
+
+def get_id_verification_fields(now):
+    """
+    The fields of the `ManualVerification` that skips the id verification of a user.
+    """
+    return {
+        "status": 'approved',
+        "expiration_date": now + timedelta(days=36500),  # 100 years
+        "reason": "Skip id verification from nau_openedx_extensions",
+    }
+
+
+def enqueue_id_verification(user_id, name):
+    """
+    Queue the creation of the id verification of the user, and schedule the task that creates the
+    id verifications of the queued users at most once every `NAU_NO_ID_VERIFY_ASYNC_FLUSH_DELAY` seconds.
+    """
+    if not enqueue_user_id_verification(user_id, name):
+        log.info("User %d ID Verification is already queued", user_id)
+        return
+    log.info("Queued the user ID Verification for %d", user_id)
+    schedule_id_verifications_flush()
+
+
+def schedule_id_verifications_flush():
+    """
+    Schedule the task that creates the id verifications of the queued users, unless it's already
+    scheduled.
+    """
+    flush_delay = getattr(settings, "NAU_NO_ID_VERIFY_ASYNC_FLUSH_DELAY", 30)
+    if should_schedule_flush(flush_delay):
+        # only imported on async mode, when celery is available
+        from nau_openedx_extensions.verify_student import tasks  # pylint: disable=import-outside-toplevel
+        tasks.flush_user_id_verifications.apply_async(countdown=flush_delay)
+
+
 @receiver(COURSE_ENROLLMENT_CHANGED)
 def event_receiver_no_id_verify_for_enrollment_modes(enrollment: CourseEnrollmentData, **kwargs):
     """
     This receiver will ignore / skip the id verification of the Open edX platform.
     Meaning that will create `ManualVerification` object if `enrollment_mode` is defined in the
     `NAU_NO_ID_VERIFY_FOR_ENROLLMENT_MODES` setting, defaults to just the `verified` enrollment mode.
+    With the `NAU_NO_ID_VERIFY_ASYNC` setting the user is queued, and the `ManualVerification` objects
+    are created in batches by a celery task.
     It should be configured using the Open edX signal:
     `openedx_events.learning.signals.COURSE_ENROLLMENT_CHANGED`
     """
     log.info("On event receiver that makes removes the need of ID Verify for some enrollment modes")
     enrollment_mode = enrollment.mode
-    enrollment_modes_to_skip_as_str = getattr(settings, 'NAU_NO_ID_VERIFY_FOR_ENROLLMENT_MODES', 'verified')
-    enrollment_modes_to_skip = list(map(str.strip, enrollment_modes_to_skip_as_str.split(',')))
+    enrollment_modes_to_skip = parse_enrollment_modes(
+        getattr(settings, 'NAU_NO_ID_VERIFY_FOR_ENROLLMENT_MODES', 'verified')
+    )
     if enrollment_mode in enrollment_modes_to_skip:
         user_id = enrollment.user.id
-        now = datetime.now(UTC)
+        # the user name is already on the event, so the user isn't read again
+        name = enrollment.user.pii.name if enrollment.user.pii else None
+        if getattr(settings, "NAU_NO_ID_VERIFY_ASYNC", False):
+            enqueue_id_verification(user_id, name)
+            return
 
-        def verification_active_predicate(verification):
-            return verification.active_at_datetime(now)
-
-        user_manual_verifications = get_user_id_verifications(user_id)
-        verification_active = next(filter(verification_active_predicate, user_manual_verifications), None)
-        if verification_active:
+        now = datetime.now(UTC)
+        if has_active_user_id_verification(user_id, now=now):
             log.info("User %d already has an ID verification", user_id)
         else:
-            expiration_date = now + timedelta(days=36500)  # 100 years
             log.info("Create user ID Verification for %d", user_id)
-            create_user_id_verification(
-                user_id,
-                status='approved',
-                expiration_date=expiration_date,
-                reason="Skip id verification from nau_openedx_extensions"
-            )
+            create_user_id_verification(user_id, name=name, **get_id_verification_fields(now))
@@ -0,0 +1,21 @@
+"""
+Django models for the ID verifications of the students
+"""
+from __future__ import absolute_import, unicode_literals
+
+from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
+from django.db import models
+
+
+class NauIdVerificationQueueItem(models.Model):
+    """
+    Model that stores a user queued for the creation of their ID verification.
+
+    The row is the pending mark of the user, so a user is only queued once until the flush that
+    creates their ID verification deletes it.
+    """
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE)
+    # the name of the ID verification, when None it's read from the user profile
+    name = models.CharField(max_length=255, null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
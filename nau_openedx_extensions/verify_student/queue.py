@@ -0,0 +1,62 @@
+"""
+Database backed queue of the users that need an ID verification.
+
+The enrollment receiver only adds the user to the queue, and a Celery task creates the ID
+verifications of the queued users in batches. A user is only queued once while they're pending.
+
+The queued users are kept on the database until their ID verifications are created, so they
+aren't lost when the cache is cleared or the flush fails. Only the flag that debounces the
+scheduling of the flush is kept on the cache.
+"""
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import transaction
+
+from nau_openedx_extensions.verify_student.models import NauIdVerificationQueueItem
+
+FLUSH_SCHEDULED_CACHE_KEY = "nau_openedx_extensions.id_verification_queue.flush_scheduled"
+
+
+def enqueue_user_id_verification(user_id, name=None):
+    """
+    Add the user to the queue, returns False if the user was already queued.
+    """
+    _, created = NauIdVerificationQueueItem.objects.get_or_create(user_id=user_id, defaults={"name": name})
+    return created
+
+
+@contextmanager
+def pop_user_id_verifications(max_count):
+    """
+    Claim at most `max_count` users of the queue, in the order they were queued.
+
+    Yields the list of `(user_id, name)` of the users, that are only removed from the queue when
+    the block finishes without an error. The claimed users are locked until then, so concurrent
+    flushes skip them.
+    """
+    with transaction.atomic():
+        items = list(
+            NauIdVerificationQueueItem.objects.select_for_update(skip_locked=True).order_by("id").values_list(
+                "id", "user_id", "name"
+            )[:max_count]
+        )
+        yield [(user_id, name) for _, user_id, name in items]
+        if items:
+            NauIdVerificationQueueItem.objects.filter(id__in=[item_id for item_id, _, _ in items]).delete()
+
+
+def should_schedule_flush(delay):
+    """
+    If a flush of the queue should be scheduled, only True once until the scheduled flush starts,
+    or at most for `delay` seconds if it doesn't run.
+    """
+    return cache.add(FLUSH_SCHEDULED_CACHE_KEY, True, delay)
+
+
+def clear_scheduled_flush():
+    """
+    Allow a new flush to be scheduled, the users queued after the start of a flush may not be
+    read by it.
+    """
+    cache.delete(FLUSH_SCHEDULED_CACHE_KEY)
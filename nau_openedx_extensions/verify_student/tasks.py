@@ -0,0 +1,51 @@
+"""
+Async tasks for the ID verifications of the students.
+"""
+from __future__ import absolute_import, unicode_literals
+
+import logging
+from datetime import datetime
+
+from celery import shared_task  # lint-amnesty, pylint: disable=import-error
+from django.conf import settings
+from pytz import UTC
+
+from nau_openedx_extensions.edxapp_wrapper.verify_student import create_user_id_verifications
+from nau_openedx_extensions.verify_student.id_verification import (
+    get_id_verification_fields,
+    schedule_id_verifications_flush,
+)
+from nau_openedx_extensions.verify_student.queue import clear_scheduled_flush, pop_user_id_verifications
+
+log = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_user_id_verifications():
+    """
+    Create the ID verifications of the queued users, in batches of
+    settings.NAU_NO_ID_VERIFY_ASYNC_BATCH_SIZE users. The users that
+    already have an active ID verification are skipped, and the users of a
+    batch that fails are kept on the queue for the next flush.
+    """
+    # the users queued from now on schedule a new flush
+    clear_scheduled_flush()
+    batch_size = getattr(settings, "NAU_NO_ID_VERIFY_ASYNC_BATCH_SIZE", 500)
+    queued_users = 0
+    created_verifications = 0
+    while True:
+        try:
+            with pop_user_id_verifications(batch_size) as users:
+                if users:
+                    created_verifications += create_user_id_verifications(
+                        users, **get_id_verification_fields(datetime.now(UTC))
+                    )
+        except Exception:
+            schedule_id_verifications_flush()
+            raise
+        queued_users += len(users)
+        if len(users) < batch_size:
+            break
+    log.info(
+        "Created %d user ID Verifications for %d queued users", created_verifications, queued_users
+    )